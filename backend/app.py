@@ -1,9 +1,25 @@
 import os
+import threading
 from flask import Flask
 from flask_cors import CORS
-from config import config
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import DEFAULT_SECRET_KEY, config
 from models import db
 from routes import api_bp
+from services.render_pool import render_pool
+from services.render_cache import slider_cache
+from services.pool_verifier import pool_verifier
+from services.read_replica import read_router
+from services.admission import admission
+from services.single_flight import single_flight
+from services.layout_bank import layout_bank
+from services.image_pool import image_pool
+
+
+def _prewarm_slider_cache():
+    # Imported in the thread so the slider stack loads off the start-up path
+    from routes.slider_routes import prewarm_slider_cache
+    prewarm_slider_cache()
 
 
 def create_app(config_name=None):
@@ -12,15 +28,58 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if app.config.get('TRUSTED_PROXY_HOPS'):
+        # remote_addr becomes the client address the outermost trusted proxy saw
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'])
+    if app.config.get('SESSION_TOKENS_ENABLED') and app.config['SECRET_KEY'] == DEFAULT_SECRET_KEY:
+        # Anyone could forge tokens signed with the default key
+        app.logger.error("SESSION_TOKENS_ENABLED requires SECRET_KEY to be set, session tokens are disabled")
+        app.config['SESSION_TOKENS_ENABLED'] = False
     
     db.init_app(app)
+    render_pool.init_app(app)
+    slider_cache.init_app(app, 'SLIDER_CACHE_MAX_BYTES', 'slider_cache')
+    image_pool.init_app(app)
+    pool_verifier.init_app(app)
+    read_router.init_app(app)
+    admission.init_app(app)
+    single_flight.init_app(app)
+    layout_bank.init_app(app)
     
-    CORS(app, origins=app.config.get('CORS_ORIGINS', ['http://localhost:3000']))
+    CORS(
+        app,
+        origins=app.config.get('CORS_ORIGINS', ['http://localhost:3000']),
+        expose_headers=['X-Luminance-Fg', 'X-Luminance-Bg', 'X-Luminance-Delta', 'X-Cache', 'X-Panels', 'Retry-After']
+    )
     
     app.register_blueprint(api_bp)
     
-    with app.app_context():
+    # Schema creation is an explicit step (flask init-db) so that workers
+    # do not issue DDL checks on every start
+    if app.config.get('AUTO_CREATE_SCHEMA'):
+        with app.app_context():
+            db.create_all()
+    
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create any missing database tables."""
         db.create_all()
+        print(f"✓ Database schema ready ({app.config['SQLALCHEMY_DATABASE_URI']})")
+    
+    if app.config.get('SLIDER_CACHE_PREWARM') and slider_cache.enabled:
+        # Started by the first request so that scripts and CLI commands that
+        # only create the app do not render every preset
+        prewarm_lock = threading.Lock()
+        prewarm_started = []
+        
+        @app.before_request
+        def start_prewarm():
+            if prewarm_started:
+                return
+            with prewarm_lock:
+                if not prewarm_started:
+                    prewarm_started.append(True)
+                    threading.Thread(target=_prewarm_slider_cache, daemon=True).start()
     
     @app.route('/health')
     def health_check():
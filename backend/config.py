@@ -1,23 +1,106 @@
+import json
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Publicly known, so nothing that must not be forged may be signed with it
+DEFAULT_SECRET_KEY = 'dev-secret-key-change-in-production'
+
 
 class Config:
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    SECRET_KEY = os.getenv('SECRET_KEY', DEFAULT_SECRET_KEY)
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///dicrhomat.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SESSION_EXPIRY_HOURS = int(os.getenv('SESSION_EXPIRY_HOURS', 24))
+    # Return a SECRET_KEY-signed session token from /test/start; image requests
+    # that present it are served without reading the session from the database.
+    # Needs SECRET_KEY to be set; with the default key tokens stay disabled
+    SESSION_TOKENS_ENABLED = os.getenv('SESSION_TOKENS_ENABLED', 'false').lower() == 'true'
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     IMAGE_SIZE = int(os.getenv('IMAGE_SIZE', 400))
     IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'PNG')
     RANDOM_SEED_SALT = os.getenv('RANDOM_SEED_SALT', 'dicrhomat-salt')
+    # Create missing tables in create_app; otherwise run `flask init-db` once per deploy
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'false').lower() == 'true'
+    # Optional read replica (or read-only pool) for results and reporting reads
+    READ_REPLICA_URL = os.getenv('READ_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'read_replica': READ_REPLICA_URL} if READ_REPLICA_URL else {}
+    # Reads for a session this worker just wrote stay on the primary this long
+    READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 30))
+    # Token-bucket admission control for render endpoints, in units of 1000 dots.
+    # ADMISSION_LIMITS is JSON merged into services.admission.DEFAULT_ADMISSION_LIMITS per
+    # endpoint, e.g. {"generate_slider_image": {"client_rate": 2, "global_burst": 50}};
+    # null removes an endpoint's limits
+    ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'true').lower() == 'true'
+    ADMISSION_LIMITS = json.loads(os.getenv('ADMISSION_LIMITS', '{}'))
+    # Reverse proxies in front of the app that append to X-Forwarded-For. With 0 the
+    # client address (and admission control's per-client bucket) is the socket peer,
+    # which behind a proxy is the proxy itself
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', 0))
+    # Identical concurrent seeded renders share one render. With a lock directory,
+    # workers on the same host also share results for SINGLE_FLIGHT_RESULT_TTL seconds
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+    SINGLE_FLIGHT_LOCK_DIR = os.getenv('SINGLE_FLIGHT_LOCK_DIR', '')
+    SINGLE_FLIGHT_RESULT_TTL = float(os.getenv('SINGLE_FLIGHT_RESULT_TTL', 10))
+    # Schema for new sessions' answers: 'rows' (Answer table) or 'packed' (one session_answers row)
+    ANSWER_STORAGE = os.getenv('ANSWER_STORAGE', 'rows')
+    # Scoring rules of ResultsAnalyzer. After changing them, re-score stored results
+    # with scripts/rescore_sessions.py
+    ANALYSIS_DEFICIENT_ERROR_RATE = float(os.getenv('ANALYSIS_DEFICIENT_ERROR_RATE', 0.67))
+    ANALYSIS_NORMAL_ERROR_RATE = float(os.getenv('ANALYSIS_NORMAL_ERROR_RATE', 0.33))
+    ANALYSIS_MAX_CONTROL_ERRORS = int(os.getenv('ANALYSIS_MAX_CONTROL_ERRORS', 0))
+    # Bearer token for /api/export/sessions; the endpoint is disabled while unset
+    EXPORT_TOKEN = os.getenv('EXPORT_TOKEN')
+    # Sessions per keyset page of an export
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    # Process pool for slider and fallback renders (0 = render inline)
+    RENDER_POOL_WORKERS = int(os.getenv('RENDER_POOL_WORKERS', 2))
+    RENDER_POOL_MAX_QUEUE = int(os.getenv('RENDER_POOL_MAX_QUEUE', 8))
+    RENDER_POOL_TIMEOUT = float(os.getenv('RENDER_POOL_TIMEOUT', 30))
+    RENDER_POOL_RETRY_AFTER = int(os.getenv('RENDER_POOL_RETRY_AFTER', 2))
+    # LRU cache of seeded slider renders (0 = disabled)
+    SLIDER_CACHE_MAX_BYTES = int(os.getenv('SLIDER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    # Render every preset into the cache once a worker serves its first request
+    SLIDER_CACHE_PREWARM = os.getenv('SLIDER_CACHE_PREWARM', 'true').lower() == 'true'
+    # Per-render-worker cache of dot layouts reused across colour/noise changes
+    SLIDER_LAYOUT_CACHE_MAX_BYTES = int(os.getenv('SLIDER_LAYOUT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    # Maximum colours per batch luminance request
+    SLIDER_BATCH_MAX_COLORS = int(os.getenv('SLIDER_BATCH_MAX_COLORS', 10000))
+    # RGB cube spacing for the confusable colour search (smaller is finer and slower)
+    SLIDER_CONFUSABLE_GRID_STEP = int(os.getenv('SLIDER_CONFUSABLE_GRID_STEP', 4))
+    # Versioned image pools (see scripts/rollover_pool.py); empty means backend/static/test_images.
+    # Every IMAGE_POOL_WARM_INTERVAL seconds workers warm a staged NEXT version (0 = disabled)
+    IMAGE_POOL_DIR = os.getenv('IMAGE_POOL_DIR', '')
+    IMAGE_POOL_WARM_INTERVAL = float(os.getenv('IMAGE_POOL_WARM_INTERVAL', 5))
+    # Image pool integrity checks against metadata sha256 values
+    POOL_VERIFY_ON_STARTUP = os.getenv('POOL_VERIFY_ON_STARTUP', 'false').lower() == 'true'
+    POOL_VERIFY_WORKERS = int(os.getenv('POOL_VERIFY_WORKERS', 4))
+    # Background re-verification of a slice of the pool every N seconds (0 = disabled)
+    POOL_VERIFY_INTERVAL = float(os.getenv('POOL_VERIFY_INTERVAL', 0))
+    POOL_VERIFY_SAMPLE_FRACTION = float(os.getenv('POOL_VERIFY_SAMPLE_FRACTION', 0.05))
+    # Pre-rendered plates of sessions created before the image pool (see scripts/backfill_legacy_plates.py)
+    LEGACY_PLATE_DIR = os.getenv(
+        'LEGACY_PLATE_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'legacy_plates')
+    )
+    # Offline-built dot layouts for test plates (see scripts/build_layout_bank.py);
+    # on-the-fly plates place dots live while no bank has been built
+    DOT_LAYOUT_BANK_DIR = os.getenv(
+        'DOT_LAYOUT_BANK_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'layout_bank')
+    )
+    # Offline-built dichromat confusion index (see scripts/build_confusion_index.py)
+    CONFUSION_INDEX_DIR = os.getenv(
+        'CONFUSION_INDEX_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'confusion_index')
+    )
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'true').lower() == 'true'
 
 
 class ProductionConfig(Config):
@@ -28,6 +111,11 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    RENDER_POOL_WORKERS = 0
+    SLIDER_CACHE_PREWARM = False
+    ADMISSION_CONTROL_ENABLED = False
+    DOT_LAYOUT_BANK_DIR = ''
+    IMAGE_POOL_WARM_INTERVAL = 0
 
 
 config = {
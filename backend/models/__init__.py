@@ -4,3 +4,6 @@ db = SQLAlchemy()
 
 from .test_session import TestSession
 from .answer import Answer
+from .session_answers import SessionAnswers
+from .legacy_plate import LegacyPlate
+from .session_result import SessionResult
@@ -2,7 +2,20 @@ from datetime import datetime, timezone
 from . import db
 
 
-class Answer(db.Model):
+class AnswerDictMixin:
+    """Serialization shared by Answer rows and packed answers."""
+
+    def to_dict(self):
+        return {
+            'image_number': self.image_number,
+            'correct_answer': self.correct_answer,
+            'user_answer': self.user_answer,
+            'is_correct': self.user_answer == self.correct_answer,
+            'dichromism_type': self.dichromism_type
+        }
+
+
+class Answer(AnswerDictMixin, db.Model):
     __tablename__ = 'answer'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -19,12 +32,3 @@ class Answer(db.Model):
         db.CheckConstraint('correct_answer >= 0 AND correct_answer <= 99', name='valid_correct_answer'),
         db.CheckConstraint('user_answer IS NULL OR (user_answer >= 0 AND user_answer <= 99)', name='valid_user_answer'),
     )
-
-    def to_dict(self):
-        return {
-            'image_number': self.image_number,
-            'correct_answer': self.correct_answer,
-            'user_answer': self.user_answer,
-            'is_correct': self.user_answer == self.correct_answer,
-            'dichromism_type': self.dichromism_type
-        }
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from . import db
+
+
+class LegacyPlate(db.Model):
+    """
+    Pre-rendered plate of a session created before the image pool existed.
+
+    scripts/backfill_legacy_plates.py renders each plate once with the
+    session's original seed and records its parameters, so these sessions
+    are served from disk instead of being rendered on every request.
+    """
+    __tablename__ = 'legacy_plate'
+
+    session_id = db.Column(db.String(36), db.ForeignKey('test_session.id'), primary_key=True)
+    image_number = db.Column(db.Integer, primary_key=True)
+    correct_answer = db.Column(db.Integer, nullable=False)
+    dichromism_type = db.Column(db.String(20), nullable=False)
+    # Path relative to LEGACY_PLATE_DIR
+    filename = db.Column(db.String(100), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    file_size = db.Column(db.Integer, nullable=False)
+    rendered_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.CheckConstraint('image_number >= 1 AND image_number <= 10', name='valid_legacy_image_number'),
+    )
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from . import db
+from .answer import AnswerDictMixin
+
+
+IMAGES_PER_SESSION = 10
+# Byte values with special meaning in the packed columns
+UNSET = 255
+NULL_ANSWER = 254
+DICHROMISM_CODES = ('protanopia', 'deuteranopia', 'tritanopia', 'control')
+
+
+class PackedAnswer(AnswerDictMixin):
+    """Read-only stand-in for an Answer row, decoded from SessionAnswers."""
+
+    def __init__(self, session_id: str, image_number: int, correct_answer: int,
+                 user_answer: Optional[int], dichromism_type: str):
+        self.session_id = session_id
+        self.image_number = image_number
+        self.correct_answer = correct_answer
+        self.user_answer = user_answer
+        self.dichromism_type = dichromism_type
+
+
+class SessionAnswers(db.Model):
+    """
+    Compact storage of one session's image mapping and answers.
+
+    Each column holds one byte per test image (index = image_number - 1),
+    replacing the JSON image_mapping and ten Answer rows with a single row.
+    The version column makes concurrent answer submissions for the same
+    session fail with StaleDataError instead of overwriting each other.
+    """
+    __tablename__ = 'session_answers'
+
+    session_id = db.Column(db.String(36), db.ForeignKey('test_session.id'), primary_key=True)
+    # Pre-generated image ID per test image; NULL for on-the-fly sessions
+    image_ids = db.Column(db.LargeBinary(IMAGES_PER_SESSION), nullable=True)
+    correct_answers = db.Column(db.LargeBinary(IMAGES_PER_SESSION), nullable=False,
+                                default=lambda: bytes([UNSET]) * IMAGES_PER_SESSION)
+    user_answers = db.Column(db.LargeBinary(IMAGES_PER_SESSION), nullable=False,
+                             default=lambda: bytes([UNSET]) * IMAGES_PER_SESSION)
+    dichromism_types = db.Column(db.LargeBinary(IMAGES_PER_SESSION), nullable=False,
+                                 default=lambda: bytes([UNSET]) * IMAGES_PER_SESSION)
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    version = db.Column(db.Integer, nullable=False)
+
+    __mapper_args__ = {'version_id_col': version}
+
+    # Joined, so loading a session for an image or answer request is still one query
+    session = db.relationship('TestSession', backref=db.backref('packed_answers', uselist=False, lazy='joined',
+                                                                cascade='all, delete-orphan'))
+
+    def __init__(self, **kwargs):
+        # Column defaults only apply on INSERT; record() needs them before that
+        for column in ('correct_answers', 'user_answers', 'dichromism_types'):
+            kwargs.setdefault(column, bytes([UNSET]) * IMAGES_PER_SESSION)
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def fits_mapping(image_mapping: Optional[Dict]) -> bool:
+        """Whether every image ID fits one byte; pools of over 255 images do not."""
+        return all(0 <= int(image_id) < UNSET for image_id in (image_mapping or {}).values())
+
+    @staticmethod
+    def pack_mapping(image_mapping: Optional[Dict]) -> Optional[bytes]:
+        """Pack a {image_number: image_id} mapping (int or str keys)."""
+        if not image_mapping:
+            return None
+        packed = bytearray([UNSET]) * IMAGES_PER_SESSION
+        for image_number, image_id in image_mapping.items():
+            if not 0 <= int(image_id) < UNSET:
+                raise ValueError(f"Image ID {image_id} does not fit the packed mapping")
+            packed[int(image_number) - 1] = int(image_id)
+        return bytes(packed)
+
+    @property
+    def image_mapping(self) -> Optional[Dict[str, int]]:
+        """Mapping in the same {"1": id, ...} form as TestSession.image_mapping."""
+        if self.image_ids is None:
+            return None
+        return {str(i + 1): image_id for i, image_id in enumerate(self.image_ids) if image_id != UNSET}
+
+    def is_answered(self, image_number: int) -> bool:
+        return self.correct_answers[image_number - 1] != UNSET
+
+    def record(self, image_number: int, correct_answer: int, user_answer: Optional[int], dichromism_type: str):
+        """Store one answer; bytes columns are immutable, so each is replaced."""
+        index = image_number - 1
+
+        def replaced(column: bytes, value: int) -> bytes:
+            return column[:index] + bytes([value]) + column[index + 1:]
+
+        self.correct_answers = replaced(self.correct_answers, correct_answer)
+        self.user_answers = replaced(self.user_answers, NULL_ANSWER if user_answer is None else user_answer)
+        self.dichromism_types = replaced(self.dichromism_types, DICHROMISM_CODES.index(dichromism_type))
+        self.updated_at = datetime.now(timezone.utc)
+
+    def answers(self) -> List[PackedAnswer]:
+        """Answered images in image_number order, as Answer-compatible objects."""
+        result = []
+        for i in range(IMAGES_PER_SESSION):
+            if self.correct_answers[i] == UNSET:
+                continue
+            user_answer = self.user_answers[i]
+            result.append(PackedAnswer(
+                self.session_id,
+                i + 1,
+                self.correct_answers[i],
+                None if user_answer == NULL_ANSWER else user_answer,
+                DICHROMISM_CODES[self.dichromism_types[i]]
+            ))
+        return result
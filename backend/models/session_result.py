@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from . import db
+
+
+class SessionResult(db.Model):
+    """
+    Stored outcome of ResultsAnalyzer for one session.
+
+    Written in bulk by scripts/rescore_sessions.py. rules records the
+    analyzer settings a row was scored with, so a re-run after changing
+    them only touches rows scored under other settings.
+    """
+    __tablename__ = 'session_result'
+
+    session_id = db.Column(db.String(36), db.ForeignKey('test_session.id'), primary_key=True)
+    color_vision_status = db.Column(db.String(20), nullable=False)
+    suspected_type = db.Column(db.String(20), nullable=True)
+    confidence = db.Column(db.String(10), nullable=False)
+    # Error counts per type; NULL for incomplete sessions, which have no details
+    protanopia_errors = db.Column(db.Integer, nullable=True)
+    deuteranopia_errors = db.Column(db.Integer, nullable=True)
+    tritanopia_errors = db.Column(db.Integer, nullable=True)
+    control_errors = db.Column(db.Integer, nullable=True)
+    total_correct = db.Column(db.Integer, nullable=False)
+    rules = db.Column(db.String(64), nullable=False)
+    scored_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    session = db.relationship('TestSession', backref=db.backref('result', uselist=False,
+                                                                cascade='all, delete-orphan'))
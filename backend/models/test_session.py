@@ -15,6 +15,10 @@ class TestSession(db.Model):
     # Mapping of test image numbers (1-10) to pre-generated image IDs (0-99)
     # Format: {"1": 5, "2": 12, ...} (keys are strings in JSON)
     image_mapping = db.Column(db.JSON, nullable=True)
+    # Image pool version the mapping refers to; NULL for the unversioned pool
+    pool_version = db.Column(db.String(32), nullable=True)
+    # Layout bank of sessions rendered on the fly; NULL places dots live
+    layout_bank = db.Column(db.String(16), nullable=True)
 
     answers = db.relationship('Answer', backref='session', lazy=True, cascade='all, delete-orphan')
 
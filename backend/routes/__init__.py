@@ -1,6 +1,46 @@
 from flask import Blueprint
+from werkzeug.utils import cached_property, import_string
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+
+class LazyView:
+    """
+    View that imports its function on the first request (Flask's
+    lazily-loading views pattern), so modules with heavy dependencies do not
+    slow down app start-up or load in workers that never serve them.
+    """
+
+    def __init__(self, import_name: str):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def lazy_route(rule: str, import_name: str, **options):
+    """Register routes.<import_name> on api_bp without importing it yet."""
+    endpoint = import_name.rsplit('.', 1)[1]
+    api_bp.add_url_rule(rule, endpoint, LazyView(f'{__name__}.{import_name}'), **options)
+
+
 from . import test_routes
-from . import slider_routes
+from . import metrics_routes
+from . import export_routes
+
+# Slider endpoints need numpy, PIL and the generators
+lazy_route('/slider/generate', 'slider_routes.generate_slider_image', methods=['POST'])
+lazy_route('/slider/image', 'slider_routes.get_slider_image', methods=['GET'])
+lazy_route('/slider/compare', 'slider_routes.compare_slider_image', methods=['POST'])
+lazy_route('/slider/luminance', 'slider_routes.calculate_luminance_endpoint', methods=['POST'])
+lazy_route('/slider/match-luminance', 'slider_routes.match_luminance_endpoint', methods=['POST'])
+lazy_route('/slider/luminance/batch', 'slider_routes.calculate_luminance_batch_endpoint', methods=['POST'])
+lazy_route('/slider/match-luminance/batch', 'slider_routes.match_luminance_batch_endpoint', methods=['POST'])
+lazy_route('/slider/confusable', 'slider_routes.confusable_colors_endpoint', methods=['POST'])
+lazy_route('/slider/lookalikes', 'slider_routes.lookalike_colors_endpoint', methods=['POST'])
+lazy_route('/slider/presets', 'slider_routes.get_presets', methods=['GET'])
@@ -0,0 +1,74 @@
+"""Streaming research export of sessions and answers."""
+
+import hmac
+from datetime import datetime, timezone
+from flask import request, current_app, Response, stream_with_context
+from . import api_bp
+from .test_routes import error_response
+from services.read_replica import read_router
+from services.session_export import (
+    EXPORT_FORMATS,
+    EXPORT_STATUSES,
+    ExportFilters,
+    parse_timestamp,
+    stream_export
+)
+
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def export_authorized() -> bool:
+    token = current_app.config.get('EXPORT_TOKEN')
+    supplied = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode())
+
+
+@api_bp.route('/export/sessions', methods=['GET'])
+def export_sessions():
+    """
+    Stream all sessions matching the filters.
+
+    Query parameters: format (ndjson or csv), gzip (true/false), from and
+    to (ISO dates on created_at, to exclusive) and status (completed or
+    incomplete). Requires an "Authorization: Bearer <EXPORT_TOKEN>" header;
+    without EXPORT_TOKEN configured the endpoint is disabled.
+    """
+    if not current_app.config.get('EXPORT_TOKEN'):
+        return error_response('EXPORT_DISABLED', 'Exports are not enabled on this server', 404)
+    if not export_authorized():
+        return error_response('UNAUTHORIZED', 'A valid export token is required', 401)
+
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in EXPORT_FORMATS:
+        return error_response('VALIDATION_ERROR', 'format must be ndjson or csv', 400)
+    status = request.args.get('status')
+    if status is not None and status not in EXPORT_STATUSES:
+        return error_response('VALIDATION_ERROR', 'status must be completed or incomplete', 400)
+    try:
+        filters = ExportFilters(
+            created_from=parse_timestamp(request.args['from']) if 'from' in request.args else None,
+            created_to=parse_timestamp(request.args['to']) if 'to' in request.args else None,
+            status=status
+        )
+    except ValueError:
+        return error_response('VALIDATION_ERROR', 'from and to must be ISO 8601 dates', 400)
+    compress = request.args.get('gzip', 'false').lower() == 'true'
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+
+    def generate():
+        # Exports tolerate replica lag, so they run on the replica when there is one
+        with read_router.reporting_session() as db_session:
+            yield from stream_export(db_session, output_format, filters, batch_size, compress)
+
+    filename = f"sessions-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{output_format}"
+    if compress:
+        filename += '.gz'
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/gzip' if compress else EXPORT_MIMETYPES[output_format]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    # Ask reverse proxies not to buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
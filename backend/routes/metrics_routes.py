@@ -0,0 +1,29 @@
+"""Operational metrics for the render pipeline."""
+
+import sys
+from flask import jsonify
+from . import api_bp
+from services.render_pool import render_pool
+from services.render_cache import slider_cache
+from services.pool_verifier import pool_verifier
+from services.read_replica import read_router
+from services.admission import admission
+from services.single_flight import single_flight
+from services.image_pool import image_pool
+
+
+@api_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Report render pool queue depth, wait times and cache effectiveness."""
+    # The search module loads on first use; until then it has served nothing
+    confusion_search = sys.modules.get('services.confusion_search')
+    return jsonify({
+        'render_pool': render_pool.stats(),
+        'slider_cache': slider_cache.stats(),
+        'confusion_search_cache': confusion_search.cache_stats() if confusion_search else None,
+        'pool_integrity': pool_verifier.stats(),
+        'read_replica': read_router.stats(),
+        'admission': admission.stats(),
+        'single_flight': single_flight.stats(),
+        'image_pool': image_pool.stats()
+    })
@@ -1,9 +1,107 @@
-"""API routes for the Slider App - Parameter Explorer."""
+"""
+API routes for the Slider App - Parameter Explorer.
 
-from flask import request, jsonify
-from . import api_bp
+The views are registered in routes/__init__.py as lazy routes, so this module
+and its numpy/PIL dependencies load on the first slider request.
+"""
+
+import base64
+import hashlib
+from urllib.parse import urlencode
+import numpy as np
+from flask import request, jsonify, redirect, Response, current_app
 from services.slider_image_generator import SliderImageGenerator
-from utils.luminance import calculate_luminance, match_luminance
+from services.render_pool import (
+    render_pool,
+    render_slider_image,
+    render_slider_comparison,
+    RenderPoolSaturated,
+    RenderTimeout
+)
+from services.render_cache import slider_cache
+from services.admission import admission, AdmissionRejected
+from services.single_flight import single_flight
+from services.confusion_search import find_confusable_colors
+from services.confusion_index import confusion_index, ConfusionIndexMissing
+from utils.luminance import (
+    calculate_luminance,
+    match_luminance,
+    calculate_luminance_batch,
+    match_luminance_batch
+)
+
+
+SLIDER_IMAGE_FORMATS = SliderImageGenerator.IMAGE_FORMATS + SliderImageGenerator.VECTOR_FORMATS
+SLIDER_OUTPUT_FORMATS = ('json',) + SLIDER_IMAGE_FORMATS
+COMPARE_OUTPUT_FORMATS = ('json',) + SliderImageGenerator.IMAGE_FORMATS
+
+
+def busy_response(exc):
+    """503 response telling the client when to retry a saturated render."""
+    response = jsonify({'error': 'Image renderer is busy, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+def rejected_response(exc):
+    """429 response for a request shed by admission control."""
+    response = jsonify({'error': f'Too many expensive renders ({exc.scope} limit), please retry later'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+def render_cost(params: dict, panels: int = 1) -> float:
+    """Admission cost of a render: thousands of dots placed, times the panels rasterized."""
+    dots = SliderImageGenerator.estimate_dot_count(params['circle_mean_size'], params['pattern_density'])
+    return dots * panels / 1000
+
+
+def render_slider(params: dict, render_fn=render_slider_image, extra_key: tuple = (), cost: float = None):
+    """
+    Render through the slider cache and the render pool.
+    
+    extra_key distinguishes renders of the same base parameters by a
+    different render_fn (e.g. comparisons). Returns (result, cache_hit).
+    Unseeded requests bypass the cache. Concurrent misses for the same
+    seeded render share one render through single_flight. When cost is
+    given, the render must pass admission control first and may raise
+    AdmissionRejected; requests joining an in-flight render are not charged.
+    """
+    base_params = {k: v for k, v in params.items() if k not in ('dichromat_types', 'contact_sheet')}
+    key = SliderImageGenerator.cache_key(base_params)
+    if key is not None:
+        key = key + extra_key
+    if key is not None and slider_cache.enabled:
+        cached = slider_cache.get(key)
+        if cached is not None:
+            return cached, True
+    
+    def render():
+        if cost is not None:
+            admission.admit_request(cost)
+        result = render_pool.run(render_fn, params)
+        if key is not None:
+            slider_cache.put(key, result)
+        return result
+    
+    if key is None:
+        return render(), False
+    # A waiter whose leader was shed by admission control is charged itself
+    result, _ = single_flight.do(('slider',) + key, render, unshared_errors=(AdmissionRejected,))
+    return result, False
+
+
+def prewarm_slider_cache():
+    """Render every preset at both qualities so preset switches hit the cache."""
+    for preset in SliderImageGenerator.PRESETS:
+        for quality in SliderImageGenerator.QUALITIES:
+            try:
+                render_slider({**preset['params'], 'quality': quality})
+            except (RenderPoolSaturated, RenderTimeout):
+                # Never compete with real traffic for render capacity
+                return
 
 
 def validate_rgb(rgb: list, name: str) -> tuple:
@@ -15,68 +113,299 @@ def validate_rgb(rgb: list, name: str) -> tuple:
     return rgb, None
 
 
-@api_bp.route('/slider/generate', methods=['POST'])
-def generate_slider_image():
-    """Generate a test image with specified parameters."""
-    data = request.get_json()
-    if not data:
-        return jsonify({'error': 'Request body required'}), 400
+def validate_rgb_batch(colors, name: str) -> tuple:
+    """Validate a list of RGB arrays and return (N x 3 array, error message)."""
+    max_colors = current_app.config.get('SLIDER_BATCH_MAX_COLORS', 10000)
+    if not isinstance(colors, list) or not colors:
+        return None, f'{name} must be a non-empty array of RGB arrays'
+    if len(colors) > max_colors:
+        return None, f'{name} may contain at most {max_colors} colors'
     
+    try:
+        array = np.asarray(colors)
+    except ValueError:
+        return None, f'{name} must be an array of RGB arrays'
+    if array.ndim != 2 or array.shape[1] != 3 or array.dtype.kind not in 'iu':
+        return None, f'{name} must be an array of RGB arrays of 3 integers'
+    if array.min() < 0 or array.max() > 255:
+        return None, f'{name} values must be integers between 0 and 255'
+    return array, None
+
+
+def validate_slider_params(data: dict) -> tuple:
+    """Validate generate parameters and return (params, error message)."""
     fg_rgb, err = validate_rgb(data.get('fg_rgb', [150, 120, 140]), 'fg_rgb')
     if err:
-        return jsonify({'error': err}), 400
+        return None, err
     
     bg_rgb, err = validate_rgb(data.get('bg_rgb', [145, 145, 145]), 'bg_rgb')
     if err:
-        return jsonify({'error': err}), 400
+        return None, err
     
     circle_mean_size = data.get('circle_mean_size', 20)
     if not isinstance(circle_mean_size, (int, float)) or not 6 <= circle_mean_size <= 40:
-        return jsonify({'error': 'circle_mean_size must be between 6 and 40'}), 400
+        return None, 'circle_mean_size must be between 6 and 40'
     
     circle_size_variance = data.get('circle_size_variance', 0.30)
     if not isinstance(circle_size_variance, (int, float)) or not 0 <= circle_size_variance <= 0.60:
-        return jsonify({'error': 'circle_size_variance must be between 0 and 0.60'}), 400
+        return None, 'circle_size_variance must be between 0 and 0.60'
     
     noise_offset = data.get('noise_offset', 0.0)
     if not isinstance(noise_offset, (int, float)) or not -0.08 <= noise_offset <= 0.08:
-        return jsonify({'error': 'noise_offset must be between -0.08 and 0.08'}), 400
+        return None, 'noise_offset must be between -0.08 and 0.08'
     
     noise_variance = data.get('noise_variance', 0.08)
     if not isinstance(noise_variance, (int, float)) or not 0 <= noise_variance <= 0.25:
-        return jsonify({'error': 'noise_variance must be between 0 and 0.25'}), 400
+        return None, 'noise_variance must be between 0 and 0.25'
     
     pattern_density = data.get('pattern_density', 0.25)
     if not isinstance(pattern_density, (int, float)) or not 0.10 <= pattern_density <= 0.60:
-        return jsonify({'error': 'pattern_density must be between 0.10 and 0.60'}), 400
+        return None, 'pattern_density must be between 0.10 and 0.60'
     
     simulate_dichromat = data.get('simulate_dichromat', False)
     dichromat_type = data.get('dichromat_type', 'deuteranopia')
     if dichromat_type not in ('deuteranopia', 'protanopia', 'tritanopia'):
-        return jsonify({'error': 'dichromat_type must be deuteranopia, protanopia, or tritanopia'}), 400
+        return None, 'dichromat_type must be deuteranopia, protanopia, or tritanopia'
     
     seed = data.get('seed')
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        return None, 'seed must be an integer'
+    
+    quality = data.get('quality', 'full')
+    if quality not in SliderImageGenerator.QUALITIES:
+        return None, 'quality must be full or preview'
+    
+    preview_size = data.get('preview_size')
+    if preview_size is not None and (not isinstance(preview_size, int) or not 125 <= preview_size <= 250):
+        return None, 'preview_size must be an integer between 125 and 250'
+    
+    return {
+        'fg_rgb': fg_rgb,
+        'bg_rgb': bg_rgb,
+        'circle_mean_size': circle_mean_size,
+        'circle_size_variance': circle_size_variance,
+        'noise_offset': noise_offset,
+        'noise_variance': noise_variance,
+        'pattern_density': pattern_density,
+        'simulate_dichromat': simulate_dichromat,
+        'dichromat_type': dichromat_type,
+        'seed': seed,
+        'quality': quality,
+        'preview_size': preview_size
+    }, None
+
+
+def parse_slider_query(args) -> tuple:
+    """Convert GET query arguments into the typed dict validate_slider_params expects."""
+    data = {}
+    try:
+        for name in ('fg_rgb', 'bg_rgb'):
+            if name in args:
+                data[name] = [int(v) for v in args[name].split(',')]
+        for name in ('circle_mean_size', 'circle_size_variance', 'noise_offset', 'noise_variance', 'pattern_density'):
+            if name in args:
+                data[name] = float(args[name])
+        for name in ('seed', 'preview_size'):
+            if name in args:
+                data[name] = int(args[name])
+    except ValueError:
+        return None, 'Invalid numeric query parameter'
+    
+    if 'simulate_dichromat' in args:
+        data['simulate_dichromat'] = args['simulate_dichromat'].lower() in ('1', 'true')
+    for name in ('dichromat_type', 'quality'):
+        if name in args:
+            data[name] = args[name]
+    return data, None
+
+
+def canonical_query_string(params: dict) -> str:
+    """Query string of a render, in canonical order and formatting, tagged with the generator version."""
+    parts = [('v', SliderImageGenerator.VERSION)]
+    for name, value in SliderImageGenerator.canonical_params(params).items():
+        if isinstance(value, tuple):
+            value = ','.join(str(v) for v in value)
+        elif isinstance(value, bool):
+            value = 'true' if value else 'false'
+        elif isinstance(value, float):
+            value = repr(value)
+        parts.append((name, value))
+    return urlencode(parts, safe=',')
+
+
+def slider_image_response(params: dict, output_format: str, etag: str = None):
+    """Render params and wrap the result as JSON or as a raw image body."""
+    image_format = 'png' if output_format == 'json' else output_format
+    
+    try:
+        result, cache_hit = render_slider({**params, 'image_format': image_format}, cost=render_cost(params))
+    except AdmissionRejected as e:
+        return rejected_response(e)
+    except (RenderPoolSaturated, RenderTimeout) as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Image generation failed: {str(e)}'}), 500
+    
+    if output_format == 'json':
+        response = jsonify(SliderImageGenerator.to_json_result(result))
+    else:
+        response = Response(result['image_bytes'], mimetype=result['mimetype'])
+        response.headers['X-Luminance-Fg'] = str(result['luminance_fg'])
+        response.headers['X-Luminance-Bg'] = str(result['luminance_bg'])
+        response.headers['X-Luminance-Delta'] = str(result['luminance_delta'])
+    
+    response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def generate_slider_image():
+    """
+    Generate a test image with specified parameters.
+    
+    format='json' (default) returns the PNG base64-encoded in JSON; 'png' or
+    'webp' return the raw image with luminance values in X-Luminance-* headers.
+    'svg' and 'layout' (packed dot arrays, see utils.plate_vector) return the
+    dots themselves for clients that draw the plate.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body required'}), 400
+    
+    params, err = validate_slider_params(data)
+    if err:
+        return jsonify({'error': err}), 400
+    
+    output_format = data.get('format', 'json')
+    if output_format not in SLIDER_OUTPUT_FORMATS:
+        return jsonify({'error': 'format must be json, png, webp, svg, or layout'}), 400
+    
+    return slider_image_response(params, output_format)
+
+
+def get_slider_image():
+    """
+    Cacheable GET form of /slider/generate returning the raw image.
+    
+    Seeded requests are redirected to their canonical URL, which is served
+    with long-lived public caching and an ETag derived from the render key.
+    """
+    data, err = parse_slider_query(request.args)
+    if err:
+        return jsonify({'error': err}), 400
+    
+    params, err = validate_slider_params(data)
+    if err:
+        return jsonify({'error': err}), 400
+    
+    image_format = request.args.get('image_format', 'png')
+    if image_format not in SLIDER_IMAGE_FORMATS:
+        return jsonify({'error': 'image_format must be png, webp, svg, or layout'}), 400
+    
+    if params['seed'] is None:
+        response = slider_image_response(params, image_format)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    
+    canonical = canonical_query_string({**params, 'image_format': image_format})
+    if request.query_string.decode() != canonical:
+        return redirect(f'{request.path}?{canonical}', 302)
+    
+    etag = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    response = slider_image_response(params, image_format, etag=etag)
+    if response.status_code == 200:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def compare_slider_image():
+    """
+    Render one layout unsimulated and under several dichromat simulations.
+    
+    layout='separate' (default) returns one base64 image per panel in JSON;
+    layout='sheet' returns a single contact sheet with the panels side by
+    side, as JSON or as a raw image when format is png or webp.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body required'}), 400
+    
+    params, err = validate_slider_params(data)
+    if err:
+        return jsonify({'error': err}), 400
+    
+    dichromat_types = data.get('dichromat_types', list(SliderImageGenerator.DICHROMAT_TYPES))
+    if (not isinstance(dichromat_types, list) or not dichromat_types
+            or not all(t in SliderImageGenerator.DICHROMAT_TYPES for t in dichromat_types)
+            or len(set(dichromat_types)) != len(dichromat_types)):
+        return jsonify({'error': 'dichromat_types must be a non-empty list of distinct dichromat types'}), 400
+    
+    layout = data.get('layout', 'separate')
+    if layout not in ('separate', 'sheet'):
+        return jsonify({'error': 'layout must be separate or sheet'}), 400
+    
+    output_format = data.get('format', 'json')
+    if output_format not in COMPARE_OUTPUT_FORMATS:
+        return jsonify({'error': 'format must be json, png, or webp'}), 400
+    if layout == 'separate' and output_format != 'json':
+        return jsonify({'error': 'separate layout is only available as json'}), 400
+    
+    # Simulation is applied per panel, not to the base render
+    render_params = {k: v for k, v in params.items() if k not in ('simulate_dichromat', 'dichromat_type')}
+    render_params.update({
+        'image_format': 'png' if output_format == 'json' else output_format,
+        'dichromat_types': tuple(dichromat_types),
+        'contact_sheet': layout == 'sheet'
+    })
     
     try:
-        generator = SliderImageGenerator()
-        result = generator.generate(
-            fg_rgb=fg_rgb,
-            bg_rgb=bg_rgb,
-            circle_mean_size=circle_mean_size,
-            circle_size_variance=circle_size_variance,
-            noise_offset=noise_offset,
-            noise_variance=noise_variance,
-            pattern_density=pattern_density,
-            simulate_dichromat=simulate_dichromat,
-            dichromat_type=dichromat_type,
-            seed=seed
+        result, cache_hit = render_slider(
+            render_params,
+            render_fn=render_slider_comparison,
+            extra_key=('compare', layout) + tuple(dichromat_types),
+            # The layout is placed once and rasterized for every panel
+            cost=render_cost(params, panels=len(dichromat_types) + 1)
         )
-        return jsonify(result)
+    except AdmissionRejected as e:
+        return rejected_response(e)
+    except (RenderPoolSaturated, RenderTimeout) as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({'error': f'Image generation failed: {str(e)}'}), 500
+    
+    luminance = {k: result[k] for k in ('luminance_fg', 'luminance_bg', 'luminance_delta')}
+    if output_format != 'json':
+        response = Response(result['image_bytes'], mimetype=result['mimetype'])
+        response.headers['X-Panels'] = ','.join(result['panels'])
+        response.headers['X-Luminance-Fg'] = str(result['luminance_fg'])
+        response.headers['X-Luminance-Bg'] = str(result['luminance_bg'])
+        response.headers['X-Luminance-Delta'] = str(result['luminance_delta'])
+    elif layout == 'sheet':
+        response = jsonify({
+            'panels': result['panels'],
+            'image_base64': base64.b64encode(result['image_bytes']).decode('utf-8'),
+            **luminance
+        })
+    else:
+        response = jsonify({
+            'panels': result['panels'],
+            'images': {
+                name: base64.b64encode(image).decode('utf-8')
+                for name, image in result['images'].items()
+            },
+            **luminance
+        })
+    
+    response.headers['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
 
 
-@api_bp.route('/slider/luminance', methods=['POST'])
 def calculate_luminance_endpoint():
     """Calculate luminance for given RGB values."""
     data = request.get_json()
@@ -91,7 +420,6 @@ def calculate_luminance_endpoint():
     return jsonify({'luminance': round(luminance, 4)})
 
 
-@api_bp.route('/slider/match-luminance', methods=['POST'])
 def match_luminance_endpoint():
     """Calculate foreground G value to match background luminance."""
     data = request.get_json()
@@ -121,61 +449,143 @@ def match_luminance_endpoint():
         return jsonify({'error': f'Luminance matching failed: {str(e)}'}), 500
 
 
-@api_bp.route('/slider/presets', methods=['GET'])
+def calculate_luminance_batch_endpoint():
+    """Calculate luminance for many RGB values in one request."""
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body required'}), 400
+    
+    colors, err = validate_rgb_batch(data.get('colors'), 'colors')
+    if err:
+        return jsonify({'error': err}), 400
+    
+    luminances = np.round(calculate_luminance_batch(colors), 4)
+    return jsonify({'luminances': luminances.tolist()})
+
+
+def match_luminance_batch_endpoint():
+    """
+    Match foreground G values to background luminance for many colours.
+    
+    Accepts fg_colors with either a single bg_rgb shared by all of them or
+    a bg_colors array of the same length.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body required'}), 400
+    
+    fg_colors, err = validate_rgb_batch(data.get('fg_colors'), 'fg_colors')
+    if err:
+        return jsonify({'error': err}), 400
+    
+    if 'bg_colors' in data:
+        bg_colors, err = validate_rgb_batch(data['bg_colors'], 'bg_colors')
+        if err:
+            return jsonify({'error': err}), 400
+        if len(bg_colors) != len(fg_colors):
+            return jsonify({'error': 'bg_colors must have the same length as fg_colors'}), 400
+    else:
+        bg_rgb, err = validate_rgb(data.get('bg_rgb', [145, 145, 145]), 'bg_rgb')
+        if err:
+            return jsonify({'error': err}), 400
+        bg_colors = np.tile(bg_rgb, (len(fg_colors), 1))
+    
+    matched = match_luminance_batch(fg_colors, bg_colors)
+    fg_luminance = calculate_luminance_batch(matched)
+    bg_luminance = calculate_luminance_batch(bg_colors)
+    
+    return jsonify({
+        'matched_fg_rgb': matched.tolist(),
+        'luminance_fg': np.round(fg_luminance, 4).tolist(),
+        'luminance_bg': np.round(bg_luminance, 4).tolist(),
+        'luminance_delta': np.round(np.abs(fg_luminance - bg_luminance), 4).tolist()
+    })
+
+
+def confusable_colors_endpoint():
+    """
+    Search for foregrounds that match bg_rgb in luminance and collapse onto
+    it for the given dichromat type, ranked by simulated distance.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body required'}), 400
+    
+    bg_rgb, err = validate_rgb(data.get('bg_rgb', [145, 145, 145]), 'bg_rgb')
+    if err:
+        return jsonify({'error': err}), 400
+    
+    dichromat_type = data.get('dichromat_type', 'deuteranopia')
+    if dichromat_type not in ('deuteranopia', 'protanopia', 'tritanopia'):
+        return jsonify({'error': 'dichromat_type must be deuteranopia, protanopia, or tritanopia'}), 400
+    
+    luminance_tolerance = data.get('luminance_tolerance', 0.02)
+    if not isinstance(luminance_tolerance, (int, float)) or not 0 <= luminance_tolerance <= 0.10:
+        return jsonify({'error': 'luminance_tolerance must be between 0 and 0.10'}), 400
+    
+    max_simulated_distance = data.get('max_simulated_distance', 20)
+    if not isinstance(max_simulated_distance, (int, float)) or not 0 <= max_simulated_distance <= 100:
+        return jsonify({'error': 'max_simulated_distance must be between 0 and 100'}), 400
+    
+    min_original_distance = data.get('min_original_distance', 20)
+    if not isinstance(min_original_distance, (int, float)) or not 0 <= min_original_distance <= 442:
+        return jsonify({'error': 'min_original_distance must be between 0 and 442'}), 400
+    
+    limit = data.get('limit', 20)
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 100:
+        return jsonify({'error': 'limit must be an integer between 1 and 100'}), 400
+    
+    candidates = find_confusable_colors(
+        tuple(bg_rgb),
+        dichromat_type,
+        float(luminance_tolerance),
+        float(max_simulated_distance),
+        float(min_original_distance),
+        limit,
+        current_app.config.get('SLIDER_CONFUSABLE_GRID_STEP', 4)
+    )
+    
+    return jsonify({
+        'bg_rgb': list(bg_rgb),
+        'luminance_bg': round(calculate_luminance(*bg_rgb), 4),
+        'dichromat_type': dichromat_type,
+        'candidates': list(candidates)
+    })
+
+
+def lookalike_colors_endpoint():
+    """List sRGB colours that simulate to within radius of rgb, from the confusion index."""
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Request body required'}), 400
+    
+    rgb, err = validate_rgb(data.get('rgb'), 'rgb')
+    if err:
+        return jsonify({'error': err}), 400
+    
+    dichromat_type = data.get('dichromat_type', 'deuteranopia')
+    if dichromat_type not in ('deuteranopia', 'protanopia', 'tritanopia'):
+        return jsonify({'error': 'dichromat_type must be deuteranopia, protanopia, or tritanopia'}), 400
+    
+    radius = data.get('radius', 4)
+    if not isinstance(radius, (int, float)) or not 0 <= radius <= 16:
+        return jsonify({'error': 'radius must be between 0 and 16'}), 400
+    
+    limit = data.get('limit', 100)
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 1000:
+        return jsonify({'error': 'limit must be an integer between 1 and 1000'}), 400
+    
+    if confusion_index.index_dir is None:
+        confusion_index.init_app(current_app)
+    
+    try:
+        result = confusion_index.query(tuple(rgb), dichromat_type, float(radius), limit)
+    except ConfusionIndexMissing as e:
+        return jsonify({'error': str(e)}), 503
+    
+    return jsonify({'rgb': rgb, 'dichromat_type': dichromat_type, **result})
+
+
 def get_presets():
     """Get recommended parameter presets."""
-    presets = [
-        {
-            'name': 'Neutral Baseline',
-            'description': 'Recommended starting point for exploration',
-            'params': {
-                'fg_rgb': [150, 120, 140],
-                'bg_rgb': [145, 145, 145],
-                'circle_mean_size': 20,
-                'circle_size_variance': 0.30,
-                'noise_offset': 0.0,
-                'noise_variance': 0.08,
-                'pattern_density': 0.25
-            }
-        },
-        {
-            'name': 'R-High G-Low',
-            'description': 'High red, low green - targets deutans',
-            'params': {
-                'fg_rgb': [175, 115, 145],
-                'bg_rgb': [145, 145, 145],
-                'circle_mean_size': 18,
-                'circle_size_variance': 0.35,
-                'noise_offset': 0.0,
-                'noise_variance': 0.12,
-                'pattern_density': 0.22
-            }
-        },
-        {
-            'name': 'R-Low G-High',
-            'description': 'Low red, high green - alternative deutan target',
-            'params': {
-                'fg_rgb': [125, 165, 145],
-                'bg_rgb': [145, 145, 145],
-                'circle_mean_size': 22,
-                'circle_size_variance': 0.25,
-                'noise_offset': 0.0,
-                'noise_variance': 0.10,
-                'pattern_density': 0.28
-            }
-        },
-        {
-            'name': 'High Noise Challenge',
-            'description': 'Higher noise for harder detection',
-            'params': {
-                'fg_rgb': [165, 125, 140],
-                'bg_rgb': [145, 145, 145],
-                'circle_mean_size': 16,
-                'circle_size_variance': 0.40,
-                'noise_offset': 0.0,
-                'noise_variance': 0.18,
-                'pattern_density': 0.20
-            }
-        }
-    ]
-    return jsonify({'presets': presets})
+    return jsonify({'presets': SliderImageGenerator.PRESETS})
@@ -1,13 +1,26 @@
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from flask import request, jsonify, Response, current_app, send_from_directory
+from sqlalchemy.orm.exc import StaleDataError
 from . import api_bp
 from models import db
 from models.test_session import TestSession
-from models.answer import Answer
-from services.image_generator import ImageGenerator
+from models.legacy_plate import LegacyPlate
+from services import answer_store
 from services.results_analyzer import ResultsAnalyzer
-from services.image_selector import ImageSelector
+from services.read_replica import read_router
+from services.admission import admission, AdmissionRejected
+from services.single_flight import single_flight
+from services.layout_bank import layout_bank
+from services.image_pool import image_pool
+from services.session_token import InvalidSessionToken, fits_token, issue_token, verify_token
+from services.render_pool import (
+    render_pool,
+    render_test_image,
+    render_test_vector,
+    RenderPoolSaturated,
+    RenderTimeout
+)
 
 
 def error_response(code: str, message: str, status: int, details=None):
@@ -20,24 +33,98 @@ def error_response(code: str, message: str, status: int, details=None):
     }), status
 
 
+def session_expired(created_at: datetime) -> bool:
+    expiry_hours = current_app.config.get('SESSION_EXPIRY_HOURS', 24)
+    created_at = created_at.replace(tzinfo=timezone.utc) if created_at.tzinfo is None else created_at
+    return datetime.now(timezone.utc) - created_at > timedelta(hours=expiry_hours)
+
+
+def session_error(session: TestSession):
+    """Error response for a missing or expired session, or None."""
+    if not session:
+        return error_response('SESSION_NOT_FOUND', 'The requested session does not exist', 404)
+
+    if session_expired(session.created_at):
+        return error_response('SESSION_EXPIRED', 'Session has expired', 410)
+
+    return None
+
+
 def get_session_or_error(session_id: str):
     session = db.session.get(TestSession, session_id)
-    if not session:
-        return None, error_response('SESSION_NOT_FOUND', 'The requested session does not exist', 404)
+    err = session_error(session)
+    return (None, err) if err else (session, None)
 
-    expiry_hours = current_app.config.get('SESSION_EXPIRY_HOURS', 24)
-    created_at = session.created_at.replace(tzinfo=timezone.utc) if session.created_at.tzinfo is None else session.created_at
-    if datetime.now(timezone.utc) - created_at > timedelta(hours=expiry_hours):
+
+def get_token_claims_or_error(session_id: str):
+    """
+    Claims of the session token sent with an image request, checked without
+    the database. Returns (None, None) if tokens are disabled or none was
+    sent, so the caller falls back to loading the session.
+    """
+    token = request.args.get('token') or request.headers.get('X-Session-Token')
+    if not token or not current_app.config.get('SESSION_TOKENS_ENABLED'):
+        return None, None
+
+    try:
+        claims = verify_token(current_app.config['SECRET_KEY'], token)
+    except InvalidSessionToken:
+        return None, error_response('INVALID_SESSION_TOKEN', 'Session token is invalid', 401)
+    if claims.session_id != session_id:
+        return None, error_response('INVALID_SESSION_TOKEN', 'Session token belongs to another session', 401)
+    if session_expired(claims.created_at):
         return None, error_response('SESSION_EXPIRED', 'Session has expired', 410)
 
-    return session, None
+    return claims, None
+
+
+def admit_plate_render():
+    """Charge one rendered test plate to admission control; pooled PNGs are free."""
+    from services.image_generator import ImageGenerator
+    admission.admit_request(ImageGenerator.estimate_dot_count() / 1000)
+
+
+def render_plate(render_fn, *args) -> bytes:
+    """
+    Render a test plate in the render pool, once for all identical requests
+    in flight (e.g. a client retrying a slow plate). Only the request that
+    actually renders is charged to admission control; if it is shed, the
+    requests waiting on it are admitted on their own.
+    """
+    def render():
+        admit_plate_render()
+        return render_pool.run(render_fn, *args)
+
+    image_bytes, _ = single_flight.do(('test_plate', render_fn.__name__) + args, render,
+                                      unshared_errors=(AdmissionRejected,))
+    return image_bytes
+
+
+def layout_bank_args(bank_id):
+    """
+    (layout_bank_id, layout_bank_dir) render arguments for plates placed from
+    bank_id, or (None, None) to place dots live if that is not the configured bank.
+    """
+    if bank_id is None or bank_id != layout_bank.bank_id:
+        return None, None
+    return bank_id, str(layout_bank.bank_dir)
+
 
+def get_legacy_plate(session_id: str, image_number: int):
+    """Backfilled plate of a pre-pool session, if its file is in place."""
+    plate = db.session.get(LegacyPlate, (session_id, image_number))
+    if plate is None:
+        return None, None
+    plate_dir = Path(current_app.config['LEGACY_PLATE_DIR'])
+    if not (plate_dir / plate.filename).is_file():
+        current_app.logger.warning(f"Backfilled plate file missing: {plate.filename}")
+        return None, None
+    return plate, plate_dir
 
-def get_image_selector():
-    """Get ImageSelector instance with metadata."""
-    # Determine metadata path relative to backend directory
-    backend_dir = Path(__file__).parent.parent
-    metadata_path = backend_dir / 'static' / 'test_images' / 'metadata.json'
+
+def get_image_selector(pool_version=None):
+    """Get the cached ImageSelector of a pool version (None = unversioned pool)."""
+    metadata_path = image_pool.metadata_path(pool_version)
 
     if not metadata_path.exists():
         raise FileNotFoundError(
@@ -45,7 +132,7 @@ def get_image_selector():
             "Please run: python backend/scripts/generate_images.py"
         )
 
-    return ImageSelector(str(metadata_path))
+    return image_pool.selector(pool_version)
 
 
 @api_bp.route('/test/start', methods=['POST'])
@@ -65,21 +152,35 @@ def start_test():
 
         # Generate image mapping using ImageSelector
         try:
-            selector = get_image_selector()
+            # The session stays on this pool version after later rollovers
+            pool_version = image_pool.current_version()
+            selector = get_image_selector(pool_version)
             # Get mapping of test image numbers (1-10) to pregenerated image IDs (0-99)
             image_mapping = selector.get_session_image_mapping(session.id)
-            # Convert keys to strings for JSON storage
-            session.image_mapping = {str(k): v for k, v in image_mapping.items()}
+            session.pool_version = pool_version
         except FileNotFoundError as e:
             # Fall back to None if images haven't been generated yet
             # This allows backward compatibility with on-the-fly generation
             current_app.logger.warning(f"Pregenerated images not found: {e}")
-            session.image_mapping = None
+            image_mapping = None
+            # Plates are placed from the bank configured now for the whole session
+            session.layout_bank = layout_bank.bank_id
+
+        # Stored as JSON + Answer rows or as one packed row, per ANSWER_STORAGE
+        answer_store.init_session_storage(session, image_mapping)
 
         db.session.add(session)
         db.session.commit()
 
-        return jsonify(session.to_dict()), 201
+        response = session.to_dict()
+        if image_mapping and current_app.config.get('SESSION_TOKENS_ENABLED') and fits_token(image_mapping):
+            # Lets image requests skip the database, see services/session_token.py.
+            # Sessions without one read the session for every image as before
+            response['session_token'] = issue_token(
+                current_app.config['SECRET_KEY'], session.id, session.created_at,
+                session.pool_version, image_mapping
+            )
+        return jsonify(response), 201
 
     except Exception as e:
         db.session.rollback()
@@ -88,21 +189,35 @@ def start_test():
 
 @api_bp.route('/test/<session_id>/image/<int:image_number>', methods=['GET'])
 def get_image(session_id: str, image_number: int):
-    session, err = get_session_or_error(session_id)
+    claims, err = get_token_claims_or_error(session_id)
+    if claims is None and err is None:
+        session, err = get_session_or_error(session_id)
     if err:
         return err
 
     if image_number < 1 or image_number > 10:
         return error_response('INVALID_IMAGE_NUMBER', 'Image number must be between 1 and 10', 400)
 
+    # ?format=svg|layout returns an on-the-fly plate's dots for clients that draw plates themselves
+    output_format = request.args.get('format', 'png')
+    if output_format != 'png':
+        # Imported on demand so workers serving pooled PNGs never load numpy
+        from utils.plate_vector import VECTOR_FORMATS, VECTOR_MIMETYPES
+        if output_format not in VECTOR_FORMATS:
+            return error_response('VALIDATION_ERROR', 'format must be png, svg, or layout', 400)
+
     try:
         # Check if session has pregenerated image mapping
-        if session.image_mapping:
-            # Use pregenerated images
-            selector = get_image_selector()
+        if claims is not None:
+            image_mapping, pool_version = claims.image_mapping, claims.pool_version
+        else:
+            image_mapping, pool_version = answer_store.get_image_mapping(session), session.pool_version
+        if image_mapping:
+            # Use pregenerated images of the session's pool version
+            selector = get_image_selector(pool_version)
 
             # Get the pregenerated image ID for this test image number
-            image_id = session.image_mapping.get(str(image_number))
+            image_id = image_mapping.get(str(image_number))
             if image_id is None:
                 return error_response('IMAGE_MAPPING_ERROR', 'Image mapping not found for this image number', 500)
 
@@ -111,43 +226,88 @@ def get_image(session_id: str, image_number: int):
             if not image_info:
                 return error_response('IMAGE_NOT_FOUND', f'Pregenerated image {image_id} not found', 500)
 
+            if output_format != 'png':
+                # Re-placing a pooled plate's dots would not reliably match
+                # the PNG generate_images.py rendered, so pools only serve PNGs
+                return error_response('VALIDATION_ERROR', 'Pre-generated plates are only available as png', 400)
+
             # Serve static image file
-            backend_dir = Path(__file__).parent.parent
-            static_dir = backend_dir / 'static' / 'test_images'
+            static_dir = image_pool.version_dir(pool_version)
 
             response = send_from_directory(
                 str(static_dir),
                 image_info['filename'],
                 mimetype='image/png'
             )
+            etag = image_info['sha256'][:16]  # Use first 16 chars of hash as ETag
 
             # Set cache headers and metadata headers
             response.headers['Cache-Control'] = 'private, max-age=3600'
-            response.headers['ETag'] = image_info['sha256'][:16]  # Use first 16 chars of hash as ETag
+            response.headers['ETag'] = etag
             response.headers['X-Dichromism-Type'] = image_info['dichromism_type']
             response.headers['X-Image-ID'] = str(image_id)
 
             return response
 
+        plate, plate_dir = get_legacy_plate(session_id, image_number) if output_format == 'png' else (None, None)
+        if plate is not None:
+            # Pre-pool session whose plates were rendered by backfill_legacy_plates.py
+            response = send_from_directory(str(plate_dir), plate.filename, mimetype='image/png')
+            response.headers['Cache-Control'] = 'private, max-age=3600'
+            response.headers['ETag'] = plate.sha256[:16]
+            response.headers['X-Dichromism-Type'] = plate.dichromism_type
+            return response
+
         else:
             # Fall back to on-the-fly generation for backward compatibility
             current_app.logger.info(f"Using on-the-fly generation for session {session_id}")
 
-            generator = ImageGenerator(current_app.config.get('RANDOM_SEED_SALT', 'dicrhomat-salt'))
+            from services.image_generator import ImageGenerator
+            seed_salt = current_app.config.get('RANDOM_SEED_SALT', 'dicrhomat-salt')
+            generator = ImageGenerator(seed_salt)
             config = generator.get_test_config(session_id, image_number)
-            image_bytes = generator.generate_test_image(
-                session_id,
-                image_number,
-                config['dichromism_type'],
-                config['correct_answer']
-            )
-
-            response = Response(image_bytes, mimetype='image/png')
+            # Dots come from the layout bank the session started with; sessions
+            # from before the bank keep live placement, as their backfill does
+            bank_args = layout_bank_args(session.layout_bank)
+            if output_format == 'png':
+                image_bytes = render_plate(
+                    render_test_image,
+                    seed_salt,
+                    session_id,
+                    image_number,
+                    config['dichromism_type'],
+                    config['correct_answer'],
+                    *bank_args
+                )
+                mimetype = 'image/png'
+            else:
+                image_bytes = render_plate(
+                    render_test_vector,
+                    seed_salt,
+                    session_id,
+                    image_number,
+                    config['dichromism_type'],
+                    config['correct_answer'],
+                    output_format,
+                    *bank_args
+                )
+                mimetype = VECTOR_MIMETYPES[output_format]
+
+            response = Response(image_bytes, mimetype=mimetype)
             response.headers['Cache-Control'] = 'private, max-age=3600'
             response.headers['X-Dichromism-Type'] = config['dichromism_type']
 
             return response
 
+    except AdmissionRejected as e:
+        response, status = error_response('RATE_LIMITED', 'Too many image renders, please retry later', 429,
+                                          {'scope': e.scope})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, status
+    except (RenderPoolSaturated, RenderTimeout) as e:
+        response, status = error_response('SERVICE_BUSY', 'Image renderer is busy, please retry shortly', 503)
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, status
     except Exception as e:
         return error_response('IMAGE_GENERATION_FAILED', 'Failed to serve image', 500, str(e))
 
@@ -172,18 +332,18 @@ def submit_answer(session_id: str):
         if not isinstance(user_answer, int) or user_answer < 0 or user_answer > 99:
             return error_response('VALIDATION_ERROR', 'User answer must be integer 0-99 or null', 400)
 
-    existing = Answer.query.filter_by(session_id=session_id, image_number=image_number).first()
-    if existing:
+    if answer_store.has_answer(session, image_number):
         return error_response('ANSWER_ALREADY_EXISTS', 'This image has already been answered', 409)
 
     try:
         # Get correct answer and dichromism type
-        if session.image_mapping:
+        image_mapping = answer_store.get_image_mapping(session)
+        if image_mapping:
             # Use pregenerated image metadata
-            selector = get_image_selector()
+            selector = get_image_selector(session.pool_version)
 
             # Get the pregenerated image ID
-            image_id = session.image_mapping.get(str(image_number))
+            image_id = image_mapping.get(str(image_number))
             if image_id is None:
                 return error_response('IMAGE_MAPPING_ERROR', 'Image mapping not found for this image number', 500)
 
@@ -195,22 +355,20 @@ def submit_answer(session_id: str):
             correct_answer = image_info['correct_answer']
             dichromism_type = image_info['dichromism_type']
 
+        elif (plate := db.session.get(LegacyPlate, (session_id, image_number))) is not None:
+            # Parameters recorded by the legacy plate backfill
+            correct_answer = plate.correct_answer
+            dichromism_type = plate.dichromism_type
+
         else:
             # Fall back to on-the-fly generation for backward compatibility
+            from services.image_generator import ImageGenerator
             generator = ImageGenerator(current_app.config.get('RANDOM_SEED_SALT', 'dicrhomat-salt'))
             config = generator.get_test_config(session_id, image_number)
             correct_answer = config['correct_answer']
             dichromism_type = config['dichromism_type']
 
-        answer = Answer(
-            session_id=session_id,
-            image_number=image_number,
-            correct_answer=correct_answer,
-            user_answer=user_answer,
-            dichromism_type=dichromism_type
-        )
-
-        db.session.add(answer)
+        answer_store.save_answer(session, image_number, correct_answer, user_answer, dichromism_type)
 
         is_complete = False
         if image_number == 10:
@@ -218,6 +376,9 @@ def submit_answer(session_id: str):
             is_complete = True
 
         db.session.commit()
+        if is_complete:
+            # The results request that follows must not hit a lagging replica
+            read_router.mark_written(session_id)
 
         return jsonify({
             'success': True,
@@ -227,6 +388,10 @@ def submit_answer(session_id: str):
             'results_available': is_complete
         }), 201
 
+    except StaleDataError:
+        # Another answer for this packed session was committed first
+        db.session.rollback()
+        return error_response('CONCURRENT_UPDATE', 'Session was updated concurrently, please retry', 409)
     except Exception as e:
         db.session.rollback()
         return error_response('DATABASE_ERROR', 'Failed to save answer', 500, str(e))
@@ -234,17 +399,33 @@ def submit_answer(session_id: str):
 
 @api_bp.route('/test/<session_id>/results', methods=['GET'])
 def get_results(session_id: str):
-    session, err = get_session_or_error(session_id)
+    def load(read_db):
+        session = read_db.get(TestSession, session_id)
+        return (session, answer_store.load_answers(read_db, session_id)) if session else (None, None)
+
+    def settled(result):
+        # A completed copy has all answers, since they are committed together.
+        # An incomplete one is trusted unless the session was written within
+        # the read-your-writes window, possibly by another worker
+        session, answers = result
+        if session is None:
+            return False
+        return session.completed_at is not None or not read_router.written_within_window(
+            answer_store.last_written_at(session, answers)
+        )
+
+    # Results are read-only, so the session and its answers may come from the
+    # read replica; sessions this worker just completed are read from the primary
+    session, answers = read_router.read(load, key=session_id, is_fresh=settled)
+    err = session_error(session)
     if err:
         return err
     
-    answers = Answer.query.filter_by(session_id=session_id).order_by(Answer.image_number).all()
-    
     if len(answers) < 10:
         return error_response('TEST_INCOMPLETE', 'Test not yet completed', 409)
     
     try:
-        analyzer = ResultsAnalyzer()
+        analyzer = ResultsAnalyzer.from_config(current_app.config)
         analysis = analyzer.analyze_session(answers)
         
         total_correct = sum(1 for a in answers if a.user_answer == a.correct_answer)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Backfill plates for sessions created before the image pool existed.
+
+Sessions with no image mapping were served by rendering each plate live.
+This script renders their ten plates once with the original seed, writes
+them under LEGACY_PLATE_DIR and records each plate's file, hash, correct
+answer and type in the legacy_plate table. After it has run, fetching and
+answering those sessions' plates no longer renders anything. Correct
+answers are unchanged.
+
+Sessions are processed in batches, each committed on its own, so the
+script can be interrupted and started again; backfilled sessions are
+skipped. Expired sessions cannot be fetched any more and are skipped too
+unless --include-expired is given.
+
+Usage:
+    python backend/scripts/backfill_legacy_plates.py [OPTIONS]
+
+Options:
+    --batch-size NUM    Sessions per batch and commit (default: 100)
+    --workers NUM       Render processes, 0 renders inline (default: 4)
+    --output-dir DIR    Plate directory (default: LEGACY_PLATE_DIR from config)
+    --include-expired   Also backfill sessions past SESSION_EXPIRY_HOURS
+    --dry-run           Only count the sessions that would be backfilled
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from models import db
+from models.legacy_plate import LegacyPlate
+from services.legacy_backfill import backfill, legacy_sessions_query
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Backfill plates for sessions created before the image pool',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=100,
+        help='Sessions per batch and commit (default: 100)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Render processes, 0 renders inline (default: 4)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default=None,
+        help='Plate directory (default: LEGACY_PLATE_DIR from config)'
+    )
+    parser.add_argument(
+        '--include-expired',
+        action='store_true',
+        help='Also backfill sessions past SESSION_EXPIRY_HOURS'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only count the sessions that would be backfilled'
+    )
+
+    args = parser.parse_args()
+
+    if args.batch_size < 1 or args.workers < 0:
+        print("Error: --batch-size must be at least 1 and --workers at least 0")
+        sys.exit(1)
+
+    app = create_app()
+
+    with app.app_context():
+        plate_dir = args.output_dir or app.config['LEGACY_PLATE_DIR']
+        seed_salt = app.config.get('RANDOM_SEED_SALT', 'dicrhomat-salt')
+        expiry_hours = None if args.include_expired else app.config.get('SESSION_EXPIRY_HOURS', 24)
+
+        print("Backfilling plates for sessions without an image mapping")
+        print(f"Output directory: {Path(plate_dir).absolute()}")
+        print(f"Workers: {args.workers}")
+        print("-" * 60)
+
+        if args.dry_run:
+            # Before the first run the legacy_plate table may not exist yet
+            table_exists = db.inspect(db.engine).has_table(LegacyPlate.__tablename__)
+            pending = legacy_sessions_query(expiry_hours, skip_backfilled=table_exists).count()
+            print(f"{pending} sessions would be backfilled")
+            return
+
+        start = time.time()
+        try:
+            result = backfill(
+                plate_dir,
+                seed_salt,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                expiry_hours=expiry_hours,
+                progress=lambda sessions, plates: print(
+                    f"  {sessions} sessions ({plates} plates) | {time.time() - start:.1f}s"
+                )
+            )
+        except Exception as e:
+            print(f"✗ Backfill failed: {e}")
+            sys.exit(1)
+
+        print("-" * 60)
+        print(f"✓ Backfilled {result['sessions']} sessions ({result['plates']} plates) "
+              f"in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
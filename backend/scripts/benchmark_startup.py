@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start-up time of the Flask app.
+
+Each run starts a fresh interpreter, imports app and calls create_app(), so
+the numbers reflect what a recycled or newly scaled worker pays before it can
+serve its first request. The first request to /health and to a slider
+endpoint is timed too, to show what deferred imports cost when first used.
+
+Usage:
+    python backend/scripts/benchmark_startup.py [OPTIONS]
+
+Options:
+    --runs NUM              Number of cold starts (default: 10)
+    --config NAME           Config name passed to create_app (default: production)
+    --database-url URL      Database for the app (default: temporary SQLite file)
+    --top NUM               Also list the NUM slowest imports of one run (default: 0)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+CHILD_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({config!r})
+created = time.perf_counter()
+client = app.test_client()
+client.get('/health')
+first_request = time.perf_counter()
+client.get('/api/slider/presets')
+first_slider = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'first_request_ms': (first_request - created) * 1000,
+    'first_slider_ms': (first_slider - first_request) * 1000,
+}}))
+"""
+
+
+def child_env(args) -> dict:
+    env = dict(os.environ)
+    env['DATABASE_URL'] = args.database_url
+    # Keep background work out of the measurement
+    env['SLIDER_CACHE_PREWARM'] = 'false'
+    env['POOL_VERIFY_ON_STARTUP'] = 'false'
+    env['POOL_VERIFY_INTERVAL'] = '0'
+    return env
+
+
+def run_once(args, extra_flags=()) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra_flags, '-c', CHILD_SCRIPT.format(config=args.config)],
+        cwd=BACKEND_DIR,
+        env=child_env(args),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def print_top_imports(stderr: str, top: int):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split(':', 1)[1].split('|')
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    print("\nSlowest imports (cumulative):")
+    for cumulative_us, name in rows[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark cold start-up time of the Flask app',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=10,
+        help='Number of cold starts (default: 10)'
+    )
+    parser.add_argument(
+        '--config',
+        default='production',
+        help='Config name passed to create_app (default: production)'
+    )
+    parser.add_argument(
+        '--database-url',
+        default=None,
+        help='Database for the app (default: temporary SQLite file)'
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=0,
+        help='Also list the NUM slowest imports of one run (default: 0)'
+    )
+
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        print("Error: --runs must be at least 1")
+        sys.exit(1)
+
+    tmp_dir = None
+    if args.database_url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{Path(tmp_dir.name) / 'startup.db'}"
+
+    print(f"Benchmarking create_app('{args.config}') over {args.runs} cold starts")
+    print(f"Database: {args.database_url}")
+    print("-" * 60)
+
+    samples = []
+    for i in range(args.runs):
+        result = json.loads(run_once(args).stdout.strip().splitlines()[-1])
+        samples.append(result)
+        print(f"[{i+1:3d}/{args.runs}] import {result['import_ms']:7.1f} ms | create_app {result['create_ms']:6.1f} ms")
+
+    print("-" * 60)
+    for key, label in (('import_ms', 'import app'), ('create_ms', 'create_app()'),
+                       ('first_request_ms', 'first /health'), ('first_slider_ms', 'first slider request')):
+        values = sorted(s[key] for s in samples)
+        print(f"{label:22} median {statistics.median(values):7.1f} ms | max {values[-1]:7.1f} ms")
+    total = sorted(s['import_ms'] + s['create_ms'] for s in samples)
+    print(f"\n✓ Cold start to ready: median {statistics.median(total):.1f} ms")
+
+    if args.top > 0:
+        print_top_imports(run_once(args, ('-X', 'importtime')).stderr, args.top)
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
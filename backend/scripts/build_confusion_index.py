@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Build the dichromat confusion index used by /api/slider/lookalikes.
+
+Every sRGB colour is simulated once per dichromat type and grouped by its
+quantized simulated colour. The result is written as memory-mappable .npy
+files (about 65 MB per type for the full cube) that the API reads lazily.
+
+Usage:
+    python backend/scripts/build_confusion_index.py [OPTIONS]
+
+Options:
+    --output-dir DIR    Index directory (default: CONFUSION_INDEX_DIR from config)
+    --types TYPE ...    Dichromat types to build (default: all three)
+    --bin-size N        Bucket edge length in simulated sRGB levels (default: 4)
+    --source-step N     Sample every N-th level per channel; 1 is the full cube (default: 1)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from services.confusion_index import build_index, DICHROMAT_TYPES, DEFAULT_BIN_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build the dichromat confusion index',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--output-dir',
+        default=Config.CONFUSION_INDEX_DIR,
+        help='Index directory (default: CONFUSION_INDEX_DIR from config)'
+    )
+    parser.add_argument(
+        '--types',
+        nargs='+',
+        default=list(DICHROMAT_TYPES),
+        choices=DICHROMAT_TYPES,
+        help='Dichromat types to build (default: all three)'
+    )
+    parser.add_argument(
+        '--bin-size',
+        type=int,
+        default=DEFAULT_BIN_SIZE,
+        help=f'Bucket edge length in simulated sRGB levels (default: {DEFAULT_BIN_SIZE})'
+    )
+    parser.add_argument(
+        '--source-step',
+        type=int,
+        default=1,
+        help='Sample every N-th level per channel; 1 is the full cube (default: 1)'
+    )
+
+    args = parser.parse_args()
+
+    if not 1 <= args.bin_size <= 64:
+        print("Error: --bin-size must be between 1 and 64")
+        sys.exit(1)
+    if not 1 <= args.source_step <= 64:
+        print("Error: --source-step must be between 1 and 64")
+        sys.exit(1)
+
+    print(f"Building confusion index in {args.output_dir}")
+    print(f"Types: {', '.join(args.types)}")
+    print(f"Bin size: {args.bin_size}, source step: {args.source_step}")
+    print("-" * 60)
+
+    for dichromat_type in args.types:
+        start = time.time()
+        summary = build_index(args.output_dir, [dichromat_type], args.bin_size, args.source_step)[dichromat_type]
+        print(
+            f"✓ {dichromat_type}: {summary['sources']:,} colours in "
+            f"{summary['occupied_buckets']:,} buckets (largest {summary['max_bucket']:,}) "
+            f"in {time.time() - start:.1f}s"
+        )
+
+    print("-" * 60)
+    print("✓ Confusion index built")
+
+
+if __name__ == '__main__':
+    main()
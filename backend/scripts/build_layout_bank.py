@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Build the dot layout bank used for test plates.
+
+Places K dot layouts (positions and sizes) once and writes them as
+memory-mappable .npy files. On-the-fly plates then pick a layout by seed
+and only colour its dots, instead of placing 2000-3000 dots per render.
+Pass the bank to generate_images.py with --layout-bank to build an image
+pool from it as well.
+
+Rebuilding replaces the bank; pools built from the old bank keep working
+but their vector re-renders fall back to live placement.
+
+Usage:
+    python backend/scripts/build_layout_bank.py [OPTIONS]
+
+Options:
+    --output-dir DIR    Bank directory (default: DOT_LAYOUT_BANK_DIR from config)
+    --count NUM         Number of layouts (default: 512)
+    --seed SEED         Seed of the build; the same seed builds the same bank
+    --workers NUM       Placement processes, 0 places inline (default: 4)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from services.layout_bank import build_bank, DEFAULT_LAYOUT_COUNT
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build the dot layout bank for test plates',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--output-dir',
+        default=Config.DOT_LAYOUT_BANK_DIR,
+        help='Bank directory (default: DOT_LAYOUT_BANK_DIR from config)'
+    )
+    parser.add_argument(
+        '--count',
+        type=int,
+        default=DEFAULT_LAYOUT_COUNT,
+        help=f'Number of layouts (default: {DEFAULT_LAYOUT_COUNT})'
+    )
+    parser.add_argument(
+        '--seed',
+        default='layout-bank',
+        help='Seed of the build (default: layout-bank)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Placement processes, 0 places inline (default: 4)'
+    )
+
+    args = parser.parse_args()
+
+    if args.count < 1 or args.workers < 0:
+        print("Error: --count must be at least 1 and --workers at least 0")
+        sys.exit(1)
+
+    print(f"Building layout bank in {args.output_dir}")
+    print(f"Layouts: {args.count}, seed: {args.seed}, workers: {args.workers}")
+    print("-" * 60)
+
+    start = time.time()
+    step = max(1, args.count // 10)
+
+    def progress(done):
+        if done % step == 0 or done == args.count:
+            print(f"  {done}/{args.count} layouts | {time.time() - start:.1f}s")
+
+    manifest = build_bank(args.output_dir, args.count, args.seed, args.workers, progress)
+
+    print("-" * 60)
+    print(
+        f"✓ Layout bank {manifest['bank_id']} built: {manifest['layouts']} layouts, "
+        f"{manifest['total_dots']:,} dots ({manifest['total_dots'] / manifest['layouts']:.0f} per layout) "
+        f"in {time.time() - start:.1f}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
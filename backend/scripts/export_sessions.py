@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Export sessions and their answers for research.
+
+Streams NDJSON (one session per line with its answers) or CSV (one row per
+answer) in keyset-paginated batches, so memory use does not grow with the
+size of the export. Reads go to the read replica when READ_REPLICA_URL is
+set. Produces the same output as GET /api/export/sessions.
+
+Usage:
+    python backend/scripts/export_sessions.py [OPTIONS]
+
+Options:
+    --format FORMAT     ndjson or csv (default: ndjson)
+    --output FILE       Output file (default: stdout)
+    --gzip              Compress the output with gzip
+    --from DATE         Only sessions created at or after DATE (ISO 8601, UTC)
+    --to DATE           Only sessions created before DATE (ISO 8601, UTC)
+    --status STATUS     Only completed or incomplete sessions
+    --batch-size NUM    Sessions per batch (default: EXPORT_BATCH_SIZE from config)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from services.read_replica import read_router
+from services.session_export import (
+    EXPORT_FORMATS,
+    EXPORT_STATUSES,
+    ExportFilters,
+    parse_timestamp,
+    stream_export
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export sessions and their answers',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--format',
+        choices=EXPORT_FORMATS,
+        default='ndjson',
+        help='Output format (default: ndjson)'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='Output file (default: stdout)'
+    )
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Compress the output with gzip'
+    )
+    parser.add_argument(
+        '--from',
+        dest='created_from',
+        type=parse_timestamp,
+        default=None,
+        help='Only sessions created at or after this date (ISO 8601, UTC)'
+    )
+    parser.add_argument(
+        '--to',
+        dest='created_to',
+        type=parse_timestamp,
+        default=None,
+        help='Only sessions created before this date (ISO 8601, UTC)'
+    )
+    parser.add_argument(
+        '--status',
+        choices=EXPORT_STATUSES,
+        default=None,
+        help='Only completed or incomplete sessions'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=None,
+        help='Sessions per batch (default: EXPORT_BATCH_SIZE from config)'
+    )
+
+    args = parser.parse_args()
+
+    if args.batch_size is not None and args.batch_size < 1:
+        print("Error: --batch-size must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    app = create_app()
+    filters = ExportFilters(args.created_from, args.created_to, args.status)
+
+    with app.app_context():
+        batch_size = args.batch_size or app.config.get('EXPORT_BATCH_SIZE', 1000)
+        # Progress goes to stderr so the export itself can be piped
+        out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        start = time.time()
+        written = 0
+        try:
+            with read_router.reporting_session() as db_session:
+                for chunk in stream_export(db_session, args.format, filters, batch_size, args.gzip):
+                    out.write(chunk)
+                    written += len(chunk)
+        except Exception as e:
+            print(f"✗ Export failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if args.output:
+                out.close()
+            else:
+                out.flush()
+
+        print(f"✓ Exported {written} bytes in {time.time() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,12 @@ Generate pre-computed test images for Dicrhomat application.
 This script generates 100 static test images and their metadata to replace
 on-the-fly image generation with pre-generated static assets.
 
+Each finished image is appended to a JSONL journal next to the metadata file
+(metadata.jsonl), which is fsynced periodically. When every image is done the
+journal is compacted into metadata.json with an atomic rename and removed.
+If a build is interrupted, running the script again resumes from the journal
+and only generates the missing images. Memory use does not grow with --count.
+
 Usage:
     python backend/scripts/generate_images.py [OPTIONS]
 
@@ -12,14 +18,23 @@ Options:
     --output-dir DIR    Directory for generated images (default: backend/static/test_images)
     --count NUM         Number of images to generate (default: 100)
     --format FORMAT     Image format: png or jpeg (default: png)
-    --seed SEED         Random seed for reproducibility (default: current timestamp)
+    --seed SEED         Random seed for reproducibility (default: current timestamp,
+                        or the journal's seed when resuming)
     --metadata-file FILE Metadata output path (default: output-dir/metadata.json)
+    --fsync-every NUM   Records between journal fsyncs (default: 10)
+    --restart           Discard an existing journal instead of resuming it
+    --layout-bank DIR   Take dot layouts from a bank built by build_layout_bank.py
+                        instead of placing them live; recorded in the metadata so
+                        vector re-renders of the pool use the same bank
 """
 
 import argparse
 import json
 import hashlib
+import os
 import sys
+from array import array
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
@@ -27,6 +42,10 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.image_generator import ImageGenerator
+from services.layout_bank import LayoutBank
+
+
+METADATA_VERSION = '1.0'
 
 
 def generate_random_answer(image_id: int, seed: str) -> int:
@@ -37,6 +56,100 @@ def generate_random_answer(image_id: int, seed: str) -> int:
     return rng.randint(10, 89)
 
 
+def dichromism_type_for(image_id: int) -> str:
+    """Pool layout: 30 protanopia, 30 deuteranopia, 30 tritanopia, then control."""
+    if image_id < 30:
+        return 'protanopia'
+    elif image_id < 60:
+        return 'deuteranopia'
+    elif image_id < 90:
+        return 'tritanopia'
+    return 'control'
+
+
+def journal_path_for(metadata_path: Path) -> Path:
+    return metadata_path.with_suffix('.jsonl')
+
+
+def read_journal(journal_path: Path):
+    """
+    Read a build journal.
+
+    Returns (header, done) where done maps image id to (file_size, sha256) of
+    its latest record. A torn last line from a crash is truncated away so
+    that appended records start on a fresh line.
+    """
+    header = None
+    done = {}
+    with open(journal_path, 'rb+') as f:
+        valid_bytes = 0
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if not line.endswith(b'\n'):
+                break
+            valid_bytes += len(line)
+            if header is None:
+                header = record
+            else:
+                done[record['id']] = (record['file_size'], record['sha256'])
+        f.truncate(valid_bytes)
+    return header, done
+
+
+def finalize_metadata(journal_path: Path, metadata_path: Path) -> dict:
+    """
+    Compact a complete journal into metadata.json atomically.
+
+    Records are streamed back from the journal in id order using an index of
+    line offsets, so memory stays bounded by one offset per image. Returns
+    summary counters for reporting.
+    """
+    with open(journal_path, 'rb') as f:
+        header = json.loads(f.readline())
+        count = header['total_images']
+        offsets = array('q', [-1]) * count
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            offsets[record['id']] = offset
+
+        missing = [i for i in range(count) if offsets[i] < 0]
+        if missing:
+            raise ValueError(f"Journal is missing {len(missing)} images (first: {missing[0]})")
+
+        summary = {'total_bytes': 0, 'types': Counter()}
+        tmp_path = metadata_path.with_name(metadata_path.name + '.tmp')
+        with open(tmp_path, 'w') as out:
+            out.write('{\n')
+            for key in ('version', 'generated_at', 'total_images', 'seed', 'layout_bank'):
+                if key in header:
+                    out.write(f'  {json.dumps(key)}: {json.dumps(header[key])},\n')
+            out.write('  "images": [')
+            for i in range(count):
+                f.seek(offsets[i])
+                record = json.loads(f.readline())
+                summary['total_bytes'] += record['file_size']
+                summary['types'][record['dichromism_type']] += 1
+                entry = json.dumps(record, indent=2).replace('\n', '\n    ')
+                out.write(('\n    ' if i == 0 else ',\n    ') + entry)
+            out.write('\n  ]\n}')
+            out.flush()
+            os.fsync(out.fileno())
+
+    os.replace(tmp_path, metadata_path)
+    os.remove(journal_path)
+    return summary
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Generate pre-computed test images for Dicrhomat',
@@ -70,15 +183,32 @@ def main():
         default=None,
         help='Metadata output path (default: output-dir/metadata.json)'
     )
+    parser.add_argument(
+        '--fsync-every',
+        type=int,
+        default=10,
+        help='Records between journal fsyncs (default: 10)'
+    )
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Discard an existing journal instead of resuming it'
+    )
+    parser.add_argument(
+        '--layout-bank',
+        default=None,
+        help='Take dot layouts from the layout bank in this directory'
+    )
 
     args = parser.parse_args()
 
-    # Set default seed if not provided
-    if args.seed is None:
-        args.seed = str(datetime.now().timestamp())
-
-    # Initialize generator with seed
-    generator = ImageGenerator(seed_salt=args.seed)
+    bank = None
+    if args.layout_bank is not None:
+        bank = LayoutBank(args.layout_bank)
+        if bank.bank_id is None:
+            print(f"Error: no usable layout bank in {args.layout_bank}; run build_layout_bank.py first")
+            sys.exit(1)
+    bank_id = bank.bank_id if bank is not None else None
 
     # Create output directory
     output_dir = Path(args.output_dir)
@@ -89,86 +219,128 @@ def main():
         metadata_path = output_dir / 'metadata.json'
     else:
         metadata_path = Path(args.metadata_file)
+    journal_path = journal_path_for(metadata_path)
 
-    # Initialize metadata structure
-    metadata = {
-        'version': '1.0',
-        'generated_at': datetime.now().isoformat() + 'Z',
-        'total_images': args.count,
-        'seed': args.seed,
-        'images': []
-    }
+    done = {}
+    if journal_path.exists() and not args.restart:
+        header, done = read_journal(journal_path)
+        if header is None:
+            done = {}
+        else:
+            if args.seed is not None and args.seed != header['seed']:
+                print(f"Error: journal was started with seed {header['seed']}; use --restart to discard it")
+                sys.exit(1)
+            if args.count != header['total_images'] or args.format != header.get('format', 'png'):
+                print("Error: journal was started with a different --count or --format; use --restart to discard it")
+                sys.exit(1)
+            if bank_id != header.get('layout_bank'):
+                print("Error: journal was started with a different --layout-bank; use --restart to discard it")
+                sys.exit(1)
+            args.seed = header['seed']
+            print(f"Resuming build from {journal_path} ({len(done)} images recorded)")
+    elif journal_path.exists():
+        journal_path.unlink()
+
+    # Set default seed if not provided
+    if args.seed is None:
+        args.seed = str(datetime.now().timestamp())
+
+    # Initialize generator with seed
+    generator = ImageGenerator(seed_salt=args.seed, layout_bank=bank)
 
     print(f"Generating {args.count} test images...")
     print(f"Output directory: {output_dir.absolute()}")
     print(f"Seed: {args.seed}")
+    if bank_id is not None:
+        print(f"Layout bank: {bank_id}")
     print("-" * 60)
 
-    # Generate images by type
-    for i in range(args.count):
-        # Determine dichromism type and generate answer based on image number
-        if i < 30:
-            dichromism_type = 'protanopia'
-            correct_answer = generate_random_answer(i, args.seed)
-        elif i < 60:
-            dichromism_type = 'deuteranopia'
-            correct_answer = generate_random_answer(i, args.seed)
-        elif i < 90:
-            dichromism_type = 'tritanopia'
-            correct_answer = generate_random_answer(i, args.seed)
-        else:
-            dichromism_type = 'control'
+    journal_exists = journal_path.exists() and journal_path.stat().st_size > 0
+    with open(journal_path, 'a') as journal:
+        if not journal_exists:
+            header = {
+                'version': METADATA_VERSION,
+                'generated_at': datetime.now().isoformat() + 'Z',
+                'total_images': args.count,
+                'seed': args.seed,
+                'format': args.format
+            }
+            if bank_id is not None:
+                header['layout_bank'] = bank_id
+            journal.write(json.dumps(header) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+
+        unsynced = 0
+        for i in range(args.count):
+            filename = f'image_{i:03d}.{args.format}'
+            filepath = output_dir / filename
+
+            # Skip images the journal already covers, unless the file is gone
+            # or was cut short after its record was written
+            recorded = done.get(i)
+            if recorded is not None and filepath.exists() and filepath.stat().st_size == recorded[0]:
+                continue
+
+            dichromism_type = dichromism_type_for(i)
             correct_answer = generate_random_answer(i, args.seed)
 
-        # Generate image using a deterministic session_id
-        # Use image number as both session_id component and image_number
-        # to ensure unique, reproducible images
-        image_bytes = generator.generate_test_image(
-            session_id=f'pregenerated-{i}',
-            image_number=1,  # Always use 1 since we're using unique session_id per image
-            dichromism_type=dichromism_type,
-            correct_answer=correct_answer
-        )
-
-        # Save image
-        filename = f'image_{i:03d}.{args.format}'
-        filepath = output_dir / filename
-        filepath.write_bytes(image_bytes)
-
-        # Calculate hash for integrity verification
-        image_hash = hashlib.sha256(image_bytes).hexdigest()
-
-        # Determine difficulty (can be enhanced with actual difficulty calculation)
-        difficulty = 'medium'
-
-        # Store metadata
-        metadata['images'].append({
-            'id': i,
-            'filename': filename,
-            'correct_answer': correct_answer,
-            'dichromism_type': dichromism_type,
-            'difficulty': difficulty,
-            'sha256': image_hash,
-            'file_size': len(image_bytes)
-        })
-
-        # Progress indicator
-        print(f"[{i+1:3d}/{args.count}] {filename:16} | {dichromism_type:12} | Answer: {correct_answer:2d} | {len(image_bytes)//1024:3d}KB")
-
-    # Write metadata file
-    metadata_path.write_text(json.dumps(metadata, indent=2))
+            # Generate image using a deterministic session_id
+            # Use image number as both session_id component and image_number
+            # to ensure unique, reproducible images
+            image_bytes = generator.generate_test_image(
+                session_id=f'pregenerated-{i}',
+                image_number=1,  # Always use 1 since we're using unique session_id per image
+                dichromism_type=dichromism_type,
+                correct_answer=correct_answer
+            )
+
+            # Save image
+            filepath.write_bytes(image_bytes)
+
+            # Calculate hash for integrity verification
+            image_hash = hashlib.sha256(image_bytes).hexdigest()
+
+            # Determine difficulty (can be enhanced with actual difficulty calculation)
+            difficulty = 'medium'
+
+            # Journal the record; it only becomes durable at the next fsync
+            journal.write(json.dumps({
+                'id': i,
+                'filename': filename,
+                'correct_answer': correct_answer,
+                'dichromism_type': dichromism_type,
+                'difficulty': difficulty,
+                'sha256': image_hash,
+                'file_size': len(image_bytes)
+            }) + '\n')
+            unsynced += 1
+            if unsynced >= args.fsync_every:
+                journal.flush()
+                os.fsync(journal.fileno())
+                unsynced = 0
+
+            # Progress indicator
+            print(f"[{i+1:3d}/{args.count}] {filename:16} | {dichromism_type:12} | Answer: {correct_answer:2d} | {len(image_bytes)//1024:3d}KB")
+
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    # Compact the journal into the metadata file
+    summary = finalize_metadata(journal_path, metadata_path)
+    types = summary['types']
 
     # Summary
     print("-" * 60)
     print(f"\n✓ Successfully generated {args.count} images")
-    print(f"✓ Total size: {sum(img['file_size'] for img in metadata['images']) / 1024 / 1024:.2f} MB")
+    print(f"✓ Total size: {summary['total_bytes'] / 1024 / 1024:.2f} MB")
     print(f"✓ Output directory: {output_dir.absolute()}")
     print(f"✓ Metadata file: {metadata_path.absolute()}")
     print(f"\nImage distribution:")
-    print(f"  - Protanopia:   {sum(1 for img in metadata['images'] if img['dichromism_type'] == 'protanopia')} images (IDs 0-29)")
-    print(f"  - Deuteranopia: {sum(1 for img in metadata['images'] if img['dichromism_type'] == 'deuteranopia')} images (IDs 30-59)")
-    print(f"  - Tritanopia:   {sum(1 for img in metadata['images'] if img['dichromism_type'] == 'tritanopia')} images (IDs 60-89)")
-    print(f"  - Control:      {sum(1 for img in metadata['images'] if img['dichromism_type'] == 'control')} images (IDs 90-99)")
+    print(f"  - Protanopia:   {types['protanopia']} images (IDs 0-29)")
+    print(f"  - Deuteranopia: {types['deuteranopia']} images (IDs 30-59)")
+    print(f"  - Tritanopia:   {types['tritanopia']} images (IDs 60-89)")
+    print(f"  - Control:      {types['control']} images (IDs 90-99)")
 
 
 if __name__ == '__main__':
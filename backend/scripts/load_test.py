@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the Dicrhomat API.
+
+This script drives real user journeys against a running backend and reports
+throughput, error rate and latency percentiles per endpoint. Two journeys
+are simulated:
+
+- test:   POST /test/start, 10 image fetches, 10 answers, then results
+- slider: a burst of /slider/generate calls with small parameter changes,
+          mimicking a user dragging a slider, plus luminance lookups
+
+By default the app is started in-process on a local port, so the run is
+fully offline. Point --database-url at a SQLite file or a local PostgreSQL
+database to compare database profiles.
+
+Usage:
+    python backend/scripts/load_test.py [OPTIONS]
+
+Options:
+    --base-url URL          Target an already running server instead of starting one
+    --database-url URL      Database for the in-process server (default: temporary SQLite file)
+    --config NAME           Config name for the in-process server (default: production)
+    --users NUM             Number of concurrent simulated users (default: 10)
+    --ramp-up SECONDS       Time over which users are started (default: 5)
+    --duration SECONDS      Total run time (default: 60)
+    --think-time MIN,MAX    Pause between user actions in seconds (default: 0.5,2.0)
+    --slider-ratio FRAC     Fraction of users running the slider journey (default: 0.2)
+    --slider-drags NUM      Generate calls per slider journey (default: 20)
+    --seed SEED             Random seed for the simulated users (default: none)
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Add parent directory to path to import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class LoadStats:
+    """Thread-safe collector of per-endpoint latencies and errors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = defaultdict(int)
+
+    def record(self, endpoint: str, elapsed: float, ok: bool):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def journey_done(self, name: str):
+        with self._lock:
+            self.journeys[name] += 1
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class SimulatedUser:
+    """A single virtual user holding one keep-alive connection."""
+
+    SLIDER_TYPES = ('deuteranopia', 'protanopia', 'tritanopia')
+
+    def __init__(self, base_url: str, stats: LoadStats, rng: random.Random, think_time: tuple):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.conn = None
+
+    def _connect(self):
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method: str, path: str, endpoint: str, body=None):
+        """Issue a request and record its latency under the endpoint label."""
+        if self.conn is None:
+            self._connect()
+
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.stats.record(endpoint, time.perf_counter() - start, False)
+            self.conn.close()
+            self.conn = None
+            return None, None
+
+        self.stats.record(endpoint, time.perf_counter() - start, status < 400)
+        return status, data
+
+    def think(self):
+        low, high = self.think_time
+        if high > 0:
+            time.sleep(self.rng.uniform(low, high))
+
+    def run_test_journey(self) -> bool:
+        status, data = self.request('POST', '/api/test/start', 'POST /test/start', body={})
+        if status != 201:
+            return False
+        session_id = json.loads(data)['session_id']
+
+        for image_number in range(1, 11):
+            self.request(
+                'GET',
+                f'/api/test/{session_id}/image/{image_number}',
+                'GET /test/:id/image/:n'
+            )
+            self.think()
+            self.request(
+                'POST',
+                f'/api/test/{session_id}/answer',
+                'POST /test/:id/answer',
+                body={'image_number': image_number, 'user_answer': self.rng.randint(0, 99)}
+            )
+
+        status, _ = self.request('GET', f'/api/test/{session_id}/results', 'GET /test/:id/results')
+        return status == 200
+
+    def run_slider_journey(self, drags: int) -> bool:
+        params = {
+            'fg_rgb': [150, 120, 140],
+            'bg_rgb': [145, 145, 145],
+            'circle_mean_size': 20,
+            'circle_size_variance': 0.30,
+            'noise_offset': 0.0,
+            'noise_variance': 0.08,
+            'pattern_density': 0.25,
+            'simulate_dichromat': self.rng.random() < 0.3,
+            'dichromat_type': self.rng.choice(self.SLIDER_TYPES),
+            'seed': self.rng.randint(0, 2 ** 31 - 1),
+        }
+        ok = True
+
+        for _ in range(drags):
+            # Nudge one slider, like a user dragging a control
+            channel = self.rng.randrange(3)
+            value = params['fg_rgb'][channel] + self.rng.randint(-8, 8)
+            params['fg_rgb'][channel] = max(0, min(255, value))
+            if self.rng.random() < 0.2:
+                params['circle_mean_size'] = self.rng.randint(6, 40)
+
+            status, _ = self.request('POST', '/api/slider/generate', 'POST /slider/generate', body=params)
+            ok = ok and status == 200
+
+            if self.rng.random() < 0.3:
+                self.request(
+                    'POST',
+                    '/api/slider/luminance',
+                    'POST /slider/luminance',
+                    body={'rgb': params['fg_rgb']}
+                )
+            # Drags are much faster than test answers
+            time.sleep(self.rng.uniform(0.0, 0.1))
+
+        self.request('POST', '/api/slider/match-luminance', 'POST /slider/match-luminance',
+                     body={'fg_rgb': params['fg_rgb'], 'bg_rgb': params['bg_rgb']})
+        return ok
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def run_user(user: SimulatedUser, journey: str, args, deadline: float):
+    """Repeat the assigned journey until the deadline passes."""
+    try:
+        while time.monotonic() < deadline:
+            if journey == 'slider':
+                ok = user.run_slider_journey(args.slider_drags)
+            else:
+                ok = user.run_test_journey()
+            user.stats.journey_done(journey if ok else f'{journey} (failed)')
+            user.think()
+    finally:
+        user.close()
+
+
+def start_local_server(args):
+    """Start the app in a background thread and return (server, base_url)."""
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        db_path = Path(tempfile.mkdtemp(prefix='dicrhomat-load-')) / 'load_test.db'
+        os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    from models import db
+
+    app = create_app(args.config)
+    with app.app_context():
+        db.create_all()
+
+    # Per-request access logs would drown out the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def print_report(stats: LoadStats, elapsed: float):
+    print("-" * 96)
+    print(f"{'Endpoint':32} {'Requests':>9} {'Errors':>7} {'Err %':>6} {'Req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print("-" * 96)
+
+    total_requests = 0
+    total_errors = 0
+    for endpoint in sorted(stats.latencies):
+        values = sorted(stats.latencies[endpoint])
+        errors = stats.errors[endpoint]
+        total_requests += len(values)
+        total_errors += errors
+        print(f"{endpoint:32} {len(values):9d} {errors:7d} {100.0 * errors / len(values):6.2f} "
+              f"{len(values) / elapsed:8.2f} "
+              f"{percentile(values, 50) * 1000:8.1f} "
+              f"{percentile(values, 95) * 1000:8.1f} "
+              f"{percentile(values, 99) * 1000:8.1f}")
+
+    print("-" * 96)
+    error_rate = 100.0 * total_errors / total_requests if total_requests else 0.0
+    print(f"\nDuration:    {elapsed:.1f}s")
+    print(f"Requests:    {total_requests} ({total_requests / elapsed:.2f} req/s)")
+    print(f"Error rate:  {error_rate:.2f}%")
+    print("Journeys:")
+    for name in sorted(stats.journeys):
+        print(f"  - {name:18} {stats.journeys[name]}")
+
+
+def parse_think_time(value: str) -> tuple:
+    try:
+        low, high = (float(v) for v in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('think time must be MIN,MAX in seconds')
+    if low < 0 or high < low:
+        raise argparse.ArgumentTypeError('think time must satisfy 0 <= MIN <= MAX')
+    return low, high
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run an end-to-end load test against the Dicrhomat API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--base-url', default=None,
+                        help='Target an already running server instead of starting one')
+    parser.add_argument('--database-url', default=None,
+                        help='Database for the in-process server (default: temporary SQLite file)')
+    parser.add_argument('--config', default='production',
+                        choices=['development', 'production', 'testing'],
+                        help='Config name for the in-process server (default: production)')
+    parser.add_argument('--users', type=int, default=10,
+                        help='Number of concurrent simulated users (default: 10)')
+    parser.add_argument('--ramp-up', type=float, default=5.0,
+                        help='Time over which users are started (default: 5)')
+    parser.add_argument('--duration', type=float, default=60.0,
+                        help='Total run time in seconds (default: 60)')
+    parser.add_argument('--think-time', type=parse_think_time, default=(0.5, 2.0),
+                        help='Pause between user actions, MIN,MAX seconds (default: 0.5,2.0)')
+    parser.add_argument('--slider-ratio', type=float, default=0.2,
+                        help='Fraction of users running the slider journey (default: 0.2)')
+    parser.add_argument('--slider-drags', type=int, default=20,
+                        help='Generate calls per slider journey (default: 20)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for the simulated users (default: none)')
+
+    args = parser.parse_args()
+
+    if args.users < 1:
+        parser.error('--users must be at least 1')
+    if not 0.0 <= args.slider_ratio <= 1.0:
+        parser.error('--slider-ratio must be between 0 and 1')
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server, base_url = start_local_server(args)
+
+    master_rng = random.Random(args.seed)
+    slider_users = int(round(args.users * args.slider_ratio))
+
+    print(f"Target:      {base_url}")
+    print(f"Database:    {os.environ.get('DATABASE_URL', 'external') if server else 'external'}")
+    print(f"Users:       {args.users} ({slider_users} slider, {args.users - slider_users} test)")
+    print(f"Ramp-up:     {args.ramp_up}s, duration: {args.duration}s")
+    print(f"Think time:  {args.think_time[0]}-{args.think_time[1]}s")
+
+    stats = LoadStats()
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = []
+
+    try:
+        for i in range(args.users):
+            journey = 'slider' if i < slider_users else 'test'
+            user = SimulatedUser(base_url, stats, random.Random(master_rng.random()), args.think_time)
+            thread = threading.Thread(target=run_user, args=(user, journey, args, deadline), daemon=True)
+            thread.start()
+            threads.append(thread)
+            if args.ramp_up > 0 and i < args.users - 1:
+                time.sleep(args.ramp_up / (args.users - 1))
+
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        print("\nInterrupted, reporting partial results")
+    finally:
+        elapsed = time.monotonic() - start
+        if server is not None:
+            server.shutdown()
+
+    print_report(stats, elapsed)
+
+
+if __name__ == '__main__':
+    main()
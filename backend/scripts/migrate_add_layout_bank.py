@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Database migration script: Add layout_bank column to test_session table
+
+This script adds the layout_bank column recording the dot layout bank that
+on-the-fly sessions are rendered from.
+
+Usage:
+    python backend/scripts/migrate_add_layout_bank.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from models import db
+
+def migrate():
+    """Add layout_bank column to test_session table."""
+    app = create_app()
+
+    with app.app_context():
+        if 'sqlite' in app.config['SQLALCHEMY_DATABASE_URI']:
+            print("Detected SQLite database")
+
+            try:
+                # Check if column exists
+                result = db.session.execute(db.text("PRAGMA table_info(test_session)"))
+                columns = [row[1] for row in result]
+
+                if 'layout_bank' in columns:
+                    print("✓ Column 'layout_bank' already exists. No migration needed.")
+                    return
+
+                print("Adding 'layout_bank' column to test_session table...")
+
+                db.session.execute(db.text(
+                    "ALTER TABLE test_session ADD COLUMN layout_bank VARCHAR(16)"
+                ))
+                db.session.commit()
+
+                print("✓ Successfully added 'layout_bank' column")
+                print("\nNote: Existing sessions will have NULL layout_bank.")
+                print("Their on-the-fly plates keep live dot placement.")
+
+            except Exception as e:
+                print(f"✗ Migration failed: {e}")
+                db.session.rollback()
+                raise
+        else:
+            # For PostgreSQL or MySQL
+            print("Detected non-SQLite database")
+            try:
+                db.session.execute(db.text(
+                    "ALTER TABLE test_session ADD COLUMN layout_bank VARCHAR(16)"
+                ))
+                db.session.commit()
+                print("✓ Successfully added 'layout_bank' column")
+            except Exception as e:
+                print(f"✗ Migration failed: {e}")
+                print("You may need to run the migration manually:")
+                print("  ALTER TABLE test_session ADD COLUMN layout_bank VARCHAR(16);")
+                db.session.rollback()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Database Migration: Add layout_bank to test_session")
+    print("=" * 60)
+    print()
+
+    migrate()
+
+    print()
+    print("=" * 60)
+    print("Migration complete")
+    print("=" * 60)
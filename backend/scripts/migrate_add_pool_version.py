@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Database migration script: Add pool_version column to test_session table
+
+This script adds the pool_version column used to pin sessions to the image
+pool version their mapping was drawn from.
+
+Usage:
+    python backend/scripts/migrate_add_pool_version.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from models import db
+
+def migrate():
+    """Add pool_version column to test_session table."""
+    app = create_app()
+
+    with app.app_context():
+        if 'sqlite' in app.config['SQLALCHEMY_DATABASE_URI']:
+            print("Detected SQLite database")
+
+            try:
+                # Check if column exists
+                result = db.session.execute(db.text("PRAGMA table_info(test_session)"))
+                columns = [row[1] for row in result]
+
+                if 'pool_version' in columns:
+                    print("✓ Column 'pool_version' already exists. No migration needed.")
+                    return
+
+                print("Adding 'pool_version' column to test_session table...")
+
+                db.session.execute(db.text(
+                    "ALTER TABLE test_session ADD COLUMN pool_version VARCHAR(32)"
+                ))
+                db.session.commit()
+
+                print("✓ Successfully added 'pool_version' column")
+                print("\nNote: Existing sessions will have NULL pool_version.")
+                print("They keep using the unversioned pool in static/test_images.")
+
+            except Exception as e:
+                print(f"✗ Migration failed: {e}")
+                db.session.rollback()
+                raise
+        else:
+            # For PostgreSQL or MySQL
+            print("Detected non-SQLite database")
+            try:
+                db.session.execute(db.text(
+                    "ALTER TABLE test_session ADD COLUMN pool_version VARCHAR(32)"
+                ))
+                db.session.commit()
+                print("✓ Successfully added 'pool_version' column")
+            except Exception as e:
+                print(f"✗ Migration failed: {e}")
+                print("You may need to run the migration manually:")
+                print("  ALTER TABLE test_session ADD COLUMN pool_version VARCHAR(32);")
+                db.session.rollback()
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Database Migration: Add pool_version to test_session")
+    print("=" * 60)
+    print()
+
+    migrate()
+
+    print()
+    print("=" * 60)
+    print("Migration complete")
+    print("=" * 60)
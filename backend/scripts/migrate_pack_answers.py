@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Database migration script: Move session answers to packed storage
+
+Creates the session_answers table if needed and converts row-stored sessions
+(TestSession.image_mapping JSON plus Answer rows) into one SessionAnswers row
+each. Sessions are processed in id order in batches, each committed on its
+own, so memory stays flat and an interrupted run can simply be started
+again: sessions that already have a packed row are skipped.
+
+Set ANSWER_STORAGE=packed for the app so new sessions are stored the same way.
+
+Usage:
+    python backend/scripts/migrate_pack_answers.py [OPTIONS]
+
+Options:
+    --batch-size NUM    Sessions per batch and commit (default: 500)
+    --keep-rows         Keep the Answer rows and JSON mapping after packing
+    --dry-run           Only count the sessions that would be converted
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from models import db
+from models.session_answers import SessionAnswers
+from models.test_session import TestSession
+from services.answer_store import pack_batch
+
+
+def count_pending() -> int:
+    if not db.inspect(db.engine).has_table(SessionAnswers.__tablename__):
+        return TestSession.query.count()
+    return (
+        TestSession.query
+        .outerjoin(SessionAnswers, SessionAnswers.session_id == TestSession.id)
+        .filter(SessionAnswers.session_id.is_(None))
+        .count()
+    )
+
+
+def migrate(batch_size: int = 500, keep_rows: bool = False, progress=None) -> int:
+    """Pack every row-stored session; must run inside an app context. Returns the number converted."""
+    SessionAnswers.__table__.create(db.engine, checkfirst=True)
+
+    after_id = ''
+    total = 0
+    while True:
+        try:
+            last_id, packed = pack_batch(after_id, batch_size, keep_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if last_id is None:
+            break
+        # Drop converted objects so the identity map does not grow across batches
+        db.session.expunge_all()
+        after_id = last_id
+        total += packed
+        if progress is not None:
+            progress(total)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Move session answers to packed storage',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=500,
+        help='Sessions per batch and commit (default: 500)'
+    )
+    parser.add_argument(
+        '--keep-rows',
+        action='store_true',
+        help='Keep the Answer rows and JSON mapping after packing'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only count the sessions that would be converted'
+    )
+
+    args = parser.parse_args()
+
+    if args.batch_size < 1:
+        print("Error: --batch-size must be at least 1")
+        sys.exit(1)
+
+    app = create_app()
+
+    with app.app_context():
+        print("=" * 60)
+        print("Database Migration: Pack session answers")
+        print("=" * 60)
+
+        if args.dry_run:
+            print(f"{count_pending()} sessions would be converted")
+            return
+
+        start = time.time()
+        try:
+            total = migrate(
+                args.batch_size,
+                args.keep_rows,
+                progress=lambda done: print(f"  {done} sessions packed")
+            )
+        except Exception as e:
+            print(f"✗ Migration failed: {e}")
+            sys.exit(1)
+
+        print("-" * 60)
+        print(f"✓ Packed {total} sessions in {time.time() - start:.1f}s")
+        if args.keep_rows:
+            print("Answer rows and JSON mappings were kept; packed rows take precedence when reading.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Re-score stored sessions with the current ResultsAnalyzer rules.
+
+Run after changing ANALYSIS_DEFICIENT_ERROR_RATE, ANALYSIS_NORMAL_ERROR_RATE
+or ANALYSIS_MAX_CONTROL_ERRORS. Answers are read in chunks as NumPy arrays,
+scored with array operations and written to the session_result table with
+one bulk insert per chunk; no Answer objects are loaded. Works with both
+row-stored and packed sessions.
+
+Each chunk is committed on its own, so the script can be interrupted and
+started again: sessions already scored under the current rules are skipped
+unless --all is given. The rules can be overridden for a single run, e.g. to
+compare outcomes before changing the config.
+
+Usage:
+    python backend/scripts/rescore_sessions.py [OPTIONS]
+
+Options:
+    --chunk-size NUM            Sessions per chunk and commit (default: 5000)
+    --deficient-rate RATE       Error rate at which a type is suspected
+    --normal-rate RATE          Highest error rate of a high-confidence normal result
+    --max-control-errors NUM    Control errors tolerated before a result is unreliable
+    --include-incomplete        Also score sessions that were never completed
+    --all                       Re-score sessions already scored under these rules
+    --dry-run                   Only count the sessions that would be scored
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from models import db
+from models.session_result import SessionResult
+from services.batch_analyzer import rescore, sessions_to_score
+from services.results_analyzer import ResultsAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Re-score stored sessions with the current analysis rules',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=5000,
+        help='Sessions per chunk and commit (default: 5000)'
+    )
+    parser.add_argument(
+        '--deficient-rate',
+        type=float,
+        default=None,
+        help='Error rate at which a type is suspected (default: from config)'
+    )
+    parser.add_argument(
+        '--normal-rate',
+        type=float,
+        default=None,
+        help='Highest error rate of a high-confidence normal result (default: from config)'
+    )
+    parser.add_argument(
+        '--max-control-errors',
+        type=int,
+        default=None,
+        help='Control errors tolerated before a result is unreliable (default: from config)'
+    )
+    parser.add_argument(
+        '--include-incomplete',
+        action='store_true',
+        help='Also score sessions that were never completed'
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Re-score sessions already scored under these rules'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only count the sessions that would be scored'
+    )
+
+    args = parser.parse_args()
+
+    if args.chunk_size < 1:
+        print("Error: --chunk-size must be at least 1")
+        sys.exit(1)
+
+    app = create_app()
+
+    with app.app_context():
+        configured = ResultsAnalyzer.from_config(app.config)
+        analyzer = ResultsAnalyzer(
+            configured.deficient_error_rate if args.deficient_rate is None else args.deficient_rate,
+            configured.normal_error_rate if args.normal_rate is None else args.normal_rate,
+            configured.max_control_errors if args.max_control_errors is None else args.max_control_errors
+        )
+
+        print("Re-scoring stored sessions")
+        print(f"Rules: {analyzer.rules}")
+        print("-" * 60)
+
+        if args.dry_run:
+            # Before the first run the session_result table may not exist yet
+            table_exists = db.inspect(db.engine).has_table(SessionResult.__tablename__)
+            query = sessions_to_score(analyzer.rules, args.include_incomplete,
+                                      rescore_all=args.all or not table_exists)
+            pending = db.session.execute(db.select(db.func.count()).select_from(query.subquery())).scalar()
+            print(f"{pending} sessions would be scored")
+            return
+
+        start = time.time()
+        try:
+            totals = rescore(
+                analyzer,
+                chunk_size=args.chunk_size,
+                include_incomplete=args.include_incomplete,
+                rescore_all=args.all,
+                progress=lambda scored, totals: print(
+                    f"  {scored} sessions | {scored / max(time.time() - start, 1e-9):.0f}/s"
+                )
+            )
+        except Exception as e:
+            print(f"✗ Re-scoring failed: {e}")
+            sys.exit(1)
+
+        print("-" * 60)
+        print(f"✓ Scored {sum(totals.values())} sessions in {time.time() - start:.1f}s")
+        for status, count in totals.items():
+            print(f"  {status}: {count}")
+
+
+if __name__ == '__main__':
+    main()
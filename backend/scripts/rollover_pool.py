@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Roll out a new version of the pre-generated image pool without downtime.
+
+Each version is a complete pool in <pool dir>/versions/<version>; build one
+with generate_images.py:
+
+    python backend/scripts/generate_images.py \\
+        --output-dir backend/static/test_images/versions/2024-06
+
+The rollover checks the version's metadata and images, stages it in the
+NEXT pointer, waits until every live worker reports it warm (workers check
+every IMAGE_POOL_WARM_INTERVAL seconds), then atomically switches CURRENT
+to it. If no worker reports in, or some do not warm the version within
+--wait seconds, the version stays staged and CURRENT is not switched.
+New sessions get the new version; sessions started earlier keep using the
+version recorded on them, so old versions must be kept until those
+sessions are no longer needed (--status counts them).
+
+Usage:
+    python backend/scripts/rollover_pool.py VERSION [OPTIONS]
+    python backend/scripts/rollover_pool.py --status
+
+Options:
+    --pool-dir DIR      Pool directory (default: IMAGE_POOL_DIR or backend/static/test_images)
+    --wait SECONDS      Longest time to wait for workers to warm the staged version
+                        (default: 120)
+    --force             Switch even if not every live worker has warmed the version
+    --stage-only        Only stage the version in NEXT, do not switch
+    --skip-verify       Do not hash the images before staging
+    --status            Show the current and staged versions and sessions per version
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from services.image_pool import (
+    CURRENT_POINTER, NEXT_POINTER, ImagePool, resolve_pool_dir, validate_version, worker_reports, write_pointer
+)
+from services.pool_verifier import verify_pool
+
+DEFAULT_POOL_DIR = resolve_pool_dir(Config.IMAGE_POOL_DIR)
+# Workers that have not reported for this long are taken to be gone; warming
+# a large version delays a worker's next report, hence the floor
+WORKER_MAX_AGE = max(3 * Config.IMAGE_POOL_WARM_INTERVAL, 60)
+
+
+def wait_for_workers(pool: ImagePool, version: str, timeout: float) -> list:
+    """Poll worker reports until every live worker has warmed version; returns the ones that have not."""
+    deadline = time.time() + timeout
+    while True:
+        reports = worker_reports(pool.pool_dir, WORKER_MAX_AGE)
+        cold = [r['worker'] for r in reports if version not in r['warmed']]
+        if reports and not cold:
+            print(f"✓ {len(reports)} workers have warmed {version}")
+            return []
+        if time.time() >= deadline:
+            return cold if reports else ['(no worker reported in)']
+        time.sleep(1)
+
+
+def print_status(pool: ImagePool):
+    from sqlalchemy import func
+    from app import create_app
+    from models import db
+    from models.test_session import TestSession
+
+    print(f"Pool directory: {pool.pool_dir}")
+    print(f"Current version: {pool.current_version() or 'unversioned'}")
+    print(f"Staged version:  {pool.next_version() or '-'}")
+    for report in worker_reports(pool.pool_dir, WORKER_MAX_AGE):
+        print(f"  worker {report['worker']:28} | warmed: {', '.join(report['warmed']) or '-'}")
+    print("-" * 60)
+
+    versions_dir = pool.pool_dir / 'versions'
+    versions = sorted(p.name for p in versions_dir.iterdir() if p.is_dir()) if versions_dir.exists() else []
+    app = create_app()
+    with app.app_context():
+        counts = dict(
+            db.session.query(TestSession.pool_version, func.count(TestSession.id))
+            .filter(TestSession.image_mapping.isnot(None))
+            .group_by(TestSession.pool_version)
+            .all()
+        )
+    for version in [None] + versions:
+        if version is None and not pool.metadata_path(None).exists() and None not in counts:
+            continue
+        print(f"  {version or 'unversioned':20} | {counts.get(version, 0):,} sessions")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Roll out a new image pool version',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        'version',
+        nargs='?',
+        help='Version to roll out (a directory in <pool dir>/versions)'
+    )
+    parser.add_argument(
+        '--pool-dir',
+        default=DEFAULT_POOL_DIR,
+        help='Pool directory (default: IMAGE_POOL_DIR or backend/static/test_images)'
+    )
+    parser.add_argument(
+        '--wait',
+        type=float,
+        default=120,
+        help='Longest time to wait for workers to warm the staged version (default: 120)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Switch even if not every live worker has warmed the version'
+    )
+    parser.add_argument(
+        '--stage-only',
+        action='store_true',
+        help='Only stage the version in NEXT, do not switch'
+    )
+    parser.add_argument(
+        '--skip-verify',
+        action='store_true',
+        help='Do not hash the images before staging'
+    )
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help='Show the current and staged versions and sessions per version'
+    )
+
+    args = parser.parse_args()
+    pool = ImagePool(args.pool_dir)
+
+    if args.status:
+        print_status(pool)
+        return
+
+    if args.version is None:
+        print("Error: VERSION is required unless --status is given")
+        sys.exit(1)
+    try:
+        version = validate_version(args.version)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.wait < 0:
+        print("Error: --wait must be at least 0")
+        sys.exit(1)
+
+    metadata_path = pool.metadata_path(version)
+    if not metadata_path.exists():
+        print(f"Error: metadata file not found: {metadata_path}")
+        sys.exit(1)
+    if pool.current_version() == version:
+        print(f"✓ Version {version} is already current")
+        return
+
+    try:
+        selector = pool.selector(version)
+    except ValueError as e:
+        print(f"✗ Invalid metadata for version {version}: {e}")
+        sys.exit(1)
+
+    print(f"Rolling out pool version {version} from {pool.version_dir(version)}")
+    print(f"Images: {len(selector.metadata['images'])}, current version: {pool.current_version() or 'unversioned'}")
+    print("-" * 60)
+
+    if not args.skip_verify:
+        report = verify_pool(str(metadata_path), workers=Config.POOL_VERIFY_WORKERS,
+                             images=selector.metadata['images'])
+        if report['mismatched']:
+            for mismatch in report['mismatches']:
+                print(f"✗ {mismatch['filename']:16} | {mismatch['reason']}")
+            print(f"✗ {report['mismatched']} images failed verification, not rolling out")
+            sys.exit(1)
+        print(f"✓ Verified {report['checked']} images in {report['seconds']:.2f}s")
+
+    write_pointer(pool.pool_dir, NEXT_POINTER, version)
+    print(f"✓ Staged {version} in {NEXT_POINTER}")
+    if args.stage_only:
+        return
+
+    print(f"Waiting up to {args.wait:.0f}s for workers to warm {version}...")
+    cold = wait_for_workers(pool, version, args.wait)
+    if cold:
+        print(f"✗ Not warmed by: {', '.join(cold)}")
+        if not args.force:
+            print(f"✗ Not switching; {version} stays staged. Re-run to wait again, or pass --force")
+            sys.exit(1)
+        print("Switching anyway (--force)")
+
+    write_pointer(pool.pool_dir, CURRENT_POINTER, version)
+    write_pointer(pool.pool_dir, NEXT_POINTER, None)
+    print("-" * 60)
+    print(f"✓ New sessions now use pool version {version}")
+
+
+if __name__ == '__main__':
+    main()
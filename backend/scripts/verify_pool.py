@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Verify pre-generated test images against their metadata sha256 values.
+
+Every pool file is hashed in parallel and compared with metadata.json.
+Missing, truncated and corrupted files are reported, and the exit status is
+1 if any image fails so the script can gate deployments.
+
+Usage:
+    python backend/scripts/verify_pool.py [OPTIONS]
+
+Options:
+    --pool-dir DIR        Pool directory (default: IMAGE_POOL_DIR or backend/static/test_images)
+    --metadata-file FILE  Pool metadata (default: the current version's metadata.json
+                          in --pool-dir)
+    --workers NUM         Hashing threads (default: 4)
+    --sample FRACTION     Verify only a random fraction of the pool (default: 1.0)
+    --seed SEED           Random seed for --sample (default: none)
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import from backend
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Config
+from services.image_pool import ImagePool, resolve_pool_dir
+from services.pool_verifier import verify_pool, load_pool_images
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Verify pre-generated test images against their metadata',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        '--pool-dir',
+        default=resolve_pool_dir(Config.IMAGE_POOL_DIR),
+        help='Pool directory (default: IMAGE_POOL_DIR or backend/static/test_images)'
+    )
+    parser.add_argument(
+        '--metadata-file',
+        default=None,
+        help="Pool metadata (default: the current version's metadata.json in --pool-dir)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Hashing threads (default: 4)'
+    )
+    parser.add_argument(
+        '--sample',
+        type=float,
+        default=1.0,
+        help='Verify only a random fraction of the pool (default: 1.0)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Random seed for --sample (default: none)'
+    )
+
+    args = parser.parse_args()
+
+    if not 0 < args.sample <= 1:
+        print("Error: --sample must be in (0, 1]")
+        sys.exit(1)
+
+    if args.metadata_file is None:
+        pool = ImagePool(args.pool_dir)
+        metadata_path = pool.metadata_path(pool.current_version())
+    else:
+        metadata_path = Path(args.metadata_file)
+    if not metadata_path.exists():
+        print(f"Error: metadata file not found: {metadata_path}")
+        sys.exit(1)
+
+    images = load_pool_images(str(metadata_path))
+    image_ids = None
+    if args.sample < 1:
+        count = max(1, int(len(images) * args.sample))
+        image_ids = random.Random(args.seed).sample([img['id'] for img in images], count)
+
+    print(f"Verifying {len(image_ids) if image_ids is not None else len(images)} images in {metadata_path.parent}")
+    print(f"Workers: {args.workers}")
+    print("-" * 60)
+
+    report = verify_pool(str(metadata_path), image_ids, args.workers, images)
+
+    for mismatch in report['mismatches']:
+        detail = ''
+        if mismatch['reason'] == 'size':
+            detail = f" (expected {mismatch['expected']} bytes, found {mismatch['actual']})"
+        elif mismatch['reason'] == 'sha256':
+            detail = f" (expected {mismatch['expected'][:16]}…, found {mismatch['actual'][:16]}…)"
+        print(f"✗ {mismatch['filename']:16} | {mismatch['reason']}{detail}")
+
+    print("-" * 60)
+    print(f"Checked {report['checked']} images in {report['seconds']:.2f}s")
+    if report['mismatched']:
+        print(f"✗ {report['mismatched']} images failed verification")
+        sys.exit(1)
+    print("✓ All images match their metadata")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,19 @@
-from .image_generator import ImageGenerator
-from .results_analyzer import ResultsAnalyzer
-from .image_selector import ImageSelector
-from .slider_image_generator import SliderImageGenerator
+# Services are imported on first attribute access so that importing one
+# lightweight service does not pull in PIL and numpy through the generators
+_EXPORTS = {
+    'ImageGenerator': 'services.image_generator',
+    'ResultsAnalyzer': 'services.results_analyzer',
+    'ImageSelector': 'services.image_selector',
+    'SliderImageGenerator': 'services.slider_image_generator',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
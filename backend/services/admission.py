@@ -0,0 +1,191 @@
+"""
+Admission Control Service
+
+The render pool bounds how many renders run at once, but it admits them
+first come first served, so a few clients scripting dense slider renders
+can keep it full and starve cheap requests. Admission control sheds that
+load earlier, per endpoint, with two token buckets:
+
+- one per client (remote address, taken from X-Forwarded-For when
+  TRUSTED_PROXY_HOPS is set), so one client cannot take the whole budget
+- one global, so many clients together cannot exceed what the workers
+  can render
+
+Requests are weighted by estimated render cost in units of 1000 dots, the
+dot count being what dominates placement and rasterization time. Only
+work that will actually render is charged: cache hits and pooled static
+images are free. A request that does not fit is rejected with
+AdmissionRejected, which routes turn into 429 with Retry-After.
+
+Limits come from ADMISSION_LIMITS, keyed by view function name; endpoints
+without an entry are not limited.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from flask import request
+
+DEFAULT_ADMISSION_LIMITS = {
+    # A 5000-dot slider render costs 5 units
+    'generate_slider_image': {'client_rate': 5, 'client_burst': 20, 'global_rate': 40, 'global_burst': 100},
+    'get_slider_image': {'client_rate': 5, 'client_burst': 20, 'global_rate': 40, 'global_burst': 100},
+    'compare_slider_image': {'client_rate': 5, 'client_burst': 30, 'global_rate': 40, 'global_burst': 100},
+    # On-the-fly test plates cost about 2.5 units
+    'get_image': {'client_rate': 5, 'client_burst': 25, 'global_rate': 60, 'global_burst': 150},
+}
+
+# Idle client buckets beyond this many are forgotten, least recently used first
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request exceeds its client or global budget."""
+
+    def __init__(self, retry_after: int, scope: str):
+        super().__init__(f'Request rejected by {scope} admission limit')
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+class TokenBucket:
+    """Tokens refill continuously at rate per second up to burst."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, cost: float) -> float:
+        """Seconds until cost tokens are available (after refill)."""
+        if self.tokens >= cost:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (cost - self.tokens) / self.rate
+
+
+class _EndpointLimiter:
+    def __init__(self, limits: dict, now: float):
+        self.limits = limits
+        self.global_bucket = TokenBucket(limits['global_rate'], limits['global_burst'], now)
+        self.clients = OrderedDict()
+        self.admitted = 0
+        self.shed_client = 0
+        self.shed_global = 0
+        self.cost_admitted = 0.0
+
+    def client_bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self.clients.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.limits['client_rate'], self.limits['client_burst'], now)
+            self.clients[client] = bucket
+            if len(self.clients) > MAX_TRACKED_CLIENTS:
+                self.clients.popitem(last=False)
+        else:
+            self.clients.move_to_end(client)
+        return bucket
+
+
+class AdmissionController:
+    """Per-endpoint client and global token buckets."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.configure(False, {})
+
+    def init_app(self, app):
+        # Overrides merge key by key into the defaults; None drops an endpoint's limits
+        limits = dict(DEFAULT_ADMISSION_LIMITS)
+        for endpoint, override in app.config.get('ADMISSION_LIMITS', {}).items():
+            limits[endpoint] = {**limits.get(endpoint, {}), **override} if override else None
+        self.configure(app.config.get('ADMISSION_CONTROL_ENABLED', True), limits)
+        app.extensions['admission'] = self
+
+    def configure(self, enabled: bool, limits: dict):
+        with self._lock:
+            self.enabled = bool(enabled)
+            self._limiters = {
+                endpoint: _EndpointLimiter(endpoint_limits, self._clock())
+                for endpoint, endpoint_limits in limits.items()
+                if endpoint_limits
+            }
+
+    def admit(self, endpoint: str, client: Optional[str], cost: float):
+        """
+        Charge cost to the client's and the global bucket of endpoint.
+
+        Both buckets are checked before either is charged, so a rejected
+        request costs nothing. A cost larger than a bucket's burst is capped
+        at the burst, so it can still be admitted when the bucket is full.
+
+        Raises:
+            AdmissionRejected: with the time until the request would fit
+        """
+        if not self.enabled:
+            return
+        limiter = self._limiters.get(endpoint)
+        if limiter is None:
+            return
+
+        now = self._clock()
+        with self._lock:
+            client_bucket = limiter.client_bucket(client or 'unknown', now)
+            global_bucket = limiter.global_bucket
+            client_bucket.refill(now)
+            global_bucket.refill(now)
+            client_cost = min(cost, client_bucket.burst)
+            global_cost = min(cost, global_bucket.burst)
+
+            client_wait = client_bucket.wait_for(client_cost)
+            if client_wait > 0:
+                limiter.shed_client += 1
+                raise AdmissionRejected(self._retry_after(client_wait), 'client')
+            global_wait = global_bucket.wait_for(global_cost)
+            if global_wait > 0:
+                limiter.shed_global += 1
+                raise AdmissionRejected(self._retry_after(global_wait), 'global')
+
+            client_bucket.tokens -= client_cost
+            global_bucket.tokens -= global_cost
+            limiter.admitted += 1
+            limiter.cost_admitted += cost
+
+    def admit_request(self, cost: float):
+        """admit() for the current request's endpoint and client address."""
+        self.admit(request.endpoint.rsplit('.', 1)[-1], request.remote_addr, cost)
+
+    @staticmethod
+    def _retry_after(wait: float) -> int:
+        return 60 if math.isinf(wait) else max(1, math.ceil(wait))
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    'admitted': limiter.admitted,
+                    'shed_client': limiter.shed_client,
+                    'shed_global': limiter.shed_global,
+                    'cost_admitted': round(limiter.cost_admitted, 2),
+                    'global_tokens': round(limiter.global_bucket.tokens, 2),
+                    'tracked_clients': len(limiter.clients),
+                }
+                for endpoint, limiter in self._limiters.items()
+            }
+            return {
+                'enabled': self.enabled,
+                'shed_total': sum(e['shed_client'] + e['shed_global'] for e in endpoints.values()),
+                'endpoints': endpoints,
+            }
+
+
+admission = AdmissionController()
@@ -0,0 +1,143 @@
+"""
+Answer Store Service
+
+One place for reading and writing a session's image mapping and answers,
+whichever schema the session uses:
+
+- rows: TestSession.image_mapping JSON plus one Answer row per image
+- packed: a single SessionAnswers row of fixed-width byte columns
+
+A session is packed if and only if it has a SessionAnswers row, so both
+kinds can live side by side while scripts/migrate_pack_answers.py converts
+old sessions. ANSWER_STORAGE only decides how new sessions are stored.
+Readers get Answer rows or PackedAnswer objects, which share to_dict() and
+the attributes ResultsAnalyzer uses.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import current_app
+
+from models import db
+from models.answer import Answer
+from models.session_answers import SessionAnswers
+from models.test_session import TestSession
+
+ANSWER_STORAGE_MODES = ('rows', 'packed')
+
+
+def storage_mode() -> str:
+    mode = current_app.config.get('ANSWER_STORAGE', 'rows')
+    if mode not in ANSWER_STORAGE_MODES:
+        raise ValueError(f"ANSWER_STORAGE must be one of {ANSWER_STORAGE_MODES}, got {mode!r}")
+    return mode
+
+
+def init_session_storage(session: TestSession, image_mapping: Optional[Dict]):
+    """
+    Attach a new session's image mapping in the configured schema. Mappings
+    into pools too large for the packed columns are stored as rows instead.
+    """
+    if storage_mode() == 'packed':
+        if SessionAnswers.fits_mapping(image_mapping):
+            session.image_mapping = None
+            session.packed_answers = SessionAnswers(image_ids=SessionAnswers.pack_mapping(image_mapping))
+            return
+        current_app.logger.warning("Image pool has IDs above 254, storing the session's answers as rows")
+    session.image_mapping = {str(k): v for k, v in image_mapping.items()} if image_mapping else None
+
+
+def get_image_mapping(session: TestSession) -> Optional[Dict[str, int]]:
+    """The session's {"1": image_id, ...} mapping, or None for on-the-fly sessions."""
+    if session.packed_answers is not None:
+        return session.packed_answers.image_mapping
+    return session.image_mapping
+
+
+def has_answer(session: TestSession, image_number: int) -> bool:
+    if session.packed_answers is not None:
+        return session.packed_answers.is_answered(image_number)
+    return Answer.query.filter_by(session_id=session.id, image_number=image_number).first() is not None
+
+
+def save_answer(session: TestSession, image_number: int, correct_answer: int,
+                user_answer: Optional[int], dichromism_type: str):
+    """Stage an answer on the db session; the caller commits."""
+    if session.packed_answers is not None:
+        session.packed_answers.record(image_number, correct_answer, user_answer, dichromism_type)
+    else:
+        db.session.add(Answer(
+            session_id=session.id,
+            image_number=image_number,
+            correct_answer=correct_answer,
+            user_answer=user_answer,
+            dichromism_type=dichromism_type
+        ))
+
+
+def load_answers(db_session, session_id: str) -> Optional[List]:
+    """
+    Answers of a session through any ORM session, primary or replica.
+
+    Returns None if the session does not exist there (yet), so replica
+    callers can tell a lagging copy from a session with no answers.
+    """
+    packed = db_session.get(SessionAnswers, session_id)
+    if packed is not None:
+        return packed.answers()
+    if db_session.get(TestSession, session_id) is None:
+        return None
+    return db_session.scalars(
+        db.select(Answer).filter_by(session_id=session_id).order_by(Answer.image_number)
+    ).all()
+
+
+def last_written_at(session: TestSession, answers: List) -> datetime:
+    """When the session or one of its answers was last written."""
+    if session.packed_answers is not None:
+        return session.packed_answers.updated_at
+    return max([session.created_at] + [answer.answered_at for answer in answers])
+
+
+def pack_batch(after_id: str = '', batch_size: int = 500, keep_rows: bool = False):
+    """
+    Convert the next batch of row-stored sessions to packed storage.
+
+    Sessions are walked in id order starting after after_id, skipping those
+    already packed, and their answers are loaded with one query per batch.
+    Sessions whose mapping does not fit the packed columns stay row-stored.
+    The caller commits. Returns (last_id, packed_count); last_id is None
+    when no sessions are left.
+    """
+    sessions = (
+        TestSession.query
+        .outerjoin(SessionAnswers, SessionAnswers.session_id == TestSession.id)
+        .filter(TestSession.id > after_id, SessionAnswers.session_id.is_(None))
+        .order_by(TestSession.id)
+        .limit(batch_size)
+        .all()
+    )
+    if not sessions:
+        return None, 0
+
+    ids = [session.id for session in sessions]
+    answers_by_session = {session_id: [] for session_id in ids}
+    for answer in Answer.query.filter(Answer.session_id.in_(ids)).all():
+        answers_by_session[answer.session_id].append(answer)
+
+    packed_ids = []
+    for session in sessions:
+        if not SessionAnswers.fits_mapping(session.image_mapping):
+            continue
+        packed_ids.append(session.id)
+        packed = SessionAnswers(session_id=session.id, image_ids=SessionAnswers.pack_mapping(session.image_mapping))
+        for answer in answers_by_session[session.id]:
+            packed.record(answer.image_number, answer.correct_answer, answer.user_answer, answer.dichromism_type)
+        db.session.add(packed)
+        if not keep_rows:
+            session.image_mapping = None
+
+    if not keep_rows:
+        Answer.query.filter(Answer.session_id.in_(packed_ids)).delete(synchronize_session=False)
+    return ids[-1], len(packed_ids)
@@ -0,0 +1,272 @@
+"""
+Batch Analyzer Service
+
+Re-scores stored sessions with ResultsAnalyzer's rules using array
+operations instead of one analyze_session call per session. Sessions are
+read in id order in chunks straight into NumPy arrays of shape
+(sessions, 10):
+
+- answered: the image has an answer
+- correct: the answer matches the correct answer
+- types: dichromism type code (index into DICHROMISM_CODES)
+
+Packed sessions are decoded directly from their byte columns, row-stored
+sessions from one column query per chunk, so no ORM objects are built.
+Results are written back to session_result with one bulk insert per chunk.
+
+Used by scripts/rescore_sessions.py.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from models import db
+from models.answer import Answer
+from models.session_answers import DICHROMISM_CODES, IMAGES_PER_SESSION, UNSET, SessionAnswers
+from models.session_result import SessionResult
+from models.test_session import TestSession
+from services.results_analyzer import ResultsAnalyzer
+
+STATUSES = np.array(['incomplete', 'unreliable', 'normal', 'deficient'], dtype=object)
+CONFIDENCES = np.array(['none', 'low', 'medium', 'high'], dtype=object)
+# Codes 0-2 are the suspected dichromism type; 3 = multiple, 4 = none
+SUSPECTED_TYPES = np.array(list(DICHROMISM_CODES[:3]) + ['multiple', None], dtype=object)
+CONTROL_CODE = DICHROMISM_CODES.index('control')
+
+
+@dataclass
+class AnswerChunk:
+    session_ids: List[str]
+    answered: np.ndarray
+    correct: np.ndarray
+    types: np.ndarray
+
+    def __len__(self):
+        return len(self.session_ids)
+
+
+def _empty_chunk(session_ids: List[str]) -> AnswerChunk:
+    shape = (len(session_ids), IMAGES_PER_SESSION)
+    return AnswerChunk(
+        session_ids,
+        np.zeros(shape, dtype=bool),
+        np.zeros(shape, dtype=bool),
+        np.full(shape, UNSET, dtype=np.uint8)
+    )
+
+
+def _decode(columns) -> np.ndarray:
+    return np.frombuffer(b''.join(columns), dtype=np.uint8).reshape(-1, IMAGES_PER_SESSION)
+
+
+def load_chunk(session_ids: List[str], packed_ids: List[str]) -> AnswerChunk:
+    """Load the answers of the given sessions; packed_ids lists those with packed storage."""
+    chunk = _empty_chunk(session_ids)
+    position = {session_id: i for i, session_id in enumerate(session_ids)}
+
+    if packed_ids:
+        rows = db.session.execute(
+            db.select(
+                SessionAnswers.session_id,
+                SessionAnswers.correct_answers,
+                SessionAnswers.user_answers,
+                SessionAnswers.dichromism_types
+            ).where(SessionAnswers.session_id.in_(packed_ids))
+        ).all()
+        index = np.array([position[row[0]] for row in rows], dtype=np.intp)
+        correct_answers = _decode(row[1] for row in rows)
+        user_answers = _decode(row[2] for row in rows)
+        chunk.answered[index] = correct_answers != UNSET
+        # NULL_ANSWER never equals a correct answer, just like a None user_answer
+        chunk.correct[index] = chunk.answered[index] & (user_answers == correct_answers)
+        chunk.types[index] = _decode(row[3] for row in rows)
+
+    row_ids = sorted(set(session_ids).difference(packed_ids))
+    if row_ids:
+        rows = db.session.execute(
+            db.select(
+                Answer.session_id,
+                Answer.image_number,
+                Answer.correct_answer,
+                Answer.user_answer,
+                Answer.dichromism_type
+            ).where(Answer.session_id.in_(row_ids))
+        ).all()
+        if rows:
+            sessions = np.array([position[row[0]] for row in rows], dtype=np.intp)
+            images = np.array([row[1] for row in rows], dtype=np.intp) - 1
+            type_codes = {name: code for code, name in enumerate(DICHROMISM_CODES)}
+            chunk.answered[sessions, images] = True
+            chunk.correct[sessions, images] = [row[3] == row[2] for row in rows]
+            chunk.types[sessions, images] = [type_codes.get(row[4], UNSET) for row in rows]
+
+    return chunk
+
+
+class BatchAnalyzer:
+    """Array version of ResultsAnalyzer.analyze_session over an AnswerChunk."""
+
+    def __init__(self, analyzer: Optional[ResultsAnalyzer] = None):
+        self.analyzer = analyzer or ResultsAnalyzer()
+
+    def analyze(self, chunk: AnswerChunk) -> Dict[str, np.ndarray]:
+        """
+        Score every session of the chunk.
+
+        Returns arrays of length len(chunk): color_vision_status,
+        suspected_type and confidence (strings, as analyze_session returns
+        them), per-type error counts (errors, shape (n, 4) in
+        DICHROMISM_CODES order), complete and total_correct.
+        """
+        analyzer = self.analyzer
+        wrong = chunk.answered & ~chunk.correct
+        by_type = chunk.types[:, :, None] == np.arange(len(DICHROMISM_CODES), dtype=np.uint8)
+        by_type &= chunk.answered[:, :, None]
+        counts = by_type.sum(axis=1)
+        errors = (by_type & wrong[:, :, None]).sum(axis=1)
+
+        # Error rate per dichromism type, 0 for types without answers
+        tested = counts[:, :CONTROL_CODE]
+        rates = np.divide(errors[:, :CONTROL_CODE], tested,
+                          out=np.zeros(tested.shape, dtype=np.float64), where=tested > 0)
+        suspected = rates >= analyzer.deficient_error_rate
+        suspected_count = suspected.sum(axis=1)
+
+        complete = chunk.answered.sum(axis=1) == IMAGES_PER_SESSION
+        reliable = errors[:, CONTROL_CODE] <= analyzer.max_control_errors
+        scored = complete & reliable
+        normal = scored & (suspected_count == 0)
+        single = scored & (suspected_count == 1)
+        multiple = scored & (suspected_count > 1)
+
+        status = np.select([~complete, ~reliable, normal], [0, 1, 2], default=3)
+        suspected_code = np.select([single, multiple], [suspected.argmax(axis=1), 3], default=4)
+        single_rate = rates[np.arange(len(chunk)), suspected.argmax(axis=1)]
+        confidence = np.select(
+            [
+                normal & (rates <= analyzer.normal_error_rate).all(axis=1),
+                normal,
+                single & (single_rate == 1.0),
+                single,
+                multiple,
+            ],
+            [3, 2, 3, 2, 1],
+            default=0
+        )
+
+        return {
+            'color_vision_status': STATUSES[status],
+            'suspected_type': SUSPECTED_TYPES[suspected_code],
+            'confidence': CONFIDENCES[confidence],
+            'errors': errors,
+            'complete': complete,
+            'total_correct': chunk.correct.sum(axis=1),
+        }
+
+
+def result_rows(chunk: AnswerChunk, analysis: Dict[str, np.ndarray], rules: str) -> List[dict]:
+    """session_result rows for an analyzed chunk."""
+    scored_at = datetime.now(timezone.utc)
+    errors = analysis['errors'].tolist()
+    rows = []
+    for i, session_id in enumerate(chunk.session_ids):
+        complete = bool(analysis['complete'][i])
+        row = {
+            'session_id': session_id,
+            'color_vision_status': analysis['color_vision_status'][i],
+            'suspected_type': analysis['suspected_type'][i],
+            'confidence': analysis['confidence'][i],
+            'total_correct': int(analysis['total_correct'][i]),
+            'rules': rules,
+            'scored_at': scored_at,
+        }
+        for code, name in enumerate(DICHROMISM_CODES):
+            row[f'{name}_errors'] = errors[i][code] if complete else None
+        rows.append(row)
+    return rows
+
+
+def write_results(rows: List[dict]):
+    """Replace the stored results of these sessions; the caller commits."""
+    if not rows:
+        return
+    db.session.execute(
+        db.delete(SessionResult).where(SessionResult.session_id.in_([row['session_id'] for row in rows]))
+    )
+    db.session.execute(db.insert(SessionResult), rows)
+
+
+def sessions_to_score(rules: str, include_incomplete: bool = False, rescore_all: bool = False):
+    """
+    (session_id, is_packed) rows of sessions to score, in id order.
+
+    By default only completed sessions without a result under these rules.
+    """
+    query = (
+        db.select(TestSession.id, SessionAnswers.session_id.is_not(None))
+        .outerjoin(SessionAnswers, SessionAnswers.session_id == TestSession.id)
+        .order_by(TestSession.id)
+    )
+    if not include_incomplete:
+        query = query.where(TestSession.completed_at.is_not(None))
+    if not rescore_all:
+        scored = (
+            db.select(SessionResult.session_id)
+            .where(SessionResult.session_id == TestSession.id, SessionResult.rules == rules)
+            .exists()
+        )
+        query = query.where(~scored)
+    return query
+
+
+def rescore(
+    analyzer: Optional[ResultsAnalyzer] = None,
+    chunk_size: int = 5000,
+    include_incomplete: bool = False,
+    rescore_all: bool = False,
+    progress: Optional[Callable[[int, Dict[str, int]], None]] = None
+) -> Dict[str, int]:
+    """
+    Re-score stored sessions; must run inside an app context.
+
+    Each chunk is loaded, scored and written in its own transaction, so
+    memory stays bounded and an interrupted run resumes where it stopped.
+    Returns the number of sessions per color_vision_status.
+    """
+    batch = BatchAnalyzer(analyzer)
+    rules = batch.analyzer.rules
+    SessionResult.__table__.create(db.engine, checkfirst=True)
+
+    totals = {status: 0 for status in STATUSES}
+    scored = 0
+    after_id = ''
+    while True:
+        ids = db.session.execute(
+            sessions_to_score(rules, include_incomplete, rescore_all)
+            .where(TestSession.id > after_id)
+            .limit(chunk_size)
+        ).all()
+        if not ids:
+            break
+
+        session_ids = [row[0] for row in ids]
+        chunk = load_chunk(session_ids, [row[0] for row in ids if row[1]])
+        analysis = batch.analyze(chunk)
+        try:
+            write_results(result_rows(chunk, analysis, rules))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        statuses, counts = np.unique(analysis['color_vision_status'].astype(str), return_counts=True)
+        for status, count in zip(statuses, counts):
+            totals[status] += int(count)
+        after_id = session_ids[-1]
+        scored += len(session_ids)
+        if progress is not None:
+            progress(scored, totals)
+    return totals
@@ -0,0 +1,235 @@
+"""
+Confusion Index Service
+
+Answers "which sRGB colours look the same as this one to a dichromat" without
+simulating the 16.7M-colour cube per request. An offline build simulates every
+source colour once, quantizes the simulated colour into cubic buckets of
+bin_size levels, and stores the source colours sorted by bucket together with
+CSR-style bucket offsets. At query time only the buckets that intersect the
+search sphere are read from the memory-mapped arrays, and their few thousand
+candidates are re-simulated to apply the exact distance.
+
+Files per dichromat type in the index directory:
+    <type>_sources.npy   uint32 packed 0xRRGGBB source colours, grouped by bucket
+    <type>_offsets.npy   uint32 start of each bucket in sources (length n + 1)
+    manifest.json        bin size, source step and simulation parameters
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from utils.dichromat_sim import simulate_image, LINEAR_LUT_SIZE
+
+
+DICHROMAT_TYPES = ('protanopia', 'deuteranopia', 'tritanopia')
+INDEX_VERSION = 1
+DEFAULT_BIN_SIZE = 4
+BUILD_CHUNK = 1 << 20
+
+
+class ConfusionIndexMissing(Exception):
+    """Raised when no usable index exists for the requested dichromat type."""
+
+
+def pack_rgb(rgb: np.ndarray) -> np.ndarray:
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack_rgb(codes: np.ndarray) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.uint32)
+    return np.stack([(codes >> 16) & 0xFF, (codes >> 8) & 0xFF, codes & 0xFF], axis=-1).astype(np.uint8)
+
+
+def _simulate_codes(codes: np.ndarray, dichromat_type: str) -> np.ndarray:
+    return simulate_image(unpack_rgb(codes)[:, None, :], dichromat_type)[:, 0, :]
+
+
+def _bucket_ids(simulated: np.ndarray, bin_size: int, bins: int) -> np.ndarray:
+    q = (simulated // bin_size).astype(np.uint32)
+    return (q[:, 0] * bins + q[:, 1]) * bins + q[:, 2]
+
+
+def _save_atomic(path: Path, array: np.ndarray):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def build_index(
+    index_dir: str,
+    dichromat_types: Iterable[str] = DICHROMAT_TYPES,
+    bin_size: int = DEFAULT_BIN_SIZE,
+    source_step: int = 1
+) -> Dict[str, dict]:
+    """
+    Build the index files for the given dichromat types.
+
+    Args:
+        index_dir: Output directory, created if missing
+        dichromat_types: Types to build
+        bin_size: Edge length of a bucket in simulated sRGB levels
+        source_step: Sample every n-th level per channel (1 = full cube)
+
+    Returns:
+        Per-type summary with source and bucket counts
+    """
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    bins = -(-256 // bin_size)
+
+    levels = np.arange(0, 256, source_step, dtype=np.uint32)
+    codes = pack_rgb(np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(-1, 3))
+
+    summary = {}
+    for dichromat_type in dichromat_types:
+        buckets = np.empty(len(codes), dtype=np.uint32)
+        for start in range(0, len(codes), BUILD_CHUNK):
+            chunk = codes[start:start + BUILD_CHUNK]
+            buckets[start:start + BUILD_CHUNK] = _bucket_ids(_simulate_codes(chunk, dichromat_type), bin_size, bins)
+
+        order = np.argsort(buckets, kind='stable')
+        counts = np.bincount(buckets, minlength=bins ** 3)
+        offsets = np.zeros(bins ** 3 + 1, dtype=np.uint32)
+        np.cumsum(counts, out=offsets[1:])
+
+        _save_atomic(index_dir / f'{dichromat_type}_sources.npy', codes[order])
+        _save_atomic(index_dir / f'{dichromat_type}_offsets.npy', offsets)
+        del buckets, order
+
+        summary[dichromat_type] = {
+            'sources': int(len(codes)),
+            'occupied_buckets': int(np.count_nonzero(counts)),
+            'max_bucket': int(counts.max()),
+        }
+
+    manifest_path = index_dir / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    if manifest.get('bin_size') != bin_size or manifest.get('source_step') != source_step:
+        manifest = {'types': {}}
+    manifest.update({
+        'version': INDEX_VERSION,
+        'bin_size': bin_size,
+        'source_step': source_step,
+        'linear_lut_size': LINEAR_LUT_SIZE,
+    })
+    manifest['types'].update(summary)
+    tmp = manifest_path.with_name('manifest.json.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, manifest_path)
+
+    return summary
+
+
+class ConfusionIndex:
+    """Lazily memory-maps a built index and answers neighbourhood queries."""
+
+    def __init__(self, index_dir: Optional[str] = None):
+        self._lock = threading.Lock()
+        self.configure(index_dir)
+
+    def init_app(self, app):
+        self.configure(app.config.get('CONFUSION_INDEX_DIR'))
+        app.extensions['confusion_index'] = self
+
+    def configure(self, index_dir: Optional[str]):
+        with self._lock:
+            self.index_dir = Path(index_dir) if index_dir else None
+            self._manifest = None
+            self._arrays = {}
+
+    def _load_manifest(self) -> dict:
+        # Caller must hold self._lock
+        if self._manifest is None:
+            if self.index_dir is None:
+                raise ConfusionIndexMissing('No confusion index directory is configured')
+            manifest_path = self.index_dir / 'manifest.json'
+            if not manifest_path.exists():
+                raise ConfusionIndexMissing(f'Confusion index not found in {self.index_dir}')
+            manifest = json.loads(manifest_path.read_text())
+            # An index built against different simulation tables would
+            # silently return the wrong neighbourhoods
+            if manifest.get('version') != INDEX_VERSION or manifest.get('linear_lut_size') != LINEAR_LUT_SIZE:
+                raise ConfusionIndexMissing('Confusion index is stale, rebuild it')
+            self._manifest = manifest
+        return self._manifest
+
+    def _get_arrays(self, dichromat_type: str) -> tuple:
+        with self._lock:
+            manifest = self._load_manifest()
+            arrays = self._arrays.get(dichromat_type)
+            if arrays is None:
+                if dichromat_type not in manifest['types']:
+                    raise ConfusionIndexMissing(f'Confusion index for {dichromat_type} has not been built')
+                arrays = (
+                    np.load(self.index_dir / f'{dichromat_type}_sources.npy', mmap_mode='r'),
+                    np.load(self.index_dir / f'{dichromat_type}_offsets.npy', mmap_mode='r'),
+                )
+                self._arrays[dichromat_type] = arrays
+            return manifest, arrays
+
+    def available_types(self) -> list:
+        try:
+            with self._lock:
+                return [t for t in DICHROMAT_TYPES if t in self._load_manifest()['types']]
+        except ConfusionIndexMissing:
+            return []
+
+    def query(self, rgb: tuple, dichromat_type: str, radius: float = 4.0, limit: int = 100) -> dict:
+        """
+        Find source colours whose simulation lies within radius of rgb's.
+
+        Args:
+            rgb: (R, G, B) tuple in 0-255 range
+            dichromat_type: One of 'deuteranopia', 'protanopia', or 'tritanopia'
+            radius: Maximum Euclidean distance between simulated colours
+            limit: Maximum number of colours returned, nearest first
+
+        Returns:
+            Dict with the simulated colour, total match count and matching colours
+
+        Raises:
+            ConfusionIndexMissing: If the index for dichromat_type is unavailable
+        """
+        manifest, (sources, offsets) = self._get_arrays(dichromat_type)
+        bin_size = manifest['bin_size']
+        bins = -(-256 // bin_size)
+
+        target = np.array(simulate_image(np.array([[rgb]], dtype=np.uint8), dichromat_type)[0, 0], dtype=np.int16)
+        lo = np.clip((target - radius) // bin_size, 0, bins - 1).astype(int)
+        hi = np.clip((target + radius) // bin_size, 0, bins - 1).astype(int)
+
+        # Buckets along the last axis are contiguous, so each (r, g) pair of
+        # bins is a single slice of the memory map
+        slices = []
+        for r in range(lo[0], hi[0] + 1):
+            for g in range(lo[1], hi[1] + 1):
+                first = (r * bins + g) * bins
+                start, end = offsets[first + lo[2]], offsets[first + hi[2] + 1]
+                if end > start:
+                    slices.append(sources[start:end])
+
+        if not slices:
+            return {'simulated_rgb': target.tolist(), 'count': 0, 'colors': [], 'distances': []}
+
+        candidates = np.concatenate(slices)
+        distance = np.linalg.norm(_simulate_codes(candidates, dichromat_type).astype(np.int16) - target, axis=1)
+        keep = distance <= radius
+        candidates, distance = candidates[keep], distance[keep]
+        order = np.argsort(distance, kind='stable')[:limit]
+
+        return {
+            'simulated_rgb': target.tolist(),
+            'count': int(len(candidates)),
+            'colors': unpack_rgb(candidates[order]).tolist(),
+            'distances': np.round(distance[order], 2).tolist(),
+        }
+
+
+confusion_index = ConfusionIndex()
@@ -0,0 +1,112 @@
+"""
+Confusion Search Service
+
+Finds foreground colours that are isoluminant with a given background and
+collapse onto it under a dichromat simulation, while still differing from it
+for normal trichromats. These are the candidate palettes for new plates.
+
+The RGB cube is sampled on a regular grid whose luminance and per-type
+simulations are computed once per process; each query is then a handful of
+vectorized NumPy operations over the grid, and repeated queries are served
+from an LRU cache.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from utils.luminance import calculate_luminance_batch
+from utils.dichromat_sim import simulate_image, simulate_dichromat
+
+
+DEFAULT_GRID_STEP = 4
+
+
+@lru_cache(maxsize=8)
+def _get_grid(step: int) -> tuple:
+    """Return (colors, luminance) for the sampled RGB cube."""
+    levels = np.unique(np.append(np.arange(0, 256, step), 255))
+    r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+    colors = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1).astype(np.uint8)
+    luminance = calculate_luminance_batch(colors)
+    return colors, luminance
+
+
+@lru_cache(maxsize=8)
+def _get_simulated_grid(step: int, dichromat_type: str) -> np.ndarray:
+    """Simulated colours of the grid as int16 for distance arithmetic."""
+    colors, _ = _get_grid(step)
+    return simulate_image(colors[:, None, :], dichromat_type)[:, 0, :].astype(np.int16)
+
+
+@lru_cache(maxsize=1024)
+def find_confusable_colors(
+    bg_rgb: tuple,
+    dichromat_type: str,
+    luminance_tolerance: float = 0.02,
+    max_simulated_distance: float = 20.0,
+    min_original_distance: float = 20.0,
+    limit: int = 20,
+    step: int = DEFAULT_GRID_STEP
+) -> tuple:
+    """
+    Search the RGB grid for foregrounds confusable with bg_rgb.
+
+    Args:
+        bg_rgb: Background (R, G, B) tuple in 0-255 range
+        dichromat_type: One of 'deuteranopia', 'protanopia', or 'tritanopia'
+        luminance_tolerance: Maximum |Y_fg - Y_bg|
+        max_simulated_distance: Maximum RGB distance between the simulated colours
+        min_original_distance: Minimum RGB distance between the unsimulated colours
+        limit: Maximum number of candidates returned
+        step: Grid spacing of the sampled RGB cube
+
+    Returns:
+        Tuple of candidate dicts ranked by simulated distance, then luminance
+        delta. Results are cached, so callers must not mutate them.
+    """
+    colors, luminance = _get_grid(step)
+    bg_luminance = float(calculate_luminance_batch(np.array(bg_rgb))[0])
+
+    # Cheap luminance filter first; distances are computed on the survivors only
+    candidates = np.flatnonzero(np.abs(luminance - bg_luminance) <= luminance_tolerance)
+
+    bg = np.array(bg_rgb, dtype=np.int16)
+    original_distance = np.linalg.norm(colors[candidates].astype(np.int16) - bg, axis=1)
+    keep = original_distance >= min_original_distance
+    candidates, original_distance = candidates[keep], original_distance[keep]
+
+    simulated = _get_simulated_grid(step, dichromat_type)
+    bg_simulated = np.array(simulate_dichromat(bg_rgb, dichromat_type), dtype=np.int16)
+    simulated_distance = np.linalg.norm(simulated[candidates] - bg_simulated, axis=1)
+    keep = simulated_distance <= max_simulated_distance
+    candidates = candidates[keep]
+    original_distance = original_distance[keep]
+    simulated_distance = simulated_distance[keep]
+
+    luminance_delta = np.abs(luminance[candidates] - bg_luminance)
+    order = np.lexsort((luminance_delta, simulated_distance))[:limit]
+
+    return tuple(
+        {
+            'fg_rgb': colors[i].tolist(),
+            'luminance_fg': round(float(luminance[i]), 4),
+            'luminance_delta': round(float(delta), 4),
+            'simulated_fg_rgb': simulated[i].tolist(),
+            'simulated_distance': round(float(sim_dist), 2),
+            'original_distance': round(float(orig_dist), 2),
+        }
+        for i, delta, sim_dist, orig_dist in zip(
+            candidates[order], luminance_delta[order], simulated_distance[order], original_distance[order]
+        )
+    )
+
+
+def cache_stats() -> dict:
+    info = find_confusable_colors.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'entries': info.currsize,
+        'max_entries': info.maxsize,
+    }
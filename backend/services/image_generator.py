@@ -4,6 +4,8 @@ import random
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
+from utils.plate_vector import VECTOR_FORMATS, encode_vector
+
 
 class ImageGenerator:
     IMAGE_SIZE = 400
@@ -44,8 +46,10 @@ class ImageGenerator:
         {'type': 'control', 'numbers': [7, 16, 23, 38, 52]},
     ]
     
-    def __init__(self, seed_salt='dicrhomat-salt'):
+    def __init__(self, seed_salt='dicrhomat-salt', layout_bank=None):
         self.seed_salt = seed_salt
+        # Optional services.layout_bank.LayoutBank; without one dots are placed live
+        self.layout_bank = layout_bank
     
     def _get_seed(self, session_id: str, image_number: int) -> int:
         seed_str = f"{self.seed_salt}-{session_id}-{image_number}"
@@ -66,6 +70,11 @@ class ImageGenerator:
             'correct_answer': correct_answer
         }
     
+    @classmethod
+    def estimate_dot_count(cls) -> int:
+        """Expected number of dots of a test plate, for render cost estimates."""
+        return (cls.DOT_COUNT_MIN + cls.DOT_COUNT_MAX) // 2
+    
     def _vary_color(self, base_color: tuple, rng: random.Random, variation: int = 25) -> tuple:
         return tuple(
             max(0, min(255, c + rng.randint(-variation, variation)))
@@ -74,7 +83,7 @@ class ImageGenerator:
     
     def _check_collision(self, x: int, y: int, size: int, placed_dots: list) -> bool:
         """Check if a dot at (x, y) with given size would overlap with any placed dots."""
-        for dx, dy, dsize in placed_dots:
+        for dx, dy, dsize, *_ in placed_dots:
             distance_sq = (x - dx) ** 2 + (y - dy) ** 2
             min_distance = (size + dsize) / 2
             if distance_sq < min_distance ** 2:
@@ -107,13 +116,14 @@ class ImageGenerator:
 
         return np.array(img)
     
-    def generate_test_image(
+    def generate_test_layout(
         self,
         session_id: str,
         image_number: int,
         dichromism_type: str = None,
         correct_answer: int = None
-    ) -> bytes:
+    ) -> list:
+        """Place the dots of a test plate as a list of (x, y, dot_size, color) tuples."""
         if dichromism_type is None or correct_answer is None:
             config = self.get_test_config(session_id, image_number)
             dichromism_type = config['dichromism_type']
@@ -123,12 +133,12 @@ class ImageGenerator:
         rng = random.Random(seed)
         
         size = self.IMAGE_SIZE
-        img = Image.new('RGB', (size, size), (255, 255, 255))
-        draw = ImageDraw.Draw(img)
-        
         palette = self.COLOR_PALETTES[dichromism_type]
         number_mask = self._create_number_mask(correct_answer, size)
         
+        if self.layout_bank is not None:
+            return self._color_bank_layout(seed, number_mask, palette)
+        
         center = size // 2
         radius = (size // 2) - 10
 
@@ -161,12 +171,39 @@ class ImageGenerator:
 
             color = self._vary_color(base_color, rng)
 
+            placed_dots.append((x, y, dot_size, color))
+        
+        return placed_dots
+    
+    def _color_bank_layout(self, seed: int, number_mask: np.ndarray, palette: dict) -> list:
+        """Take a precomputed layout by seed and only classify and colour its dots."""
+        layout = self.layout_bank.layout(seed)
+        x, y, dot_size = layout[:, 0], layout[:, 1], layout[:, 2]
+        foreground = number_mask[y, x] > 128
+        base = np.where(foreground[:, None], np.array(palette['foreground']), np.array(palette['background']))
+        # Same +/-25 per-channel variation as _vary_color, drawn for all dots at once
+        variation = np.random.default_rng(seed).integers(-25, 26, size=base.shape)
+        colors = np.clip(base + variation, 0, 255)
+        return list(zip(x.tolist(), y.tolist(), dot_size.tolist(), map(tuple, colors.tolist())))
+    
+    def generate_test_image(
+        self,
+        session_id: str,
+        image_number: int,
+        dichromism_type: str = None,
+        correct_answer: int = None
+    ) -> bytes:
+        dots = self.generate_test_layout(session_id, image_number, dichromism_type, correct_answer)
+        
+        size = self.IMAGE_SIZE
+        img = Image.new('RGB', (size, size), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        
+        for x, y, dot_size, color in dots:
             draw.ellipse(
                 [x - dot_size//2, y - dot_size//2, x + dot_size//2, y + dot_size//2],
                 fill=color
             )
-
-            placed_dots.append((x, y, dot_size))
         
         mask = Image.new('L', (size, size), 0)
         mask_draw = ImageDraw.Draw(mask)
@@ -180,3 +217,22 @@ class ImageGenerator:
         buffer.seek(0)
         
         return buffer.getvalue()
+    
+    def generate_test_vector(
+        self,
+        session_id: str,
+        image_number: int,
+        dichromism_type: str = None,
+        correct_answer: int = None,
+        vector_format: str = 'svg'
+    ) -> bytes:
+        """Encode a test plate in one of VECTOR_FORMATS instead of rasterizing it."""
+        if vector_format not in VECTOR_FORMATS:
+            raise ValueError(f"vector_format must be one of {', '.join(VECTOR_FORMATS)}")
+        
+        dots = self.generate_test_layout(session_id, image_number, dichromism_type, correct_answer)
+        x = [dot[0] for dot in dots]
+        y = [dot[1] for dot in dots]
+        r = [dot[2] // 2 for dot in dots]
+        colors = [dot[3] for dot in dots]
+        return encode_vector(vector_format, x, y, r, colors, self.IMAGE_SIZE, 10)
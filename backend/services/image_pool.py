@@ -0,0 +1,292 @@
+"""
+Image Pool Service
+
+Pre-generated pools are versioned so a new pool can be rolled out while
+sessions are running. Layout under IMAGE_POOL_DIR:
+
+    metadata.json, image_*.png   unversioned pool from before versioning
+    versions/<version>/          one complete pool per version (metadata + images)
+    CURRENT                      name of the version new sessions get
+    NEXT                         name of the version about to become current
+
+Pointers are small files replaced with os.replace, so readers see either
+the old or the new version, never a mix. Without CURRENT the unversioned
+pool is current. New sessions record the version they were given
+(TestSession.pool_version, NULL for the unversioned pool) and keep resolving
+image IDs against it after a switch.
+
+Every process caches one ImageSelector per version. Versions are immutable
+once published; the unversioned pool can still be regenerated in place by
+generate_images.py, so its selector is reloaded when metadata.json changes.
+
+With IMAGE_POOL_WARM_INTERVAL set, serving processes start a background
+thread on their first request that watches NEXT and warms the staged
+version before it is switched in: it loads the selector and reads every
+image once, verifying it against its sha256, which also pulls the files
+into the page cache. After each round the worker writes the versions it has
+warmed to workers/<host>-<pid>.json in the pool directory.
+scripts/rollover_pool.py stages a version, waits until every live worker
+reports it warm, and only then switches.
+"""
+
+import json
+import os
+import re
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from services.image_selector import ImageSelector
+from services.pool_verifier import verify_pool
+
+CURRENT_POINTER = 'CURRENT'
+NEXT_POINTER = 'NEXT'
+WORKERS_DIR = 'workers'
+VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,31}$')
+# A version that failed verification is re-checked when its metadata changes,
+# otherwise only this often, since every check reads and hashes the whole pool
+WARM_RETRY_SECONDS = 600
+
+
+def validate_version(version: str) -> str:
+    """Version names become directory names and DB values, so keep them short and plain."""
+    if not VERSION_PATTERN.match(version or ''):
+        raise ValueError(f"Invalid pool version {version!r}: use up to 32 letters, digits, '.', '_' or '-'")
+    return version
+
+
+def write_pointer(pool_dir: Path, name: str, version: Optional[str]):
+    """Atomically point CURRENT or NEXT at version; None removes the pointer."""
+    path = Path(pool_dir) / name
+    if version is None:
+        path.unlink(missing_ok=True)
+        return
+    tmp = path.with_name(f'.{name}.{os.getpid()}.tmp')
+    tmp.write_text(validate_version(version) + '\n')
+    os.replace(tmp, path)
+
+
+def read_pointer(pool_dir: Path, name: str) -> Optional[str]:
+    try:
+        return (Path(pool_dir) / name).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _stat_key(path: Path) -> tuple:
+    stat = path.stat()
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def resolve_pool_dir(pool_dir: Optional[str]) -> str:
+    """IMAGE_POOL_DIR if set, otherwise the pool in backend/static/test_images."""
+    return pool_dir or str(Path(__file__).parent.parent / 'static' / 'test_images')
+
+
+def worker_reports(pool_dir: Path, max_age: float) -> list:
+    """Warm reports of workers that have written one in the last max_age seconds."""
+    reports = []
+    now = time.time()
+    for path in sorted((Path(pool_dir) / WORKERS_DIR).glob('*.json')):
+        try:
+            report = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if now - report.get('updated_at', 0) <= max_age:
+            reports.append({'worker': path.stem, **report})
+    return reports
+
+
+class ImagePool:
+    """Resolves pool versions to directories and cached selectors."""
+
+    def __init__(self, pool_dir: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.logger = None
+        self.configure(pool_dir, 0, 4)
+
+    def init_app(self, app):
+        self.configure(
+            resolve_pool_dir(app.config.get('IMAGE_POOL_DIR')),
+            app.config.get('IMAGE_POOL_WARM_INTERVAL', 0),
+            app.config.get('POOL_VERIFY_WORKERS', 4)
+        )
+        self.logger = app.logger
+        app.extensions['image_pool'] = self
+
+        if self.warm_interval > 0:
+            # Started by the first request, so CLI scripts that create the app do not warm
+            app.before_request(self._start_warming)
+
+    def _start_warming(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._warm_loop, daemon=True)
+            self._thread.start()
+
+    def configure(self, pool_dir: Optional[str], warm_interval: float, warm_workers: int):
+        with self._lock:
+            self.pool_dir = Path(pool_dir) if pool_dir else None
+            self.warm_interval = float(warm_interval)
+            self.warm_workers = max(1, int(warm_workers))
+            self._selectors = {}
+            self._unversioned_stat = None
+            self._warmed = {}
+            self._failed = {}
+            self._pointer_stat = None
+            self._current = None
+            self._switches = 0
+
+    def version_dir(self, version: Optional[str]) -> Path:
+        """Directory of a pool version; None is the unversioned pool."""
+        if version is None:
+            return self.pool_dir
+        return self.pool_dir / 'versions' / validate_version(version)
+
+    def metadata_path(self, version: Optional[str]) -> Path:
+        return self.version_dir(version) / 'metadata.json'
+
+    def current_version(self) -> Optional[str]:
+        """Version new sessions get; the pointer is re-read only when it changes."""
+        path = self.pool_dir / CURRENT_POINTER
+        try:
+            key = _stat_key(path)
+        except FileNotFoundError:
+            key = None
+        with self._lock:
+            if key != self._pointer_stat:
+                version = read_pointer(self.pool_dir, CURRENT_POINTER) if key is not None else None
+                if self._pointer_stat is not None and version != self._current:
+                    self._switches += 1
+                self._pointer_stat, self._current = key, version
+            return self._current
+
+    def next_version(self) -> Optional[str]:
+        return read_pointer(self.pool_dir, NEXT_POINTER)
+
+    def selector(self, version: Optional[str]) -> ImageSelector:
+        """
+        Cached selector for a version.
+
+        Raises:
+            FileNotFoundError: If the version has no metadata
+            ValueError: If its metadata is invalid
+        """
+        metadata_path = self.metadata_path(version)
+        if version is None:
+            # The unversioned pool may be regenerated in place
+            key = _stat_key(metadata_path)
+            with self._lock:
+                if key != self._unversioned_stat:
+                    self._selectors.pop(None, None)
+                    self._warmed.pop(None, None)
+                    self._unversioned_stat = key
+        with self._lock:
+            selector = self._selectors.get(version)
+        if selector is not None:
+            return selector
+        selector = ImageSelector(str(metadata_path))
+        with self._lock:
+            return self._selectors.setdefault(version, selector)
+
+    def warm(self, version: Optional[str]) -> dict:
+        """
+        Load a version's selector and read and verify all its images.
+
+        Returns the verification report; a version with mismatched files is
+        not marked as warmed.
+        """
+        selector = self.selector(version)
+        report = verify_pool(str(self.metadata_path(version)), workers=self.warm_workers,
+                             images=selector.metadata['images'])
+        if not report['mismatched']:
+            with self._lock:
+                self._warmed[version] = time.time()
+        return report
+
+    def is_warm(self, version: Optional[str]) -> bool:
+        with self._lock:
+            return version in self._warmed
+
+    def warm_pending(self):
+        """
+        Warm the current and the staged version if this process has not yet.
+        Versions that failed verification wait for new metadata or
+        WARM_RETRY_SECONDS before being verified again.
+        """
+        for version in (self.current_version(), self.next_version()):
+            metadata_path = self.metadata_path(version)
+            if self.is_warm(version) or not metadata_path.exists():
+                continue
+            key = _stat_key(metadata_path)
+            with self._lock:
+                failed = self._failed.get(version)
+            if failed is not None and failed[0] == key and time.time() - failed[1] < WARM_RETRY_SECONDS:
+                continue
+
+            report = self.warm(version)
+            with self._lock:
+                if report['mismatched']:
+                    self._failed[version] = (key, time.time())
+                else:
+                    self._failed.pop(version, None)
+            if report['mismatched'] and self.logger is not None:
+                self.logger.error(f"Pool version {version or 'unversioned'} failed verification while warming: "
+                                  f"{[m['filename'] for m in report['mismatches']]}")
+
+    @property
+    def worker_name(self) -> str:
+        return f'{socket.gethostname()}-{os.getpid()}'
+
+    def report_warm(self):
+        """Record the versions this worker has warmed for scripts/rollover_pool.py."""
+        with self._lock:
+            warmed = sorted(v for v in self._warmed if v is not None)
+        workers_dir = self.pool_dir / WORKERS_DIR
+        workers_dir.mkdir(exist_ok=True)
+        path = workers_dir / f'{self.worker_name}.json'
+        tmp = path.with_name(f'.{path.name}.tmp')
+        tmp.write_text(json.dumps({'warmed': warmed, 'updated_at': time.time()}))
+        os.replace(tmp, path)
+
+    def _warm_loop(self):
+        while True:
+            try:
+                self.warm_pending()
+                self.report_warm()
+            except Exception as e:
+                if self.logger is not None:
+                    self.logger.warning(f"Warming the image pool failed: {e}")
+            if self._stop.wait(self.warm_interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+        if self.pool_dir is not None:
+            (self.pool_dir / WORKERS_DIR / f'{self.worker_name}.json').unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        current = self.current_version()
+        next_version = self.next_version()
+        with self._lock:
+            return {
+                'current_version': current,
+                'next_version': next_version,
+                'next_warm': next_version is not None and next_version in self._warmed,
+                'cached_versions': sorted(v or '' for v in self._selectors),
+                'warmed_versions': sorted(v or '' for v in self._warmed),
+                'failed_versions': sorted(v or '' for v in self._failed),
+                'switches_seen': self._switches,
+            }
+
+
+image_pool = ImagePool()
@@ -43,6 +43,8 @@ class ImageSelector:
         if self.metadata.get('version') != '1.0':
             raise ValueError(f"Unsupported metadata version: {self.metadata.get('version')}")
 
+        self._images_by_id = {img['id']: img for img in self.metadata['images']}
+
         # Organize images by dichromism type for efficient selection
         self.protanopia_images = [
             img for img in self.metadata['images']
@@ -124,11 +126,7 @@ class ImageSelector:
         Returns:
             Dictionary containing image metadata, or None if not found
         """
-        # Find image by id
-        for img in self.metadata['images']:
-            if img['id'] == image_id:
-                return img
-        return None
+        return self._images_by_id.get(image_id)
 
     def get_image_info_by_filename(self, filename: str) -> Optional[dict]:
         """
@@ -0,0 +1,262 @@
+"""
+Dot Layout Bank Service
+
+Placing the 2000-3000 non-overlapping dots of a test plate is by far the
+most expensive part of rendering one, yet the geometry does not depend on
+the palette or the number shown. The layout bank is built offline: K dot
+layouts (positions and sizes) are placed once, with a spatial grid and more
+placement attempts than a live render can afford, and stored as
+memory-mappable .npy files. ImageGenerator then picks a layout by seed and
+only has to classify its dots against the digit mask and colour them.
+
+Files in the bank directory:
+    dots.npy        int16 (x, y, dot_size) rows of all layouts, concatenated
+    offsets.npy     int64 start of each layout in dots (length K + 1)
+    manifest.json   layout count, image size, dot parameters and bank_id
+
+bank_id is a hash of the dots, so plates rendered from a bank (for example
+an image pool built with it) can later be re-rendered from the same bank.
+numpy is imported on first use, so configuring the bank at app start-up
+costs nothing.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+BANK_VERSION = 1
+DEFAULT_LAYOUT_COUNT = 512
+# Placement attempts per target dot; live renders use 10
+ATTEMPTS_PER_DOT = 30
+# Consecutive rejected candidates after which a layout counts as full
+MAX_CONSECUTIVE_MISSES = 2000
+
+
+class LayoutBankMissing(Exception):
+    """Raised when no usable layout bank is configured or built."""
+
+
+def place_layout(seed: int, image_size: int, dot_count_min: int, dot_count_max: int,
+                 dot_size_min: int, dot_size_max: int) -> list:
+    """
+    Place one layout of (x, y, dot_size) dots within the plate circle.
+
+    Uses ImageGenerator's dot count and size ranges, but samples positions
+    uniformly over the disc area rather than the radius, so dots do not pile
+    up in the centre and the edge of the plate is filled as well. Dots are
+    bucketed in a grid of cells as wide as the largest possible centre
+    distance of two touching dots, so each collision check only looks at
+    the 3x3 cells around the candidate. Placement stops early once the disc
+    is effectively full.
+    """
+    rng = random.Random(seed)
+    center = image_size // 2
+    radius = center - 10
+    cell = dot_size_max
+    grid = {}
+    dots = []
+
+    target = rng.randint(dot_count_min, dot_count_max)
+    misses = 0
+    for _ in range(target * ATTEMPTS_PER_DOT):
+        if len(dots) >= target or misses >= MAX_CONSECUTIVE_MISSES:
+            break
+        misses += 1
+        angle = rng.uniform(0, 2 * math.pi)
+        r = radius * math.sqrt(rng.random())
+        x = int(center + r * math.cos(angle))
+        y = int(center + r * math.sin(angle))
+        dot_size = rng.randint(dot_size_min, dot_size_max)
+        if not (0 <= x < image_size and 0 <= y < image_size):
+            continue
+
+        cx, cy = x // cell, y // cell
+        collides = False
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for dx, dy, dsize in grid.get((gx, gy), ()):
+                    min_distance = (dot_size + dsize) / 2
+                    if (x - dx) ** 2 + (y - dy) ** 2 < min_distance ** 2:
+                        collides = True
+                        break
+                if collides:
+                    break
+            if collides:
+                break
+        if collides:
+            continue
+
+        misses = 0
+        dot = (x, y, dot_size)
+        grid.setdefault((cx, cy), []).append(dot)
+        dots.append(dot)
+    return dots
+
+
+def _placement_params() -> dict:
+    from services.image_generator import ImageGenerator
+    return {
+        'image_size': ImageGenerator.IMAGE_SIZE,
+        'dot_count_min': ImageGenerator.DOT_COUNT_MIN,
+        'dot_count_max': ImageGenerator.DOT_COUNT_MAX,
+        'dot_size_min': ImageGenerator.DOT_SIZE_MIN,
+        'dot_size_max': ImageGenerator.DOT_SIZE_MAX,
+    }
+
+
+def _place_for_build(args: tuple) -> list:
+    seed, params = args
+    return place_layout(seed, **params)
+
+
+def _save_atomic(path: Path, array):
+    import numpy as np
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def build_bank(
+    bank_dir: str,
+    count: int = DEFAULT_LAYOUT_COUNT,
+    seed: str = 'layout-bank',
+    workers: int = 0,
+    progress: Optional[Callable[[int], None]] = None
+) -> dict:
+    """
+    Build a bank of count layouts into bank_dir, replacing any existing bank.
+
+    Layout i is placed with a seed derived from seed and i, so the same
+    arguments always build the same bank. Returns the manifest.
+    """
+    import numpy as np
+
+    bank_dir = Path(bank_dir)
+    bank_dir.mkdir(parents=True, exist_ok=True)
+    params = _placement_params()
+    jobs = [
+        (int(hashlib.md5(f'{seed}-{i}'.encode()).hexdigest()[:8], 16), params)
+        for i in range(count)
+    ]
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    try:
+        placed = executor.map(_place_for_build, jobs) if executor else map(_place_for_build, jobs)
+        layouts = []
+        for layout in placed:
+            layouts.append(np.array(layout, dtype=np.int16).reshape(-1, 3))
+            if progress is not None:
+                progress(len(layouts))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum([len(layout) for layout in layouts], out=offsets[1:])
+    dots = np.concatenate(layouts) if layouts else np.zeros((0, 3), dtype=np.int16)
+
+    # Manifest last, so a reader never pairs it with half-written arrays
+    manifest_path = bank_dir / 'manifest.json'
+    manifest_path.unlink(missing_ok=True)
+    _save_atomic(bank_dir / 'dots.npy', dots)
+    _save_atomic(bank_dir / 'offsets.npy', offsets)
+    manifest = {
+        'version': BANK_VERSION,
+        'layouts': count,
+        'seed': seed,
+        'bank_id': hashlib.sha256(dots.tobytes()).hexdigest()[:16],
+        'total_dots': int(len(dots)),
+        **params,
+    }
+    tmp = manifest_path.with_name('manifest.json.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+class LayoutBank:
+    """Lazily memory-maps a built bank and hands out layouts by seed."""
+
+    def __init__(self, bank_dir: Optional[str] = None):
+        self._lock = threading.Lock()
+        self.configure(bank_dir)
+
+    def init_app(self, app):
+        self.configure(app.config.get('DOT_LAYOUT_BANK_DIR'))
+        app.extensions['layout_bank'] = self
+
+    def configure(self, bank_dir: Optional[str]):
+        with self._lock:
+            self.bank_dir = Path(bank_dir) if bank_dir else None
+            self._manifest = None
+            self._arrays = None
+
+    def _load_manifest(self) -> dict:
+        # Caller must hold self._lock
+        if self._manifest is None:
+            if self.bank_dir is None:
+                raise LayoutBankMissing('No layout bank directory is configured')
+            manifest_path = self.bank_dir / 'manifest.json'
+            if not manifest_path.exists():
+                raise LayoutBankMissing(f'Layout bank not found in {self.bank_dir}')
+            manifest = json.loads(manifest_path.read_text())
+            # Layouts placed for another plate size or dot range would not fit
+            if manifest.get('version') != BANK_VERSION or any(
+                manifest.get(name) != value for name, value in _placement_params().items()
+            ):
+                raise LayoutBankMissing('Layout bank is stale, rebuild it')
+            self._manifest = manifest
+        return self._manifest
+
+    @property
+    def bank_id(self) -> Optional[str]:
+        """Id of the configured bank, or None if there is no usable bank."""
+        try:
+            with self._lock:
+                return self._load_manifest()['bank_id']
+        except LayoutBankMissing:
+            return None
+
+    def layout(self, seed: int):
+        """
+        The (n, 3) int16 array of (x, y, dot_size) rows for a plate seed.
+
+        Raises:
+            LayoutBankMissing: If no usable bank is available
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+            if self._arrays is None:
+                import numpy as np
+                self._arrays = (
+                    np.load(self.bank_dir / 'dots.npy', mmap_mode='r'),
+                    np.load(self.bank_dir / 'offsets.npy', mmap_mode='r'),
+                )
+            dots, offsets = self._arrays
+        index = seed % manifest['layouts']
+        return dots[offsets[index]:offsets[index + 1]]
+
+
+layout_bank = LayoutBank()
+
+
+def bank_for_render(bank_id: Optional[str], bank_dir: Optional[str]) -> Optional[LayoutBank]:
+    """
+    The layout bank for a render pool job, or None to place dots live.
+
+    Jobs carry the bank they expect; a worker whose bank is missing or has
+    been rebuilt since places dots live rather than using other layouts.
+    """
+    if bank_id is None or bank_dir is None:
+        return None
+    if layout_bank.bank_dir != Path(bank_dir):
+        # Render pool workers are spawned without the app's configuration
+        layout_bank.configure(bank_dir)
+    return layout_bank if layout_bank.bank_id == bank_id else None
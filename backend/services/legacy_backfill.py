@@ -0,0 +1,163 @@
+"""
+Legacy Plate Backfill Service
+
+Sessions created before the image pool have no image mapping, so their
+plates used to be rendered live on every fetch and their answers checked
+through ImageGenerator.get_test_config. The backfill renders each of those
+plates once with the session's original seed, writes it under
+LEGACY_PLATE_DIR and records a LegacyPlate row holding the file and the
+plate's correct answer and type. Plates are rendered with live dot
+placement, never from the layout bank, so they match what these sessions
+were shown, and correct answers do not change.
+
+Used by scripts/backfill_legacy_plates.py.
+"""
+
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from models import db
+from models.legacy_plate import LegacyPlate
+from models.session_answers import SessionAnswers
+from models.test_session import TestSession
+
+IMAGES_PER_SESSION = 10
+
+
+def plate_filename(session_id: str, image_number: int) -> str:
+    """Path of a plate relative to LEGACY_PLATE_DIR, fanned out by id prefix."""
+    return f'{session_id[:2]}/{session_id}-{image_number:02d}.png'
+
+
+def render_legacy_plates(seed_salt: str, session_id: str) -> list:
+    """Render all plates of one session; runs in backfill worker processes."""
+    from services.image_generator import ImageGenerator
+    generator = ImageGenerator(seed_salt)
+    plates = []
+    for image_number in range(1, IMAGES_PER_SESSION + 1):
+        config = generator.get_test_config(session_id, image_number)
+        plates.append({
+            'image_number': image_number,
+            'correct_answer': config['correct_answer'],
+            'dichromism_type': config['dichromism_type'],
+            'image_bytes': generator.generate_test_image(
+                session_id, image_number, config['dichromism_type'], config['correct_answer']
+            ),
+        })
+    return plates
+
+
+def legacy_sessions_query(expiry_hours: Optional[float] = None, skip_backfilled: bool = True):
+    """
+    Sessions without an image mapping in either answer schema, by default
+    only those without backfilled plates. With expiry_hours, sessions that
+    can no longer be fetched (older than the session expiry) are left out.
+    """
+    query = (
+        TestSession.query
+        .outerjoin(SessionAnswers, SessionAnswers.session_id == TestSession.id)
+        .filter(
+            # Sessions from before the column have SQL NULL; later ones stored JSON null
+            db.or_(TestSession.image_mapping.is_(None), db.cast(TestSession.image_mapping, db.String) == 'null'),
+            SessionAnswers.image_ids.is_(None)
+        )
+    )
+    if skip_backfilled:
+        backfilled = db.select(LegacyPlate.session_id).where(LegacyPlate.session_id == TestSession.id).exists()
+        query = query.filter(~backfilled)
+    if expiry_hours is not None:
+        # created_at is stored naive in UTC
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=expiry_hours)
+        query = query.filter(TestSession.created_at > cutoff)
+    return query
+
+
+def _write_plate(plate_dir: Path, filename: str, image_bytes: bytes):
+    path = plate_dir / filename
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(image_bytes)
+    os.replace(tmp_path, path)
+
+
+def store_plates(plate_dir: Path, session_id: str, plates: list):
+    """Write a session's rendered plates and stage their LegacyPlate rows."""
+    for plate in plates:
+        filename = plate_filename(session_id, plate['image_number'])
+        _write_plate(plate_dir, filename, plate['image_bytes'])
+        db.session.add(LegacyPlate(
+            session_id=session_id,
+            image_number=plate['image_number'],
+            correct_answer=plate['correct_answer'],
+            dichromism_type=plate['dichromism_type'],
+            filename=filename,
+            sha256=hashlib.sha256(plate['image_bytes']).hexdigest(),
+            file_size=len(plate['image_bytes'])
+        ))
+
+
+def backfill(
+    plate_dir: str,
+    seed_salt: str,
+    batch_size: int = 100,
+    workers: int = 0,
+    expiry_hours: Optional[float] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> dict:
+    """
+    Backfill every legacy session; must run inside an app context.
+
+    Sessions are read in id order in batches. Each batch is rendered
+    (across worker processes if workers > 0), written and committed before
+    the next one is read, so memory stays bounded and an interrupted run
+    resumes where it stopped. Returns session and plate counts.
+    """
+    plate_dir = Path(plate_dir)
+    plate_dir.mkdir(parents=True, exist_ok=True)
+    LegacyPlate.__table__.create(db.engine, checkfirst=True)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    sessions_done = 0
+    after_id = ''
+    try:
+        while True:
+            session_ids = [
+                session.id for session in
+                legacy_sessions_query(expiry_hours)
+                .filter(TestSession.id > after_id)
+                .order_by(TestSession.id)
+                .limit(batch_size)
+                .all()
+            ]
+            if not session_ids:
+                break
+
+            if executor is not None:
+                rendered = executor.map(render_legacy_plates, [seed_salt] * len(session_ids), session_ids)
+            else:
+                rendered = (render_legacy_plates(seed_salt, session_id) for session_id in session_ids)
+
+            try:
+                for session_id, plates in zip(session_ids, rendered):
+                    store_plates(plate_dir, session_id, plates)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            db.session.expunge_all()
+
+            after_id = session_ids[-1]
+            sessions_done += len(session_ids)
+            if progress is not None:
+                progress(sessions_done, sessions_done * IMAGES_PER_SESSION)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {'sessions': sessions_done, 'plates': sessions_done * IMAGES_PER_SESSION}
@@ -0,0 +1,208 @@
+"""
+Pool Verifier Service
+
+Checks pre-generated pool images against the sha256 values recorded in
+metadata.json, so a truncated or corrupted file is caught before a user is
+served a broken plate.
+
+verify_pool() hashes files in parallel on a thread pool; reads go through
+mmap and hashlib releases the GIL while digesting, so threads scale across
+cores. PoolVerifier wires this into the app: an optional full check at
+startup, and an optional background mode that re-verifies a small rotating
+slice of the pool on each interval using a single thread.
+"""
+
+import hashlib
+import json
+import mmap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+def hash_file(path: Path) -> str:
+    """Return the sha256 hex digest of a file, read through mmap."""
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return hashlib.sha256(b'').hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def check_image(pool_dir: Path, image: dict) -> Optional[dict]:
+    """Verify one metadata entry and return a mismatch record, or None if it is intact."""
+    path = pool_dir / image['filename']
+    mismatch = {'id': image['id'], 'filename': image['filename']}
+    try:
+        size = path.stat().st_size
+        if 'file_size' in image and size != image['file_size']:
+            return {**mismatch, 'reason': 'size', 'expected': image['file_size'], 'actual': size}
+        actual = hash_file(path)
+    except FileNotFoundError:
+        return {**mismatch, 'reason': 'missing'}
+    except OSError as e:
+        return {**mismatch, 'reason': 'unreadable', 'actual': str(e)}
+
+    if actual != image['sha256']:
+        return {**mismatch, 'reason': 'sha256', 'expected': image['sha256'], 'actual': actual}
+    return None
+
+
+def load_pool_images(metadata_path: str) -> list:
+    return json.loads(Path(metadata_path).read_text())['images']
+
+
+def verify_pool(
+    metadata_path: str,
+    image_ids: Optional[Iterable[int]] = None,
+    workers: int = 4,
+    images: Optional[list] = None
+) -> dict:
+    """
+    Hash pool files and compare them with their metadata.
+
+    Args:
+        metadata_path: Path to the pool's metadata.json
+        image_ids: Only verify these image IDs (default: all)
+        workers: Hashing threads
+        images: Pre-loaded metadata entries, to avoid re-reading the file
+
+    Returns:
+        Dict with checked and mismatch counts, the mismatch records and
+        elapsed seconds
+    """
+    start = time.time()
+    if images is None:
+        images = load_pool_images(metadata_path)
+    if image_ids is not None:
+        wanted = set(image_ids)
+        images = [img for img in images if img['id'] in wanted]
+
+    pool_dir = Path(metadata_path).parent
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(lambda img: check_image(pool_dir, img), images))
+
+    mismatches = [r for r in results if r is not None]
+    return {
+        'checked': len(images),
+        'mismatched': len(mismatches),
+        'mismatches': mismatches,
+        'seconds': round(time.time() - start, 3),
+    }
+
+
+class PoolVerifier:
+    """Startup and background integrity checks for the image pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.metadata_path = None
+        self._follows_pool = False
+        self._reset()
+
+    def _reset(self):
+        self._cursor = 0
+        self._runs = 0
+        self._checked = 0
+        self._last_run = None
+        self._bad = {}
+
+    def init_app(self, app):
+        """Run the optional startup check and start the optional background mode."""
+        from services.image_pool import image_pool
+        self.metadata_path = str(image_pool.metadata_path(image_pool.current_version()))
+        self._follows_pool = True
+        self.workers = app.config.get('POOL_VERIFY_WORKERS', 4)
+        self.interval = app.config.get('POOL_VERIFY_INTERVAL', 0)
+        self.sample_fraction = app.config.get('POOL_VERIFY_SAMPLE_FRACTION', 0.05)
+        self.logger = app.logger
+        app.extensions['pool_verifier'] = self
+
+        if not Path(self.metadata_path).exists():
+            return
+
+        if app.config.get('POOL_VERIFY_ON_STARTUP'):
+            report = self.run(workers=self.workers)
+            if report['mismatched']:
+                app.logger.error(f"Image pool integrity check failed for {report['mismatched']} images: "
+                                 f"{[m['filename'] for m in report['mismatches']]}")
+            else:
+                app.logger.info(f"Image pool integrity check passed ({report['checked']} images, {report['seconds']}s)")
+
+        if self.interval > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._background_loop, daemon=True)
+            self._thread.start()
+
+    def run(self, image_ids: Optional[Iterable[int]] = None, workers: int = 1, images: Optional[list] = None) -> dict:
+        """Verify the pool (or some of its images) and record the outcome."""
+        report = verify_pool(self.metadata_path, image_ids, workers, images)
+        with self._lock:
+            self._runs += 1
+            self._checked += report['checked']
+            self._last_run = time.time()
+            checked_ids = set(image_ids) if image_ids is not None else None
+            # A re-verified image clears any earlier mismatch for it
+            for image_id in list(self._bad):
+                if checked_ids is None or image_id in checked_ids:
+                    del self._bad[image_id]
+            for mismatch in report['mismatches']:
+                self._bad[mismatch['id']] = mismatch
+        return report
+
+    def _follow_rollover(self):
+        """After a pool rollover, verify the new current version from the start."""
+        from services.image_pool import image_pool
+        path = str(image_pool.metadata_path(image_pool.current_version()))
+        if path != self.metadata_path:
+            with self._lock:
+                self.metadata_path = path
+                self._cursor = 0
+                self._bad = {}
+
+    def run_sample(self) -> dict:
+        """Verify the next slice of the pool; a full pass takes 1 / sample_fraction runs."""
+        if self._follows_pool:
+            self._follow_rollover()
+        images = load_pool_images(self.metadata_path)
+        if not images:
+            return self.run(image_ids=[], images=images)
+
+        batch = max(1, int(len(images) * self.sample_fraction))
+        with self._lock:
+            start = self._cursor % len(images)
+            self._cursor = start + batch
+        ids = [images[(start + i) % len(images)]['id'] for i in range(min(batch, len(images)))]
+        # One thread only: sampling must never compete with request traffic
+        report = self.run(image_ids=ids, workers=1, images=images)
+        for mismatch in report['mismatches']:
+            self.logger.error(f"Image pool file failed integrity check: {mismatch}")
+        return report
+
+    def _background_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_sample()
+            except Exception as e:
+                self.logger.warning(f"Background pool verification failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'runs': self._runs,
+                'checked': self._checked,
+                'last_run': self._last_run,
+                'mismatched_ids': sorted(self._bad),
+            }
+
+
+pool_verifier = PoolVerifier()
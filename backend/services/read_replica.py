@@ -0,0 +1,149 @@
+"""
+Read Replica Routing
+
+Read-only endpoints (results, reporting, exports, admin listings) can send
+their queries to a separate database bind, usually a streaming replica or a
+read-only connection pool, so they do not compete with answer writes on the
+primary. The bind is the 'read_replica' entry of SQLALCHEMY_BINDS, set from
+READ_REPLICA_URL; without it every read uses the primary db.session.
+
+Replicas lag, so reads stay read-your-writes in two ways:
+
+- Sessions written by this process within READ_YOUR_WRITES_SECONDS (for
+  example one that just completed) are read from the primary.
+- Callers pass an is_fresh check; a replica result that fails it (session
+  not replicated yet, or written by another worker within the window) is
+  re-read from the primary.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from models import db
+
+READ_REPLICA_BIND = 'read_replica'
+
+
+class ReadRouter:
+    """Chooses the primary or replica session for read-only queries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recent = {}
+        self.window = 0.0
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._fallbacks = 0
+
+    def init_app(self, app):
+        self.window = app.config.get('READ_YOUR_WRITES_SECONDS', 30)
+        app.extensions['read_router'] = self
+
+    @property
+    def configured(self) -> bool:
+        return READ_REPLICA_BIND in db.engines
+
+    def mark_written(self, key: str):
+        """Pin reads for key to the primary for the read-your-writes window."""
+        if self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._recent) > 10000:
+                self._recent = {k: t for k, t in self._recent.items() if t > now}
+            self._recent[key] = now + self.window
+
+    def recently_written(self, key: str) -> bool:
+        with self._lock:
+            expires = self._recent.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._recent[key]
+                return False
+            return True
+
+    def written_within_window(self, written_at: datetime) -> bool:
+        """Whether a row written at written_at (naive UTC allowed) may not have replicated yet."""
+        if written_at.tzinfo is None:
+            written_at = written_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - written_at < timedelta(seconds=self.window)
+
+    @contextmanager
+    def replica_session(self):
+        """A short-lived ORM session on the replica engine."""
+        with Session(db.engines[READ_REPLICA_BIND]) as session:
+            yield session
+
+    @contextmanager
+    def reporting_session(self):
+        """
+        Session for long bulk reads such as exports, which accept replica lag:
+        the replica if configured, otherwise the primary db.session. Callers
+        reading in pages end the transaction after each one, as
+        services/session_export.py does, rather than holding it throughout.
+        """
+        if self.configured:
+            with self._lock:
+                self._replica_reads += 1
+            with self.replica_session() as session:
+                yield session
+            return
+        with self._lock:
+            self._primary_reads += 1
+        yield db.session
+
+    def read(self, load: Callable, key: Optional[str] = None, is_fresh: Optional[Callable] = None):
+        """
+        Run load(db_session) against the replica when possible.
+
+        Args:
+            load: Function running the queries; must return plain or fully
+                loaded objects, since the replica session is closed afterwards
+            key: Entity the read is about, checked against recent writes
+            is_fresh: Predicate on the replica result; False re-runs load on
+                the primary
+
+        Returns:
+            Whatever load returns
+        """
+        if self.configured and not (key is not None and self.recently_written(key)):
+            try:
+                with self.replica_session() as session:
+                    result = load(session)
+            except Exception:
+                # An unreachable or broken replica must not take reads down
+                fresh = False
+            else:
+                fresh = is_fresh is None or is_fresh(result)
+            if fresh:
+                with self._lock:
+                    self._replica_reads += 1
+                return result
+            with self._lock:
+                self._fallbacks += 1
+
+        with self._lock:
+            self._primary_reads += 1
+        return load(db.session)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'configured': self.configured,
+                'replica_reads': self._replica_reads,
+                'primary_reads': self._primary_reads,
+                'fallbacks': self._fallbacks,
+                'pinned_keys': len(self._recent),
+            }
+
+
+read_router = ReadRouter()
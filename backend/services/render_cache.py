@@ -0,0 +1,97 @@
+"""
+Render Cache Service
+
+Seeded renders are pure functions of their parameters, so identical requests
+(preset switches, reloading saved parameter sets) can be answered from memory.
+RenderCache is a thread-safe LRU bounded by the total size of its values
+rather than by entry count, since a 5000-dot PNG is many times larger than a
+sparse one.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class RenderCache:
+    """In-process LRU cache with a byte budget and hit/miss counters."""
+
+    def __init__(self, max_bytes: int = 0, sizeof: Callable[[Any], int] = len):
+        self._lock = threading.Lock()
+        self._sizeof = sizeof
+        self.configure(max_bytes)
+
+    def init_app(self, app, config_key: str, extension_name: str):
+        """Configure the byte budget from Flask config."""
+        self.configure(app.config.get(config_key, 0))
+        app.extensions[extension_name] = self
+
+    def configure(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            self._entries = OrderedDict()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value and mark it recently used, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting least recently used entries to fit the budget."""
+        size = self._sizeof(value)
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+            }
+
+
+def slider_result_size(result: dict) -> int:
+    """Approximate memory footprint of a SliderImageGenerator render result."""
+    if 'images' in result:
+        return sum(len(image) for image in result['images'].values()) + 256
+    return len(result['image_bytes']) + 256
+
+
+slider_cache = RenderCache(sizeof=slider_result_size)
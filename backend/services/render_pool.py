@@ -0,0 +1,236 @@
+"""
+Render Pool Service
+
+CPU-heavy renders (slider images and on-the-fly test plates) hold the GIL for
+hundreds of milliseconds, so running them in the request thread makes every
+other endpoint on the same worker queue behind them. This service dispatches
+renders to a process pool with a bounded number of in-flight jobs. When the
+pool is saturated, callers get RenderPoolSaturated immediately instead of
+waiting in an unbounded queue.
+
+With RENDER_POOL_WORKERS = 0 renders run inline in the calling thread, which
+keeps tests and single-process debugging simple while still applying the
+same admission bound.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+
+class RenderPoolSaturated(Exception):
+    """Raised when the pool already holds its maximum number of jobs."""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Render pool is saturated')
+        self.retry_after = retry_after
+
+
+class RenderTimeout(Exception):
+    """Raised when a render does not finish within the configured timeout."""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Render timed out')
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict, submitted_at: float):
+    """Run fn in the worker and report how long the job waited to start."""
+    wait = max(0.0, time.time() - submitted_at)
+    return wait, fn(*args, **kwargs)
+
+
+def _init_worker(layout_cache_bytes: int):
+    """Apply per-process cache settings in a freshly spawned worker."""
+    from services.slider_image_generator import layout_cache
+    layout_cache.configure(layout_cache_bytes)
+
+
+def render_slider_image(params: dict) -> dict:
+    """Worker entry point for SliderImageGenerator.render."""
+    from services.slider_image_generator import SliderImageGenerator
+    return SliderImageGenerator().render(**params)
+
+
+def render_slider_comparison(params: dict) -> dict:
+    """Worker entry point for SliderImageGenerator.render_comparison."""
+    from services.slider_image_generator import SliderImageGenerator
+    return SliderImageGenerator().render_comparison(**params)
+
+
+def render_test_image(
+    seed_salt: str,
+    session_id: str,
+    image_number: int,
+    dichromism_type: str,
+    correct_answer: int,
+    layout_bank_id: Optional[str] = None,
+    layout_bank_dir: Optional[str] = None
+) -> bytes:
+    """Worker entry point for ImageGenerator.generate_test_image."""
+    from services.image_generator import ImageGenerator
+    from services.layout_bank import bank_for_render
+    generator = ImageGenerator(seed_salt, bank_for_render(layout_bank_id, layout_bank_dir))
+    return generator.generate_test_image(session_id, image_number, dichromism_type, correct_answer)
+
+
+def render_test_vector(
+    seed_salt: str,
+    session_id: str,
+    image_number: int,
+    dichromism_type: str,
+    correct_answer: int,
+    vector_format: str,
+    layout_bank_id: Optional[str] = None,
+    layout_bank_dir: Optional[str] = None
+) -> bytes:
+    """Worker entry point for ImageGenerator.generate_test_vector."""
+    from services.image_generator import ImageGenerator
+    from services.layout_bank import bank_for_render
+    generator = ImageGenerator(seed_salt, bank_for_render(layout_bank_id, layout_bank_dir))
+    return generator.generate_test_vector(session_id, image_number, dichromism_type, correct_answer, vector_format)
+
+
+class RenderPool:
+    """Bounded process pool shared by all requests of one app process."""
+
+    def __init__(self, workers: int = 0, max_queue: int = 8, timeout: float = 30.0, retry_after: int = 2):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._worker_initargs = None
+        self._inline_initargs = None
+        self.configure(workers, max_queue, timeout, retry_after)
+
+    def init_app(self, app):
+        """Configure the pool from Flask config; the executor starts lazily."""
+        self.configure(
+            app.config.get('RENDER_POOL_WORKERS', 0),
+            app.config.get('RENDER_POOL_MAX_QUEUE', 8),
+            app.config.get('RENDER_POOL_TIMEOUT', 30.0),
+            app.config.get('RENDER_POOL_RETRY_AFTER', 2)
+        )
+        
+        layout_cache_bytes = app.config.get('SLIDER_LAYOUT_CACHE_MAX_BYTES')
+        if layout_cache_bytes is not None:
+            self._worker_initargs = (layout_cache_bytes,)
+            # Inline mode initializes on the first render, so booting the app
+            # does not import the generators
+            self._inline_initargs = self._worker_initargs if self.workers == 0 else None
+        app.extensions['render_pool'] = self
+
+    def configure(self, workers: int, max_queue: int, timeout: float, retry_after: int):
+        with self._lock:
+            self._shutdown_executor()
+            self.workers = max(0, int(workers))
+            self.max_queue = max(0, int(max_queue))
+            self.timeout = float(timeout)
+            self.retry_after = int(retry_after)
+            self._in_flight = 0
+            self._submitted = 0
+            self._completed = 0
+            self._rejected = 0
+            self._timeouts = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of jobs running or waiting at once."""
+        return max(self.workers, 1) + self.max_queue
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn avoids forking a process that holds DB connections and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker if self._worker_initargs else None,
+                initargs=self._worker_initargs or ()
+            )
+        return self._executor
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool and wait for its result.
+
+        Raises:
+            RenderPoolSaturated: If the pool is already at capacity
+            RenderTimeout: If the render does not finish within the timeout
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise RenderPoolSaturated(self.retry_after)
+            self._in_flight += 1
+            self._submitted += 1
+            executor = self._get_executor() if self.workers > 0 else None
+            inline_initargs, self._inline_initargs = self._inline_initargs, None
+
+        submitted_at = time.time()
+        if executor is None:
+            try:
+                if inline_initargs is not None:
+                    _init_worker(*inline_initargs)
+                wait, result = _timed_call(fn, args, kwargs, submitted_at)
+            finally:
+                self._release()
+        else:
+            # The slot is released when the job really finishes, so a timed
+            # out render still counts against capacity while it occupies a worker
+            try:
+                future = executor.submit(_timed_call, fn, args, kwargs, submitted_at)
+            except Exception:
+                self._release()
+                raise
+            future.add_done_callback(lambda _: self._release())
+            try:
+                wait, result = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                with self._lock:
+                    self._timeouts += 1
+                raise RenderTimeout(self.retry_after)
+
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+        return result
+
+    def _release(self):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth and wait-time metrics."""
+        with self._lock:
+            running = min(self._in_flight, max(self.workers, 1))
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'in_flight': self._in_flight,
+                'queue_depth': self._in_flight - running,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+                'wait_ms_avg': round(1000 * self._wait_total / self._completed, 2) if self._completed else 0.0,
+                'wait_ms_max': round(1000 * self._wait_max, 2),
+            }
+
+    def shutdown(self):
+        """Stop the worker processes; the pool restarts them on next use."""
+        with self._lock:
+            self._shutdown_executor()
+
+    def _shutdown_executor(self):
+        # Caller must hold self._lock
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool()
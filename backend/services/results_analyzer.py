@@ -5,6 +5,28 @@ from models.answer import Answer
 class ResultsAnalyzer:
     DICHROMISM_TYPES = ['protanopia', 'deuteranopia', 'tritanopia']
     
+    def __init__(self, deficient_error_rate: float = 0.67, normal_error_rate: float = 0.33,
+                 max_control_errors: int = 0):
+        # A type is suspected at or above deficient_error_rate; "normal" results
+        # have high confidence at or below normal_error_rate on every type.
+        # More control errors than max_control_errors make a test unreliable.
+        self.deficient_error_rate = deficient_error_rate
+        self.normal_error_rate = normal_error_rate
+        self.max_control_errors = max_control_errors
+    
+    @classmethod
+    def from_config(cls, config) -> 'ResultsAnalyzer':
+        return cls(
+            config.get('ANALYSIS_DEFICIENT_ERROR_RATE', 0.67),
+            config.get('ANALYSIS_NORMAL_ERROR_RATE', 0.33),
+            config.get('ANALYSIS_MAX_CONTROL_ERRORS', 0)
+        )
+    
+    @property
+    def rules(self) -> str:
+        """Short identifier of the scoring rules, stored with batch results."""
+        return f'd{self.deficient_error_rate:g}-n{self.normal_error_rate:g}-c{self.max_control_errors}'
+    
     def analyze_session(self, answers: List[Answer]) -> Dict[str, Any]:
         if len(answers) != 10:
             return {
@@ -23,12 +45,11 @@ class ResultsAnalyzer:
             if answer.dichromism_type in answers_by_type:
                 answers_by_type[answer.dichromism_type].append(answer)
         
-        control_answers = answers_by_type.get('control', [])
-        control_correct = all(
-            a.user_answer == a.correct_answer for a in control_answers
-        ) if control_answers else True
+        control_errors = sum(
+            1 for a in answers_by_type['control'] if a.user_answer != a.correct_answer
+        )
         
-        if not control_correct:
+        if control_errors > self.max_control_errors:
             return {
                 'color_vision_status': 'unreliable',
                 'suspected_type': None,
@@ -49,13 +70,13 @@ class ResultsAnalyzer:
         
         details = self._calculate_details(answers_by_type)
         
-        suspected_types = [t for t, rate in error_rates.items() if rate >= 0.67]
+        suspected_types = [t for t, rate in error_rates.items() if rate >= self.deficient_error_rate]
         
         if not suspected_types:
             return {
                 'color_vision_status': 'normal',
                 'suspected_type': None,
-                'confidence': 'high' if all(rate <= 0.33 for rate in error_rates.values()) else 'medium',
+                'confidence': 'high' if all(rate <= self.normal_error_rate for rate in error_rates.values()) else 'medium',
                 'details': details,
                 'interpretation': 'Your color vision appears to be normal. You were able to correctly identify numbers across all color combinations tested.',
                 'recommendations': 'No further action needed. Your color perception is within normal range.'
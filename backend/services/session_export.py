@@ -0,0 +1,202 @@
+"""
+Session Export Service
+
+Streams sessions with their answers as NDJSON (one session per line, answers
+nested) or CSV (one row per answer). Sessions are read in id order in
+keyset-paginated batches of plain column tuples, and each batch is encoded
+and handed on before the next one is read, so memory stays flat however
+large the export. Every batch is read in its own transaction, ended before
+the batch is handed on, so a slow client does not keep one open for the
+whole export; sessions committed while an export runs are included if they
+sort after the batches already sent. Both answer schemas are exported in
+the same form.
+
+Gzip is applied on the fly, flushed after every batch so compressed output
+streams as well.
+
+Used by the /api/export/sessions endpoint and scripts/export_sessions.py.
+"""
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+from models import db
+from models.answer import Answer
+from models.session_answers import SessionAnswers
+from models.test_session import TestSession
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_STATUSES = ('completed', 'incomplete')
+CSV_COLUMNS = [
+    'session_id', 'created_at', 'completed_at',
+    'image_number', 'correct_answer', 'user_answer', 'is_correct', 'dichromism_type'
+]
+
+
+@dataclass
+class ExportFilters:
+    """created_from is inclusive, created_to exclusive; both naive UTC like created_at."""
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    status: Optional[str] = None
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO 8601 date or datetime as naive UTC; naive input is taken as UTC."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() + 'Z' if value else None
+
+
+def _answer_dict(image_number: int, correct_answer: int, user_answer: Optional[int], dichromism_type: str) -> dict:
+    # Same fields as Answer.to_dict()
+    return {
+        'image_number': image_number,
+        'correct_answer': correct_answer,
+        'user_answer': user_answer,
+        'is_correct': user_answer == correct_answer,
+        'dichromism_type': dichromism_type
+    }
+
+
+def sessions_query(filters: ExportFilters):
+    query = (
+        db.select(
+            TestSession.id,
+            TestSession.created_at,
+            TestSession.completed_at,
+            TestSession.metadata_json,
+            SessionAnswers.correct_answers,
+            SessionAnswers.user_answers,
+            SessionAnswers.dichromism_types
+        )
+        .outerjoin(SessionAnswers, SessionAnswers.session_id == TestSession.id)
+        .order_by(TestSession.id)
+    )
+    if filters.created_from is not None:
+        query = query.where(TestSession.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.where(TestSession.created_at < filters.created_to)
+    if filters.status == 'completed':
+        query = query.where(TestSession.completed_at.is_not(None))
+    elif filters.status == 'incomplete':
+        query = query.where(TestSession.completed_at.is_(None))
+    return query
+
+
+def iter_session_batches(db_session, filters: ExportFilters, batch_size: int = 1000) -> Iterator[List[dict]]:
+    """
+    Batches of exported sessions, each a dict with its answers in image order.
+
+    db_session is rolled back after each batch is read, so it must not hold
+    changes of its own.
+    """
+    after_id = ''
+    while True:
+        rows = db_session.execute(
+            sessions_query(filters).where(TestSession.id > after_id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+
+        sessions = {}
+        row_stored = []
+        for session_id, created_at, completed_at, metadata, correct, user, types in rows:
+            record = {
+                'session_id': session_id,
+                'created_at': _isoformat(created_at),
+                'completed_at': _isoformat(completed_at),
+                'metadata': metadata,
+                'answers': [],
+            }
+            sessions[session_id] = record
+            if correct is None:
+                row_stored.append(session_id)
+            else:
+                # Transient row, only used to decode the packed columns
+                packed = SessionAnswers(session_id=session_id, correct_answers=correct,
+                                        user_answers=user, dichromism_types=types)
+                record['answers'] = [
+                    _answer_dict(a.image_number, a.correct_answer, a.user_answer, a.dichromism_type)
+                    for a in packed.answers()
+                ]
+
+        if row_stored:
+            answers = db_session.execute(
+                db.select(
+                    Answer.session_id,
+                    Answer.image_number,
+                    Answer.correct_answer,
+                    Answer.user_answer,
+                    Answer.dichromism_type
+                )
+                .where(Answer.session_id.in_(row_stored))
+                .order_by(Answer.session_id, Answer.image_number)
+            ).all()
+            for session_id, *answer in answers:
+                sessions[session_id]['answers'].append(_answer_dict(*answer))
+
+        # Only read, so nothing is lost; ends the transaction before the caller
+        # spends however long it takes to send the batch
+        db_session.rollback()
+        yield list(sessions.values())
+        after_id = rows[-1][0]
+
+
+def _encode_ndjson(batch: List[dict]) -> bytes:
+    return b''.join(
+        json.dumps(session, separators=(',', ':')).encode() + b'\n' for session in batch
+    )
+
+
+def _encode_csv(batch: List[dict]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for session in batch:
+        prefix = [session['session_id'], session['created_at'], session['completed_at']]
+        if not session['answers']:
+            # Sessions without answers still get a row
+            writer.writerow(prefix + [None] * 5)
+        for answer in session['answers']:
+            writer.writerow(prefix + [answer[column] for column in CSV_COLUMNS[3:]])
+    return buffer.getvalue().encode()
+
+
+def stream_export(db_session, fmt: str, filters: ExportFilters, batch_size: int = 1000,
+                  compress: bool = False) -> Iterator[bytes]:
+    """
+    Encoded export in chunks of one batch each.
+
+    The CSV header (and the gzip header) is yielded before the first query,
+    so clients see the response start immediately. Uncompressed NDJSON has
+    no header; its first bytes go out once the first batch has been read.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Export format must be one of {EXPORT_FORMATS}, got {fmt!r}")
+    encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+    # wbits=31 writes a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    header = ','.join(CSV_COLUMNS).encode() + b'\r\n' if fmt == 'csv' else b''
+    first = emit(header)
+    if first:
+        yield first
+    for batch in iter_session_batches(db_session, filters, batch_size):
+        yield emit(encode(batch))
+    if compressor is not None:
+        yield compressor.flush()
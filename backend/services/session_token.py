@@ -0,0 +1,111 @@
+"""
+Session Token Service
+
+With SESSION_TOKENS_ENABLED, /test/start also returns a signed token that
+carries everything an image request needs: the session id, its creation
+time, its image pool version and its 10-image mapping. Image requests that
+present the token are served without reading the session from the
+database, which is then only touched by answer and results requests.
+
+A token is the base64url encoding of a small binary payload
+
+    version (1 byte) | session uuid (16) | created_at (uint32 seconds) |
+    image count (1) | image ids (uint16 each) | pool version (utf-8)
+
+followed by a truncated HMAC-SHA256 of it keyed with SECRET_KEY, so it
+adds under 100 bytes to each image URL. Tokens cannot be revoked; they
+stop being accepted when the session expires or SECRET_KEY changes.
+"""
+
+import base64
+import hashlib
+import hmac
+import struct
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+TOKEN_VERSION = 1
+SIGNATURE_BYTES = 16
+MAX_IMAGE_ID = 0xFFFF
+_HEADER = struct.Struct('>B16sIB')
+
+
+class InvalidSessionToken(ValueError):
+    """Raised for tokens that are malformed or not signed with our key."""
+
+
+@dataclass
+class SessionClaims:
+    session_id: str
+    created_at: datetime
+    pool_version: Optional[str]
+    image_mapping: Dict[str, int]
+
+
+def _signature(secret_key: str, payload: bytes) -> bytes:
+    return hmac.new(secret_key.encode(), b'session-token:' + payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def fits_token(image_mapping: Dict[str, int]) -> bool:
+    """Whether every image ID fits two bytes; pools of over 65536 images do not."""
+    return all(0 <= int(image_id) <= MAX_IMAGE_ID for image_id in image_mapping.values())
+
+
+def issue_token(secret_key: str, session_id: str, created_at: datetime,
+                pool_version: Optional[str], image_mapping: Dict[str, int]) -> str:
+    """
+    Signed token for a session. created_at may be naive UTC as stored by the
+    database, and mapping keys image numbers as ints or as JSON strings.
+
+    Raises:
+        ValueError: If an image ID does not fit the token (see fits_token)
+    """
+    if not fits_token(image_mapping):
+        raise ValueError("Image IDs above 65535 do not fit a session token")
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    image_ids = [image_id for _, image_id in sorted(image_mapping.items(), key=lambda item: int(item[0]))]
+    payload = (
+        _HEADER.pack(TOKEN_VERSION, uuid.UUID(session_id).bytes, int(created_at.timestamp()), len(image_ids))
+        + struct.pack(f'>{len(image_ids)}H', *image_ids)
+        + (pool_version or '').encode()
+    )
+    return _b64encode(payload + _signature(secret_key, payload))
+
+
+def verify_token(secret_key: str, token: str) -> SessionClaims:
+    """
+    Check a token's signature and decode it.
+
+    Raises:
+        InvalidSessionToken: If the token is malformed or its signature does not match
+    """
+    try:
+        data = _b64decode(token)
+    except (ValueError, TypeError):
+        raise InvalidSessionToken('Token is not valid base64')
+    payload, signature = data[:-SIGNATURE_BYTES], data[-SIGNATURE_BYTES:]
+    if len(payload) < _HEADER.size or not hmac.compare_digest(signature, _signature(secret_key, payload)):
+        raise InvalidSessionToken('Token signature does not match')
+
+    version, session_uuid, created, count = _HEADER.unpack_from(payload)
+    ids_end = _HEADER.size + 2 * count
+    if version != TOKEN_VERSION or len(payload) < ids_end:
+        raise InvalidSessionToken('Unsupported token version')
+    image_ids = struct.unpack_from(f'>{count}H', payload, _HEADER.size)
+    return SessionClaims(
+        session_id=str(uuid.UUID(bytes=session_uuid)),
+        created_at=datetime.fromtimestamp(created, timezone.utc),
+        pool_version=payload[ids_end:].decode() or None,
+        image_mapping={str(number): image_id for number, image_id in enumerate(image_ids, start=1)},
+    )
@@ -0,0 +1,209 @@
+"""
+Single-Flight Service
+
+Seeded renders are deterministic, so identical requests that arrive while
+the first one is still rendering (a popular preset, a client retrying a
+slow on-the-fly plate) would otherwise render byte-identical output in
+parallel. SingleFlight lets the first caller for a key render while later
+callers with the same key wait for it and share its result.
+
+Within a process, waiters block on the leader's event. Across processes
+(several gunicorn workers on one host) coalescing is optional: with
+SINGLE_FLIGHT_LOCK_DIR set, the leader holds an flock on a per-key lock file
+and leaves the pickled result next to it for SINGLE_FLIGHT_RESULT_TTL
+seconds. Leaders in other processes that queued on the lock find that
+result and return it instead of rendering. File locking needs fcntl; on
+platforms without it only in-process coalescing is used.
+
+Errors are shared as well: if the leader's render fails, its waiters get
+the same exception. Errors that only concern the leader's own request,
+such as an admission limit it was charged against, are passed as
+unshared_errors; waiters then try again themselves instead.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.configure(True, None, 10.0, 30.0)
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get('SINGLE_FLIGHT_ENABLED', True),
+            app.config.get('SINGLE_FLIGHT_LOCK_DIR') or None,
+            app.config.get('SINGLE_FLIGHT_RESULT_TTL', 10.0),
+            app.config.get('RENDER_POOL_TIMEOUT', 30.0)
+        )
+        app.extensions['single_flight'] = self
+
+    def configure(self, enabled: bool, lock_dir: Optional[str], result_ttl: float, timeout: float):
+        with self._lock:
+            self.enabled = bool(enabled)
+            self.lock_dir = Path(lock_dir) if lock_dir and fcntl is not None else None
+            self.result_ttl = float(result_ttl)
+            # Waiters give up on a stuck leader after this long and run the call themselves
+            self.timeout = float(timeout)
+            self._leaders = 0
+            self._coalesced = 0
+            self._coalesced_cross_process = 0
+            self._wait_timeouts = 0
+            self._last_sweep = 0.0
+        if self.lock_dir is not None:
+            self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], unshared_errors: tuple = ()) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Returns (result, shared), where shared is True if this caller got
+        another caller's result instead of running fn. If the leader fails
+        with one of unshared_errors, waiters call do() again, so one of them
+        runs its own fn.
+        """
+        if not self.enabled:
+            return fn(), False
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if call.done.wait(self.timeout):
+                if isinstance(call.error, unshared_errors):
+                    return self.do(key, fn, unshared_errors)
+                with self._lock:
+                    self._coalesced += 1
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            with self._lock:
+                self._wait_timeouts += 1
+            return fn(), False
+
+        try:
+            if self.lock_dir is not None:
+                call.result, shared = self._run_locked(key, fn)
+            else:
+                call.result, shared = fn(), False
+            if not shared:
+                with self._lock:
+                    self._leaders += 1
+            return call.result, shared
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run_locked(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        name = hashlib.sha256(repr(key).encode()).hexdigest()
+        result_path = self.lock_dir / f'{name}.result'
+
+        with open(self.lock_dir / f'{name}.lock', 'a') as lock_file:
+            locked = self._acquire(lock_file)
+            try:
+                # Another process may have rendered this while we queued on the lock
+                result = self._read_result(result_path)
+                if result is not None:
+                    with self._lock:
+                        self._coalesced_cross_process += 1
+                    return result, True
+                value = fn()
+                self._write_result(result_path, value)
+                return value, False
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire(self, lock_file) -> bool:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    with self._lock:
+                        self._wait_timeouts += 1
+                    return False
+                time.sleep(0.005)
+
+    def _read_result(self, path: Path) -> Optional[Any]:
+        try:
+            if time.time() - path.stat().st_mtime > self.result_ttl:
+                path.unlink(missing_ok=True)
+                return None
+            return pickle.loads(path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_result(self, path: Path, value: Any):
+        fd, tmp_path = tempfile.mkstemp(dir=self.lock_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._sweep()
+
+    def _sweep(self):
+        """Remove expired results and their lock files, at most once per TTL."""
+        now = time.time()
+        if now - self._last_sweep < self.result_ttl:
+            return
+        self._last_sweep = now
+        for path in self.lock_dir.glob('*.result'):
+            try:
+                if path.stat().st_mtime >= now - self.result_ttl:
+                    continue
+                path.unlink()
+                lock_path = path.with_suffix('.lock')
+                # Only drop lock files nobody holds; at worst a racing process
+                # locks an unlinked file and renders once more
+                with open(lock_path, 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    lock_path.unlink()
+            except OSError:
+                continue
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'cross_process': self.lock_dir is not None,
+                'in_flight': len(self._calls),
+                'renders': self._leaders,
+                'coalesced': self._coalesced,
+                'coalesced_cross_process': self._coalesced_cross_process,
+                'wait_timeouts': self._wait_timeouts,
+            }
+
+
+single_flight = SingleFlight()
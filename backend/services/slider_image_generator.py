@@ -1,18 +1,34 @@
 """Image generator for the Slider App - Parameter Explorer."""
 
+import base64
 import io
+import math
 import random
+from typing import Optional
 from PIL import Image, ImageDraw
 import numpy as np
 
+from services.render_cache import RenderCache
 from utils.luminance import calculate_luminance
 from utils.dichromat_sim import simulate_image
+from utils.plate_vector import VECTOR_FORMATS, VECTOR_MIMETYPES, encode_vector
 
 
 class SliderImageGenerator:
     """Generate colorblind test images with configurable parameters."""
     
+    # Bump whenever a change alters the pixels produced for a given seed
+    VERSION = '2'
+    
     IMAGE_SIZE = 500
+    PREVIEW_SIZE = 200
+    MIN_DOT_SIZE = 3
+    MAX_DOT_SIZE = 50
+    QUALITIES = ('full', 'preview')
+    LAYOUT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    IMAGE_FORMATS = ('png', 'webp')
+    VECTOR_FORMATS = VECTOR_FORMATS
+    DICHROMAT_TYPES = ('deuteranopia', 'protanopia', 'tritanopia')
     
     DEFAULT_PARAMS = {
         'fg_rgb': [150, 120, 140],
@@ -24,6 +40,67 @@ class SliderImageGenerator:
         'pattern_density': 0.25,
     }
     
+    # Presets carry a fixed seed so their renders are repeatable and can be
+    # served from (and pre-warmed into) the slider render cache
+    PRESETS = [
+        {
+            'name': 'Neutral Baseline',
+            'description': 'Recommended starting point for exploration',
+            'params': {
+                'fg_rgb': [150, 120, 140],
+                'bg_rgb': [145, 145, 145],
+                'circle_mean_size': 20,
+                'circle_size_variance': 0.30,
+                'noise_offset': 0.0,
+                'noise_variance': 0.08,
+                'pattern_density': 0.25,
+                'seed': 1
+            }
+        },
+        {
+            'name': 'R-High G-Low',
+            'description': 'High red, low green - targets deutans',
+            'params': {
+                'fg_rgb': [175, 115, 145],
+                'bg_rgb': [145, 145, 145],
+                'circle_mean_size': 18,
+                'circle_size_variance': 0.35,
+                'noise_offset': 0.0,
+                'noise_variance': 0.12,
+                'pattern_density': 0.22,
+                'seed': 2
+            }
+        },
+        {
+            'name': 'R-Low G-High',
+            'description': 'Low red, high green - alternative deutan target',
+            'params': {
+                'fg_rgb': [125, 165, 145],
+                'bg_rgb': [145, 145, 145],
+                'circle_mean_size': 22,
+                'circle_size_variance': 0.25,
+                'noise_offset': 0.0,
+                'noise_variance': 0.10,
+                'pattern_density': 0.28,
+                'seed': 3
+            }
+        },
+        {
+            'name': 'High Noise Challenge',
+            'description': 'Higher noise for harder detection',
+            'params': {
+                'fg_rgb': [165, 125, 140],
+                'bg_rgb': [145, 145, 145],
+                'circle_mean_size': 16,
+                'circle_size_variance': 0.40,
+                'noise_offset': 0.0,
+                'noise_variance': 0.18,
+                'pattern_density': 0.20,
+                'seed': 4
+            }
+        }
+    ]
+    
     def generate(
         self,
         fg_rgb: list,
@@ -35,36 +112,320 @@ class SliderImageGenerator:
         pattern_density: float = 0.25,
         simulate_dichromat: bool = False,
         dichromat_type: str = 'deuteranopia',
-        seed: int = None
+        seed: int = None,
+        quality: str = 'full',
+        preview_size: int = None
     ) -> dict:
         """
         Generate a test image with the specified parameters.
         
+        With quality='preview' the same dot layout is rasterized at
+        preview_size pixels (default PREVIEW_SIZE) with fast PNG encoding,
+        so a seeded preview matches the full render at a lower resolution.
+        
         Returns dict with:
             - image_base64: Base64-encoded PNG image
             - luminance_fg: Foreground luminance (Y)
             - luminance_bg: Background luminance (Y)
             - luminance_delta: |Y_fg - Y_bg|
         """
-        if seed is not None:
-            rng = random.Random(seed)
-            np_rng = np.random.RandomState(seed)
+        result = self.render(
+            fg_rgb, bg_rgb, circle_mean_size, circle_size_variance, noise_offset, noise_variance,
+            pattern_density, simulate_dichromat, dichromat_type, seed, quality, preview_size
+        )
+        return self.to_json_result(result)
+    
+    def render(
+        self,
+        fg_rgb: list,
+        bg_rgb: list,
+        circle_mean_size: float = 20,
+        circle_size_variance: float = 0.30,
+        noise_offset: float = 0.0,
+        noise_variance: float = 0.08,
+        pattern_density: float = 0.25,
+        simulate_dichromat: bool = False,
+        dichromat_type: str = 'deuteranopia',
+        seed: int = None,
+        quality: str = 'full',
+        preview_size: int = None,
+        image_format: str = 'png'
+    ) -> dict:
+        """
+        Render a test image and return the encoded bytes.
+        
+        Takes the same parameters as generate(), plus image_format: 'png' or
+        'webp' for a raster, or one of VECTOR_FORMATS ('svg', 'layout') to
+        skip rasterization and encode the dots themselves. Returns dict with
+        image_bytes, mimetype and the rounded luminance_fg, luminance_bg and
+        luminance_delta values.
+        """
+        if image_format in self.VECTOR_FORMATS:
+            return self._render_vector(
+                fg_rgb, bg_rgb, circle_mean_size, circle_size_variance, noise_offset, noise_variance,
+                pattern_density, simulate_dichromat, dichromat_type, seed, quality, preview_size, image_format
+            )
+        
+        index_map, palette = self._prepare(
+            fg_rgb, bg_rgb, circle_mean_size, circle_size_variance, noise_offset, noise_variance,
+            pattern_density, seed, quality, preview_size, image_format
+        )
+        
+        if simulate_dichromat:
+            palette = self._simulate_palette(palette, dichromat_type)
+        
+        return {
+            'image_bytes': self._encode(palette[index_map], image_format, quality),
+            'mimetype': f'image/{image_format}',
+            **self._luminance_summary(fg_rgb, bg_rgb)
+        }
+    
+    def render_comparison(
+        self,
+        fg_rgb: list,
+        bg_rgb: list,
+        circle_mean_size: float = 20,
+        circle_size_variance: float = 0.30,
+        noise_offset: float = 0.0,
+        noise_variance: float = 0.08,
+        pattern_density: float = 0.25,
+        seed: int = None,
+        quality: str = 'full',
+        preview_size: int = None,
+        image_format: str = 'png',
+        dichromat_types: tuple = DICHROMAT_TYPES,
+        contact_sheet: bool = False
+    ) -> dict:
+        """
+        Render the original image and its simulation for several dichromat types.
+        
+        The layout is placed and rasterized once. Because every pixel is a
+        flat dot colour (or the white background), each simulation runs on
+        the dot palette rather than on every pixel.
+        
+        Returns dict with panels (names in order: 'original' followed by
+        dichromat_types), mimetype, the luminance values and either images
+        (panel name -> encoded bytes) or, with contact_sheet=True, image_bytes
+        holding all panels side by side.
+        """
+        for dichromat_type in dichromat_types:
+            if dichromat_type not in self.DICHROMAT_TYPES:
+                raise ValueError(f"Unknown dichromat type: {dichromat_type}")
+        
+        index_map, palette = self._prepare(
+            fg_rgb, bg_rgb, circle_mean_size, circle_size_variance, noise_offset, noise_variance,
+            pattern_density, seed, quality, preview_size, image_format
+        )
+        
+        panels = ['original'] + list(dichromat_types)
+        palettes = [palette] + [self._simulate_palette(palette, t) for t in dichromat_types]
+        
+        result = {
+            'panels': panels,
+            'mimetype': f'image/{image_format}',
+            **self._luminance_summary(fg_rgb, bg_rgb)
+        }
+        
+        if contact_sheet:
+            size = index_map.shape[0]
+            gap = max(1, size // 50)
+            sheet = np.full((size, len(panels) * (size + gap) - gap, 3), 255, dtype=np.uint8)
+            for i, panel_palette in enumerate(palettes):
+                offset = i * (size + gap)
+                sheet[:, offset:offset + size] = panel_palette[index_map]
+            result['image_bytes'] = self._encode(sheet, image_format, quality)
         else:
-            rng = random.Random()
-            np_rng = np.random.RandomState()
+            result['images'] = {
+                name: self._encode(panel_palette[index_map], image_format, quality)
+                for name, panel_palette in zip(panels, palettes)
+            }
         
-        size = self.IMAGE_SIZE
-        img = Image.new('RGB', (size, size), (255, 255, 255))
-        draw = ImageDraw.Draw(img)
+        return result
+    
+    def _prepare(
+        self,
+        fg_rgb: list,
+        bg_rgb: list,
+        circle_mean_size: float,
+        circle_size_variance: float,
+        noise_offset: float,
+        noise_variance: float,
+        pattern_density: float,
+        seed: Optional[int],
+        quality: str,
+        preview_size: Optional[int],
+        image_format: str
+    ) -> tuple:
+        """Validate output options and return the (index_map, palette) of a render."""
+        if image_format not in self.IMAGE_FORMATS:
+            raise ValueError(f"image_format must be one of {', '.join(self.IMAGE_FORMATS)}")
+        output_size = self._output_size(quality, preview_size)
+        
+        layout_key, layout = self._get_layout(seed, circle_mean_size, circle_size_variance, pattern_density)
+        index_map = self._get_index_map(layout_key, layout, output_size)
+        palette = self._build_palette(layout, fg_rgb, bg_rgb, noise_offset, noise_variance)
+        return index_map, palette
+    
+    def _output_size(self, quality: str, preview_size: Optional[int]) -> int:
+        if quality not in self.QUALITIES:
+            raise ValueError(f"quality must be one of {', '.join(self.QUALITIES)}")
+        if quality == 'preview':
+            return preview_size or self.PREVIEW_SIZE
+        return self.IMAGE_SIZE
+    
+    def _render_vector(
+        self,
+        fg_rgb: list,
+        bg_rgb: list,
+        circle_mean_size: float,
+        circle_size_variance: float,
+        noise_offset: float,
+        noise_variance: float,
+        pattern_density: float,
+        simulate_dichromat: bool,
+        dichromat_type: str,
+        seed: Optional[int],
+        quality: str,
+        preview_size: Optional[int],
+        vector_format: str
+    ) -> dict:
+        """
+        Encode the dot layout and colours without rasterizing.
         
+        Coordinates stay in the IMAGE_SIZE frame; quality only sets the
+        display size of an SVG.
+        """
+        output_size = self._output_size(quality, preview_size)
+        _, layout = self._get_layout(seed, circle_mean_size, circle_size_variance, pattern_density)
+        palette = self._build_palette(layout, fg_rgb, bg_rgb, noise_offset, noise_variance)
+        if simulate_dichromat:
+            palette = self._simulate_palette(palette, dichromat_type)
+        
+        dots = np.array([dot[:3] for dot in layout['dots']], dtype=np.float64).reshape(-1, 3)
+        return {
+            'image_bytes': encode_vector(
+                vector_format, dots[:, 0], dots[:, 1], dots[:, 2] / 2, palette[1:],
+                self.IMAGE_SIZE, 10, display_size=output_size
+            ),
+            'mimetype': VECTOR_MIMETYPES[vector_format],
+            **self._luminance_summary(fg_rgb, bg_rgb)
+        }
+    
+    def _simulate_palette(self, palette: np.ndarray, dichromat_type: str) -> np.ndarray:
+        """Simulate a dichromat on palette colours; identical to simulating every pixel."""
+        return simulate_image(palette[:, None, :], dichromat_type)[:, 0, :]
+    
+    def _encode(self, pixels: np.ndarray, image_format: str, quality: str) -> bytes:
+        """Encode an RGB array, trading compression for speed on previews."""
+        image = Image.fromarray(pixels)
+        buffer = io.BytesIO()
+        if image_format == 'webp':
+            # Flat-coloured dots compress well losslessly; method 0 is the fastest encoder
+            image.save(buffer, format='WEBP', lossless=True, method=0 if quality == 'preview' else 4)
+        elif quality == 'preview':
+            image.save(buffer, format='PNG', compress_level=1)
+        else:
+            image.save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+    
+    def _luminance_summary(self, fg_rgb: list, bg_rgb: list) -> dict:
+        luminance_fg = calculate_luminance(*fg_rgb)
+        luminance_bg = calculate_luminance(*bg_rgb)
+        luminance_delta = abs(luminance_fg - luminance_bg)
+        
+        return {
+            'luminance_fg': round(luminance_fg, 4),
+            'luminance_bg': round(luminance_bg, 4),
+            'luminance_delta': round(luminance_delta, 4)
+        }
+    
+    @staticmethod
+    def to_json_result(result: dict) -> dict:
+        """Convert a render() result into the base64 JSON shape of generate()."""
+        return {
+            'image_base64': base64.b64encode(result['image_bytes']).decode('utf-8'),
+            'luminance_fg': result['luminance_fg'],
+            'luminance_bg': result['luminance_bg'],
+            'luminance_delta': result['luminance_delta']
+        }
+    
+    @classmethod
+    def canonical_params(cls, params: dict) -> dict:
+        """
+        Normalize render() keyword arguments into a canonical, ordered dict.
+        
+        Defaults are filled in and parameters that cannot affect the output
+        are dropped (the dichromat type when simulation is off, the preview
+        size of a full render), so equivalent requests compare equal.
+        """
+        merged = {**cls.DEFAULT_PARAMS, 'simulate_dichromat': False, 'dichromat_type': 'deuteranopia',
+                  'seed': None, 'quality': 'full', 'preview_size': None, 'image_format': 'png', **params}
+        
+        canonical = {
+            'fg_rgb': tuple(int(v) for v in merged['fg_rgb']),
+            'bg_rgb': tuple(int(v) for v in merged['bg_rgb']),
+            'circle_mean_size': float(merged['circle_mean_size']),
+            'circle_size_variance': float(merged['circle_size_variance']),
+            'noise_offset': float(merged['noise_offset']),
+            'noise_variance': float(merged['noise_variance']),
+            'pattern_density': float(merged['pattern_density']),
+        }
+        if merged['simulate_dichromat']:
+            canonical['simulate_dichromat'] = True
+            canonical['dichromat_type'] = merged['dichromat_type']
+        canonical['seed'] = merged['seed']
+        canonical['quality'] = merged['quality']
+        if merged['quality'] == 'preview':
+            canonical['preview_size'] = merged['preview_size'] or cls.PREVIEW_SIZE
+        canonical['image_format'] = merged['image_format']
+        return canonical
+    
+    @classmethod
+    def cache_key(cls, params: dict) -> Optional[tuple]:
+        """
+        Cache key for a set of render() keyword arguments.
+        
+        Built from canonical_params() plus the generator VERSION. Returns None
+        for unseeded requests, which are not repeatable.
+        """
+        canonical = cls.canonical_params(params)
+        if canonical['seed'] is None:
+            return None
+        return (cls.VERSION,) + tuple(canonical.items())
+    
+    @classmethod
+    def estimate_dot_count(cls, circle_mean_size: float, pattern_density: float) -> int:
+        """Number of dots a layout aims for; placement can stop short when the plate is full."""
+        num_dots = int(pattern_density * (cls.IMAGE_SIZE * cls.IMAGE_SIZE) / (circle_mean_size ** 2))
+        return max(100, min(5000, num_dots))
+    
+    def _place_dots(
+        self,
+        rng: random.Random,
+        circle_mean_size: float,
+        circle_size_variance: float,
+        pattern_density: float
+    ) -> list:
+        """
+        Place non-overlapping dots in full-resolution image coordinates.
+        
+        Returns a list of (x, y, dot_size, is_foreground) tuples. The layout
+        only depends on the rng state and the geometry parameters, so it can
+        be rasterized at any output size.
+        """
+        size = self.IMAGE_SIZE
         center = size // 2
         radius = (size // 2) - 10
         
-        num_dots = int(pattern_density * (size * size) / (circle_mean_size ** 2))
-        num_dots = max(100, min(5000, num_dots))
+        num_dots = self.estimate_dot_count(circle_mean_size, pattern_density)
         
         circle_pattern = self._create_circle_pattern(size, radius)
         
+        # Spatial hash of placed dots. Only cells within the largest possible
+        # collision distance of a candidate need to be checked.
+        cell_size = max(1.0, circle_mean_size * 0.8)
+        grid = {}
+        largest_dot = 0.0
         placed_dots = []
         max_attempts = num_dots * 10
         attempts = 0
@@ -79,60 +440,130 @@ class SliderImageGenerator:
             
             size_variance = circle_mean_size * circle_size_variance
             dot_size = rng.gauss(circle_mean_size, size_variance)
-            dot_size = max(3, min(50, dot_size))
+            dot_size = max(self.MIN_DOT_SIZE, min(self.MAX_DOT_SIZE, dot_size))
             
             if not (0 <= x < size and 0 <= y < size):
                 continue
             
-            if self._check_collision(x, y, dot_size, placed_dots):
+            reach = math.ceil((dot_size + largest_dot) / 2 * 0.8 / cell_size)
+            cx, cy = int(x // cell_size), int(y // cell_size)
+            neighbours = [
+                dot
+                for gx in range(cx - reach, cx + reach + 1)
+                for gy in range(cy - reach, cy + reach + 1)
+                for dot in grid.get((gx, gy), ())
+            ]
+            if self._check_collision(x, y, dot_size, neighbours):
                 continue
             
             is_foreground = circle_pattern[y, x] > 128
             
-            if is_foreground:
-                base_color = tuple(fg_rgb)
-            else:
-                base_color = tuple(bg_rgb)
-            
-            noise = np_rng.normal(noise_offset, noise_variance)
-            color = self._apply_grayscale_noise(base_color, noise)
-            
-            draw.ellipse(
-                [x - dot_size/2, y - dot_size/2, x + dot_size/2, y + dot_size/2],
-                fill=color
-            )
-            
-            placed_dots.append((x, y, dot_size))
+            grid.setdefault((cx, cy), []).append((x, y, dot_size))
+            largest_dot = max(largest_dot, dot_size)
+            placed_dots.append((x, y, dot_size, is_foreground))
         
-        mask = Image.new('L', (size, size), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse([10, 10, size-10, size-10], fill=255)
+        return placed_dots
+    
+    def _get_layout(
+        self,
+        seed: Optional[int],
+        circle_mean_size: float,
+        circle_size_variance: float,
+        pattern_density: float
+    ) -> tuple:
+        """
+        Return (layout_key, layout) for the given geometry.
         
-        result = Image.new('RGB', (size, size), (255, 255, 255))
-        result.paste(img, mask=mask)
+        The layout holds everything that does not depend on colours or noise
+        settings: dot positions and sizes, the foreground classification and
+        one standard-normal noise draw per dot. Seeded layouts are cached, so
+        colour and noise slider changes skip placement entirely.
+        """
+        layout_key = None
+        if seed is not None:
+            layout_key = ('layout', seed, float(circle_mean_size), float(circle_size_variance), float(pattern_density))
+            layout = layout_cache.get(layout_key)
+            if layout is not None:
+                return layout_key, layout
+            rng = random.Random(seed)
+            np_rng = np.random.RandomState(seed)
+        else:
+            rng = random.Random()
+            np_rng = np.random.RandomState()
         
-        if simulate_dichromat:
-            img_array = np.array(result)
-            simulated = simulate_image(img_array, dichromat_type)
-            result = Image.fromarray(simulated)
+        dots = self._place_dots(rng, circle_mean_size, circle_size_variance, pattern_density)
+        # normal(offset, variance) == offset + variance * standard_normal() for
+        # the legacy RandomState, so the draws can be scaled later per request
+        noise_z = np_rng.standard_normal(len(dots))
+        is_foreground = np.array([dot[3] for dot in dots], dtype=bool)
         
-        buffer = io.BytesIO()
-        result.save(buffer, format='PNG', optimize=True)
-        buffer.seek(0)
+        layout = {
+            'dots': dots,
+            'is_foreground': is_foreground,
+            'noise_z': noise_z,
+            'nbytes': noise_z.nbytes + is_foreground.nbytes + 100 * len(dots),
+        }
+        if layout_key is not None:
+            layout_cache.put(layout_key, layout)
+        return layout_key, layout
+    
+    def _get_index_map(self, layout_key: Optional[tuple], layout: dict, output_size: int) -> np.ndarray:
+        """
+        Rasterize the layout into a map of dot indices at output_size.
         
-        import base64
-        image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        Pixel value i > 0 means dot i - 1 covers the pixel; 0 means white
+        (no dot, or outside the circular mask). Looking the map up in a colour
+        palette gives exactly the image drawing each dot in its colour would.
+        """
+        index_key = None
+        if layout_key is not None:
+            index_key = ('index',) + layout_key[1:] + (output_size,)
+            index_map = layout_cache.get(index_key)
+            if index_map is not None:
+                return index_map
         
-        luminance_fg = calculate_luminance(*fg_rgb)
-        luminance_bg = calculate_luminance(*bg_rgb)
-        luminance_delta = abs(luminance_fg - luminance_bg)
+        scale = output_size / self.IMAGE_SIZE
+        img = Image.new('I', (output_size, output_size), 0)
+        draw = ImageDraw.Draw(img)
         
-        return {
-            'image_base64': image_base64,
-            'luminance_fg': round(luminance_fg, 4),
-            'luminance_bg': round(luminance_bg, 4),
-            'luminance_delta': round(luminance_delta, 4)
-        }
+        for i, (x, y, dot_size, _) in enumerate(layout['dots']):
+            half = dot_size / 2
+            draw.ellipse(
+                [(x - half) * scale, (y - half) * scale, (x + half) * scale, (y + half) * scale],
+                fill=i + 1
+            )
+        
+        margin = 10 * scale
+        mask = Image.new('L', (output_size, output_size), 0)
+        mask_draw = ImageDraw.Draw(mask)
+        mask_draw.ellipse([margin, margin, output_size - margin, output_size - margin], fill=255)
+        
+        index_map = np.array(img).astype(np.uint16)
+        index_map[np.array(mask) == 0] = 0
+        index_map.flags.writeable = False
+        
+        if index_key is not None:
+            layout_cache.put(index_key, index_map)
+        return index_map
+    
+    def _build_palette(
+        self,
+        layout: dict,
+        fg_rgb: list,
+        bg_rgb: list,
+        noise_offset: float,
+        noise_variance: float
+    ) -> np.ndarray:
+        """Colour every dot; row 0 is the white background."""
+        noise = noise_offset + noise_variance * layout['noise_z']
+        # int() truncates towards zero, as the scalar noise code always has
+        noise_value = np.trunc(noise * 255).astype(np.int64)
+        base = np.where(layout['is_foreground'][:, None], np.array(fg_rgb), np.array(bg_rgb))
+        
+        palette = np.empty((len(noise) + 1, 3), dtype=np.uint8)
+        palette[0] = 255
+        palette[1:] = np.clip(base + noise_value[:, None], 0, 255)
+        return palette
     
     def _create_circle_pattern(self, size: int, radius: int) -> np.ndarray:
         """Create a circular pattern mask (simple ring pattern)."""
@@ -158,11 +589,14 @@ class SliderImageGenerator:
             if distance_sq < min_distance ** 2:
                 return True
         return False
-    
-    def _apply_grayscale_noise(self, color: tuple, noise: float) -> tuple:
-        """Apply grayscale noise to a color."""
-        noise_value = int(noise * 255)
-        return tuple(
-            max(0, min(255, c + noise_value))
-            for c in color
-        )
+
+
+def _layout_entry_size(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return value['nbytes']
+
+
+# Per-process cache of dot layouts and index maps. Renders run in render pool
+# workers, so each worker process keeps its own copy.
+layout_cache = RenderCache(max_bytes=SliderImageGenerator.LAYOUT_CACHE_MAX_BYTES, sizeof=_layout_entry_size)
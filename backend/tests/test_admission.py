@@ -0,0 +1,171 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestingConfig
+from models import db
+from models.test_session import TestSession as SessionModel
+from services import admission as admission_module
+from services.admission import AdmissionController, AdmissionRejected, TokenBucket, admission
+
+DENSE = {
+    'fg_rgb': [200, 100, 100], 'bg_rgb': [100, 180, 100],
+    'circle_mean_size': 6, 'pattern_density': 0.6, 'quality': 'preview', 'preview_size': 125
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission, '_clock', fake)
+    return fake
+
+
+def limits(client_rate=1, client_burst=10, global_rate=100, global_burst=100):
+    return {'client_rate': client_rate, 'client_burst': client_burst,
+            'global_rate': global_rate, 'global_burst': global_burst}
+
+
+class TestTokenBucket:
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(rate=2, burst=5, now=0)
+        bucket.tokens = 0
+        bucket.refill(1)
+        assert bucket.tokens == 2
+        bucket.refill(100)
+        assert bucket.tokens == 5
+
+    def test_wait_for(self):
+        bucket = TokenBucket(rate=2, burst=5, now=0)
+        assert bucket.wait_for(5) == 0
+        bucket.tokens = 1
+        assert bucket.wait_for(5) == 2
+
+
+class TestAdmissionController:
+    def test_client_bucket_sheds_and_refills(self, clock):
+        controller = AdmissionController(clock)
+        controller.configure(True, {'render': limits()})
+        controller.admit('render', 'a', 6)
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.admit('render', 'a', 6)
+        assert exc.value.scope == 'client'
+        assert exc.value.retry_after == 2
+
+        # Other clients have their own budget
+        controller.admit('render', 'b', 6)
+
+        clock.now += 2
+        controller.admit('render', 'a', 6)
+        stats = controller.stats()['endpoints']['render']
+        assert stats['admitted'] == 3
+        assert stats['shed_client'] == 1
+
+    def test_global_bucket_sheds_across_clients(self, clock):
+        controller = AdmissionController(clock)
+        controller.configure(True, {'render': limits(global_rate=1, global_burst=10)})
+        controller.admit('render', 'a', 6)
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.admit('render', 'b', 6)
+        assert exc.value.scope == 'global'
+        # The rejected request was not charged to its client
+        assert controller._limiters['render'].clients['b'].tokens == 10
+        assert controller.stats()['shed_total'] == 1
+
+    def test_cost_above_burst_is_capped(self, clock):
+        controller = AdmissionController(clock)
+        controller.configure(True, {'render': limits(client_burst=3)})
+        controller.admit('render', 'a', 50)
+        with pytest.raises(AdmissionRejected):
+            controller.admit('render', 'a', 50)
+
+    def test_disabled_or_unlisted_endpoints_pass(self, clock):
+        controller = AdmissionController(clock)
+        controller.configure(False, {'render': limits(client_burst=1)})
+        for _ in range(5):
+            controller.admit('render', 'a', 1)
+        controller.configure(True, {'render': limits(client_burst=1)})
+        for _ in range(5):
+            controller.admit('other', 'a', 1)
+
+    def test_config_overrides_merge_into_defaults(self, app):
+        app.config['ADMISSION_LIMITS'] = {'generate_slider_image': {'client_rate': 1}, 'get_image': None}
+        controller = AdmissionController()
+        controller.init_app(app)
+        generate = controller._limiters['generate_slider_image'].limits
+        assert generate['client_rate'] == 1
+        assert generate['global_burst'] == admission_module.DEFAULT_ADMISSION_LIMITS['generate_slider_image']['global_burst']
+        assert 'get_image' not in controller._limiters
+
+
+class TestAdmissionEndpoints:
+    def test_dense_slider_renders_get_429(self, client, clock):
+        admission.configure(True, {'generate_slider_image': limits(client_rate=0.1, client_burst=8)})
+        # 5000 dots cost 5 units, so the second dense render does not fit
+        assert client.post('/api/slider/generate', json=DENSE).status_code == 200
+        response = client.post('/api/slider/generate', json=DENSE)
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        assert 'error' in response.get_json()
+
+        metrics = client.get('/api/metrics').get_json()['admission']
+        assert metrics['shed_total'] == 1
+        assert metrics['endpoints']['generate_slider_image']['shed_client'] == 1
+
+    def test_cache_hits_are_not_charged(self, client, clock):
+        admission.configure(True, {'generate_slider_image': limits(client_rate=0.1, client_burst=8)})
+        seeded = {**DENSE, 'seed': 7}
+        for _ in range(3):
+            assert client.post('/api/slider/generate', json=seeded).status_code == 200
+        assert admission.stats()['endpoints']['generate_slider_image']['admitted'] == 1
+
+    def test_sparse_renders_cost_less(self, client, clock):
+        admission.configure(True, {'generate_slider_image': limits(client_rate=0.1, client_burst=8)})
+        sparse = {**DENSE, 'circle_mean_size': 40, 'pattern_density': 0.1}
+        # 100 dots cost 0.1 units each
+        for _ in range(10):
+            assert client.post('/api/slider/generate', json=sparse).status_code == 200
+
+    def test_pooled_test_images_are_free(self, client, clock):
+        admission.configure(True, {'get_image': limits(client_rate=0.1, client_burst=3)})
+        session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        for image_number in range(1, 11):
+            assert client.get(f'/api/test/{session_id}/image/{image_number}').status_code == 200
+
+        # A plate rendered on the fly costs about 2.5 units, so the second one is shed
+        session = SessionModel()
+        db.session.add(session)
+        db.session.commit()
+        assert client.get(f'/api/test/{session.id}/image/1?format=layout').status_code == 200
+        response = client.get(f'/api/test/{session.id}/image/2?format=layout')
+        assert response.status_code == 429
+        assert response.get_json()['error']['code'] == 'RATE_LIMITED'
+
+    def test_clients_behind_a_trusted_proxy_get_their_own_bucket(self, clock, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_HOPS', 1)
+        app = create_app('testing')
+        admission.configure(True, {'generate_slider_image': limits(client_rate=0.1, client_burst=8)})
+        client = app.test_client()
+
+        def post(forwarded_for):
+            headers = {'X-Forwarded-For': forwarded_for}
+            return client.post('/api/slider/generate', json=DENSE, headers=headers).status_code
+
+        with app.app_context():
+            db.create_all()
+            assert post('203.0.113.1') == 200
+            assert post('203.0.113.2') == 200
+            assert post('203.0.113.1') == 429
+            db.drop_all()
+        assert admission.stats()['endpoints']['generate_slider_image']['tracked_clients'] == 2
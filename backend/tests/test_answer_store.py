@@ -0,0 +1,152 @@
+import pytest
+import sys
+import os
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from models import db
+from models.answer import Answer
+from models.session_answers import SessionAnswers, PackedAnswer
+from models.test_session import TestSession as SessionModel
+from services import answer_store
+from services.image_selector import ImageSelector
+from migrate_pack_answers import migrate, count_pending
+
+
+def complete_test(client, answers):
+    session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+    for i, answer in enumerate(answers, start=1):
+        response = client.post(f'/api/test/{session_id}/answer', json={'image_number': i, 'user_answer': answer})
+        assert response.status_code == 201
+    return session_id
+
+
+ANSWERS = [42, None, 7, 99, 0, 13, 42, 55, None, 61]
+
+
+class TestSessionAnswersModel:
+    def test_pack_mapping_round_trip(self):
+        packed = SessionAnswers(image_ids=SessionAnswers.pack_mapping({1: 5, '2': 12, 10: 99}))
+        assert packed.image_mapping == {'1': 5, '2': 12, '10': 99}
+        assert SessionAnswers.pack_mapping(None) is None
+
+    def test_pack_mapping_rejects_wide_ids(self):
+        with pytest.raises(ValueError):
+            SessionAnswers.pack_mapping({1: 300})
+
+    def test_record_and_answers(self):
+        packed = SessionAnswers()
+        packed.record(3, 42, None, 'tritanopia')
+        packed.record(1, 10, 10, 'control')
+        assert packed.is_answered(3) and not packed.is_answered(2)
+        assert [a.to_dict() for a in packed.answers()] == [
+            {'image_number': 1, 'correct_answer': 10, 'user_answer': 10, 'is_correct': True,
+             'dichromism_type': 'control'},
+            {'image_number': 3, 'correct_answer': 42, 'user_answer': None, 'is_correct': False,
+             'dichromism_type': 'tritanopia'},
+        ]
+
+    def test_packed_answer_matches_answer_to_dict(self):
+        kwargs = dict(image_number=4, correct_answer=12, user_answer=21, dichromism_type='protanopia')
+        assert PackedAnswer('s', **kwargs).to_dict() == Answer(session_id='s', **kwargs).to_dict()
+
+
+class TestPackedStorageApi:
+    def test_packed_session_stores_one_row(self, app, client):
+        app.config['ANSWER_STORAGE'] = 'packed'
+        session_id = complete_test(client, ANSWERS)
+
+        session = db.session.get(SessionModel, session_id)
+        assert session.image_mapping is None
+        assert session.packed_answers is not None
+        assert Answer.query.filter_by(session_id=session_id).count() == 0
+
+    def test_results_match_row_storage(self, app, client):
+        rows_id = complete_test(client, ANSWERS)
+        app.config['ANSWER_STORAGE'] = 'packed'
+        packed_id = complete_test(client, ANSWERS)
+
+        rows = client.get(f'/api/test/{rows_id}/results').get_json()
+        packed = client.get(f'/api/test/{packed_id}/results').get_json()
+        assert packed.keys() == rows.keys()
+        assert len(packed['answers']) == 10
+        # Image choice depends on the session id, so compare shape and answer fields
+        assert [a['user_answer'] for a in packed['answers']] == ANSWERS
+        assert [a['user_answer'] for a in rows['answers']] == ANSWERS
+
+    def test_packed_image_and_duplicate_answer(self, app, client):
+        app.config['ANSWER_STORAGE'] = 'packed'
+        session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+
+        response = client.get(f'/api/test/{session_id}/image/1')
+        assert response.status_code == 200
+        assert 'X-Image-ID' in response.headers
+
+        client.post(f'/api/test/{session_id}/answer', json={'image_number': 1, 'user_answer': 5})
+        response = client.post(f'/api/test/{session_id}/answer', json={'image_number': 1, 'user_answer': 6})
+        assert response.status_code == 409
+        assert response.get_json()['error']['code'] == 'ANSWER_ALREADY_EXISTS'
+
+
+    def test_loading_a_session_is_one_query(self, app, client):
+        session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        db.session.expire_all()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            session = db.session.get(SessionModel, session_id)
+            assert answer_store.get_image_mapping(session) is not None
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        # The packed row is joined in rather than loaded on first access
+        assert len(statements) == 1
+
+    def test_pool_too_large_to_pack_uses_rows(self, app, client, monkeypatch):
+        app.config['ANSWER_STORAGE'] = 'packed'
+        wide = {number: 250 + number for number in range(1, 11)}
+        monkeypatch.setattr(ImageSelector, 'get_session_image_mapping', lambda self, session_id: wide)
+        response = client.post('/api/test/start', json={})
+        assert response.status_code == 201
+
+        session = db.session.get(SessionModel, response.get_json()['session_id'])
+        assert session.packed_answers is None
+        assert session.image_mapping == {str(number): image_id for number, image_id in wide.items()}
+        assert migrate() == 0
+
+
+class TestMigration:
+    def test_migrate_converts_row_sessions(self, app, client):
+        ids = [complete_test(client, ANSWERS) for _ in range(3)]
+        partial_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        client.post(f'/api/test/{partial_id}/answer', json={'image_number': 2, 'user_answer': 8})
+        before = {sid: client.get(f'/api/test/{sid}/results').get_json() for sid in ids}
+        mappings = {sid: db.session.get(SessionModel, sid).image_mapping for sid in ids + [partial_id]}
+
+        assert count_pending() == 4
+        progress = []
+        assert migrate(batch_size=2, progress=progress.append) == 4
+        assert progress == [2, 4]
+        assert count_pending() == 0
+        assert Answer.query.count() == 0
+
+        db.session.expire_all()
+        for sid in ids:
+            assert client.get(f'/api/test/{sid}/results').get_json() == before[sid]
+        partial = db.session.get(SessionModel, partial_id)
+        assert partial.packed_answers.image_mapping == mappings[partial_id]
+        assert [a.image_number for a in partial.packed_answers.answers()] == [2]
+
+        # Re-running finds nothing left to convert
+        assert migrate(batch_size=2) == 0
+
+    def test_migrate_keep_rows(self, app, client):
+        session_id = complete_test(client, ANSWERS)
+        assert migrate(keep_rows=True) == 1
+        assert Answer.query.filter_by(session_id=session_id).count() == 10
+        assert db.session.get(SessionModel, session_id).image_mapping is not None
@@ -1,6 +1,9 @@
 import json
 import pytest
 
+from models import db
+from models.test_session import TestSession as SessionModel
+
 
 class TestStartEndpoint:
     def test_start_test_creates_session(self, client):
@@ -51,6 +54,34 @@ class TestImageEndpoint:
         
         response = client.get(f'/api/test/{session_id}/image/1')
         assert 'X-Dichromism-Type' in response.headers
+    
+    def test_get_image_vector_formats(self, client):
+        # Vector formats are drawn for sessions rendered on the fly
+        session = SessionModel()
+        db.session.add(session)
+        db.session.commit()
+        session_id = session.id
+        
+        response = client.get(f'/api/test/{session_id}/image/1?format=svg')
+        assert response.status_code == 200
+        assert response.content_type.startswith('image/svg+xml')
+        assert response.data.startswith(b'<svg')
+        
+        response = client.get(f'/api/test/{session_id}/image/1?format=layout')
+        assert response.status_code == 200
+        assert response.data.startswith(b'DPL1')
+        
+        response = client.get(f'/api/test/{session_id}/image/1?format=gif')
+        assert response.status_code == 400
+    
+    def test_pooled_sessions_only_serve_png(self, client):
+        start_response = client.post('/api/test/start', json={})
+        session_id = start_response.get_json()['session_id']
+        
+        for output_format in ('svg', 'layout'):
+            response = client.get(f'/api/test/{session_id}/image/1?format={output_format}')
+            assert response.status_code == 400
+            assert response.get_json()['error']['code'] == 'VALIDATION_ERROR'
 
 
 class TestAnswerEndpoint:
@@ -175,3 +206,164 @@ class TestResultsEndpoint:
         assert 'suspected_type' in analysis
         assert 'confidence' in analysis
         assert 'details' in analysis
+
+
+class TestSliderGenerateEndpoint:
+    def test_generate_full(self, client):
+        response = client.post('/api/slider/generate', json={'seed': 1})
+        assert response.status_code == 200
+        assert 'image_base64' in response.get_json()
+
+    def test_generate_preview(self, client):
+        response = client.post('/api/slider/generate', json={'seed': 1, 'quality': 'preview'})
+        assert response.status_code == 200
+        assert 'image_base64' in response.get_json()
+
+    def test_invalid_quality_rejected(self, client):
+        response = client.post('/api/slider/generate', json={'quality': 'ultra'})
+        assert response.status_code == 400
+
+    def test_invalid_preview_size_rejected(self, client):
+        response = client.post('/api/slider/generate', json={'quality': 'preview', 'preview_size': 500})
+        assert response.status_code == 400
+
+    def test_generate_binary_png(self, client):
+        response = client.post('/api/slider/generate', json={'seed': 1, 'format': 'png'})
+        assert response.status_code == 200
+        assert response.content_type == 'image/png'
+        assert response.data.startswith(b'\x89PNG')
+        assert 'X-Luminance-Delta' in response.headers
+
+    def test_generate_binary_webp(self, client):
+        response = client.post('/api/slider/generate', json={'seed': 1, 'format': 'webp'})
+        assert response.status_code == 200
+        assert response.content_type == 'image/webp'
+
+    def test_generate_vector_formats(self, client):
+        response = client.post('/api/slider/generate', json={'seed': 1, 'format': 'svg'})
+        assert response.status_code == 200
+        assert response.content_type.startswith('image/svg+xml')
+        assert 'X-Luminance-Delta' in response.headers
+
+        response = client.post('/api/slider/generate', json={'seed': 1, 'format': 'layout'})
+        assert response.status_code == 200
+        assert response.content_type == 'application/octet-stream'
+        assert response.data.startswith(b'DPL1')
+
+    def test_invalid_format_rejected(self, client):
+        response = client.post('/api/slider/generate', json={'seed': 1, 'format': 'gif'})
+        assert response.status_code == 400
+
+
+class TestSliderImageEndpoint:
+    def test_seeded_request_redirects_to_canonical_url(self, client):
+        response = client.get('/api/slider/image?seed=7&pattern_density=0.3')
+        assert response.status_code == 302
+        location = response.headers['Location']
+        assert 'seed=7' in location
+        assert 'pattern_density=0.3' in location
+
+        # The canonical URL is served directly
+        response = client.get(location)
+        assert response.status_code == 200
+        assert response.content_type == 'image/png'
+        assert 'immutable' in response.headers['Cache-Control']
+        assert response.headers['ETag']
+
+    def test_conditional_request_returns_304(self, client):
+        location = client.get('/api/slider/image?seed=7').headers['Location']
+        etag = client.get(location).headers['ETag']
+
+        response = client.get(location, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_unseeded_request_is_not_cacheable(self, client):
+        response = client.get('/api/slider/image?fg_rgb=200,100,100')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-store'
+
+    def test_invalid_query_rejected(self, client):
+        response = client.get('/api/slider/image?fg_rgb=red')
+        assert response.status_code == 400
+
+
+class TestSliderCompareEndpoint:
+    def test_compare_separate(self, client):
+        response = client.post('/api/slider/compare', json={'seed': 1})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['panels'] == ['original', 'deuteranopia', 'protanopia', 'tritanopia']
+        assert set(data['images']) == set(data['panels'])
+
+    def test_compare_sheet_binary(self, client):
+        response = client.post('/api/slider/compare', json={
+            'seed': 1, 'layout': 'sheet', 'format': 'png', 'dichromat_types': ['deuteranopia']
+        })
+        assert response.status_code == 200
+        assert response.content_type == 'image/png'
+        assert response.headers['X-Panels'] == 'original,deuteranopia'
+
+    def test_compare_invalid_types_rejected(self, client):
+        response = client.post('/api/slider/compare', json={'dichromat_types': ['achromatopsia']})
+        assert response.status_code == 400
+
+
+class TestLuminanceBatchEndpoints:
+    def test_luminance_batch_matches_single(self, client):
+        colors = [[128, 128, 128], [255, 0, 0], [10, 200, 30]]
+        response = client.post('/api/slider/luminance/batch', json={'colors': colors})
+        assert response.status_code == 200
+        luminances = response.get_json()['luminances']
+
+        for rgb, luminance in zip(colors, luminances):
+            single = client.post('/api/slider/luminance', json={'rgb': rgb}).get_json()
+            assert single['luminance'] == luminance
+
+    def test_match_luminance_batch_matches_single(self, client):
+        fg_colors = [[150, 120, 140], [200, 50, 90]]
+        response = client.post('/api/slider/match-luminance/batch', json={
+            'fg_colors': fg_colors, 'bg_rgb': [145, 145, 145]
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+
+        for i, fg in enumerate(fg_colors):
+            single = client.post('/api/slider/match-luminance', json={
+                'fg_rgb': fg, 'bg_rgb': [145, 145, 145]
+            }).get_json()
+            assert data['matched_fg_rgb'][i] == single['matched_fg_rgb']
+            assert data['luminance_delta'][i] == single['luminance_delta']
+
+    def test_batch_rejects_invalid_colors(self, client):
+        response = client.post('/api/slider/luminance/batch', json={'colors': [[1, 2]]})
+        assert response.status_code == 400
+        response = client.post('/api/slider/luminance/batch', json={'colors': [[1, 2, 300]]})
+        assert response.status_code == 400
+
+    def test_batch_size_limit(self, app, client):
+        app.config['SLIDER_BATCH_MAX_COLORS'] = 2
+        response = client.post('/api/slider/luminance/batch', json={'colors': [[1, 2, 3]] * 3})
+        assert response.status_code == 400
+
+
+class TestConfusableEndpoint:
+    def test_returns_ranked_candidates(self, app, client):
+        app.config['SLIDER_CONFUSABLE_GRID_STEP'] = 8
+        response = client.post('/api/slider/confusable', json={
+            'bg_rgb': [145, 145, 145], 'dichromat_type': 'protanopia',
+            'max_simulated_distance': 30, 'min_original_distance': 15, 'limit': 5
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['dichromat_type'] == 'protanopia'
+        assert 0 < len(data['candidates']) <= 5
+        distances = [c['simulated_distance'] for c in data['candidates']]
+        assert distances == sorted(distances)
+
+    def test_rejects_invalid_params(self, client):
+        response = client.post('/api/slider/confusable', json={'dichromat_type': 'achromatopsia'})
+        assert response.status_code == 400
+        response = client.post('/api/slider/confusable', json={'limit': 0})
+        assert response.status_code == 400
+        response = client.post('/api/slider/confusable', json={'luminance_tolerance': 1})
+        assert response.status_code == 400
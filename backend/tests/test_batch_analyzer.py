@@ -0,0 +1,104 @@
+import random
+import pytest
+import sys
+import os
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+from models.session_answers import SessionAnswers
+from models.session_result import SessionResult
+from models.test_session import TestSession as SessionModel
+from services import answer_store
+from services.batch_analyzer import BatchAnalyzer, load_chunk, rescore
+from services.results_analyzer import ResultsAnalyzer
+
+TYPES = ['protanopia'] * 3 + ['deuteranopia'] * 3 + ['tritanopia'] * 3 + ['control']
+
+
+def add_session(rng, packed, answered=10, completed=True):
+    session = SessionModel(completed_at=datetime.now(timezone.utc) if completed else None)
+    db.session.add(session)
+    db.session.flush()
+    if packed:
+        session.packed_answers = SessionAnswers()
+    # Mostly the real plate layout, sometimes two controls to exercise the control rule
+    types = TYPES if rng.random() < 0.8 else TYPES[:8] + ['control', 'control']
+    for image_number in rng.sample(range(1, 11), answered):
+        correct = rng.randrange(100)
+        roll = rng.random()
+        user = correct if roll < 0.6 else (None if roll < 0.7 else (correct + 1) % 100)
+        answer_store.save_answer(session, image_number, correct, user, types[image_number - 1])
+    return session.id
+
+
+@pytest.fixture
+def sessions(app):
+    rng = random.Random(46)
+    ids = [add_session(rng, packed=i % 2 == 0) for i in range(300)]
+    ids += [add_session(rng, packed=i % 2 == 0, answered=7, completed=False) for i in range(10)]
+    db.session.commit()
+    return ids
+
+
+def expected(analyzer, session_id):
+    return analyzer.analyze_session(answer_store.load_answers(db.session, session_id))
+
+
+class TestBatchAnalyzer:
+    @pytest.mark.parametrize('analyzer', [
+        ResultsAnalyzer(),
+        ResultsAnalyzer(deficient_error_rate=0.5, normal_error_rate=0.0, max_control_errors=1),
+    ])
+    def test_matches_analyze_session(self, sessions, analyzer):
+        chunk = load_chunk(sessions, [s for s in sessions if db.session.get(SessionAnswers, s)])
+        analysis = BatchAnalyzer(analyzer).analyze(chunk)
+
+        statuses = set()
+        for i, session_id in enumerate(sessions):
+            result = expected(analyzer, session_id)
+            statuses.add(result['color_vision_status'])
+            assert analysis['color_vision_status'][i] == result['color_vision_status']
+            assert analysis['suspected_type'][i] == result['suspected_type']
+            assert analysis['confidence'][i] == result['confidence']
+            if result['details']:
+                assert analysis['errors'][i].tolist() == [
+                    result['details'][f'{t}_errors'] for t in ['protanopia', 'deuteranopia', 'tritanopia', 'control']
+                ]
+        assert statuses == {'incomplete', 'unreliable', 'normal', 'deficient'}
+
+    def test_rescore_writes_results_in_chunks(self, sessions):
+        progress = []
+        totals = rescore(chunk_size=64, include_incomplete=True, progress=lambda n, _: progress.append(n))
+        assert progress[-1] == len(sessions) and len(progress) == 5
+        assert sum(totals.values()) == len(sessions)
+
+        analyzer = ResultsAnalyzer()
+        for session_id in sessions[::7]:
+            stored = db.session.get(SessionResult, session_id)
+            result = expected(analyzer, session_id)
+            assert stored.color_vision_status == result['color_vision_status']
+            assert stored.suspected_type == result['suspected_type']
+            assert stored.confidence == result['confidence']
+            assert stored.control_errors == result['details'].get('control_errors')
+            assert stored.rules == analyzer.rules
+
+    def test_rescore_skips_sessions_scored_under_same_rules(self, sessions):
+        assert sum(rescore().values()) == 300
+        assert sum(rescore().values()) == 0
+
+        stricter = ResultsAnalyzer(deficient_error_rate=0.3)
+        totals = rescore(stricter)
+        assert sum(totals.values()) == 300
+        assert SessionResult.query.filter_by(rules=stricter.rules).count() == 300
+        assert SessionResult.query.count() == 300
+
+    def test_results_route_uses_configured_rules(self, app, client):
+        session_id = add_session(random.Random(1), packed=False)
+        db.session.commit()
+        app.config['ANALYSIS_MAX_CONTROL_ERRORS'] = 10
+        app.config['ANALYSIS_DEFICIENT_ERROR_RATE'] = 2.0
+
+        data = client.get(f'/api/test/{session_id}/results').get_json()
+        assert data['analysis']['color_vision_status'] == 'normal'
@@ -0,0 +1,100 @@
+import json
+import numpy as np
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.confusion_index import (
+    build_index,
+    ConfusionIndex,
+    ConfusionIndexMissing,
+    confusion_index,
+    unpack_rgb
+)
+from utils.dichromat_sim import simulate_image
+
+
+@pytest.fixture(scope='module')
+def index_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp('confusion_index')
+    build_index(str(path), ['deuteranopia', 'tritanopia'], bin_size=8, source_step=8)
+    return path
+
+
+def brute_force(rgb, dichromat_type, radius, step=8):
+    levels = np.arange(0, 256, step)
+    colors = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(-1, 3).astype(np.uint8)
+    simulated = simulate_image(colors[:, None, :], dichromat_type)[:, 0, :].astype(np.int16)
+    target = simulate_image(np.array([[rgb]], dtype=np.uint8), dichromat_type)[0, 0].astype(np.int16)
+    keep = np.linalg.norm(simulated - target, axis=1) <= radius
+    return {tuple(c) for c in colors[keep].tolist()}
+
+
+class TestConfusionIndex:
+    @pytest.mark.parametrize('rgb,radius', [((200, 80, 80), 6.0), ((16, 240, 120), 12.0), ((0, 0, 0), 3.0)])
+    def test_query_matches_brute_force(self, index_dir, rgb, radius):
+        index = ConfusionIndex(str(index_dir))
+        result = index.query(rgb, 'deuteranopia', radius, limit=100000)
+        assert result['count'] == len(result['colors'])
+        assert {tuple(c) for c in result['colors']} == brute_force(rgb, 'deuteranopia', radius)
+
+    def test_results_nearest_first_and_limited(self, index_dir):
+        index = ConfusionIndex(str(index_dir))
+        result = index.query((120, 160, 40), 'tritanopia', 10.0, limit=5)
+        assert len(result['colors']) <= 5
+        assert result['distances'] == sorted(result['distances'])
+
+    def test_empty_result_has_every_field(self, index_dir):
+        index = ConfusionIndex(str(index_dir))
+        # No source colour simulates anywhere near magenta's bucket, and one just
+        # out of range is found in a bucket but filtered by distance
+        for rgb in ((255, 0, 255), (255, 255, 255)):
+            result = index.query(rgb, 'deuteranopia', 0.5, limit=10)
+            assert result['count'] == 0
+            assert result['colors'] == result['distances'] == []
+
+    def test_sources_partition_cube(self, index_dir):
+        sources = np.load(index_dir / 'deuteranopia_sources.npy')
+        offsets = np.load(index_dir / 'deuteranopia_offsets.npy')
+        assert offsets[-1] == len(sources) == 32 ** 3
+        assert len(np.unique(sources)) == len(sources)
+        assert unpack_rgb(sources).max() <= 248
+
+    def test_missing_type_and_directory(self, index_dir, tmp_path):
+        with pytest.raises(ConfusionIndexMissing):
+            ConfusionIndex(str(index_dir)).query((1, 2, 3), 'protanopia')
+        with pytest.raises(ConfusionIndexMissing):
+            ConfusionIndex(str(tmp_path)).query((1, 2, 3), 'deuteranopia')
+        assert ConfusionIndex(str(index_dir)).available_types() == ['deuteranopia', 'tritanopia']
+
+    def test_stale_index_rejected(self, index_dir, tmp_path):
+        manifest = json.loads((index_dir / 'manifest.json').read_text())
+        manifest['linear_lut_size'] = 1
+        (tmp_path / 'manifest.json').write_text(json.dumps(manifest))
+        with pytest.raises(ConfusionIndexMissing):
+            ConfusionIndex(str(tmp_path)).query((1, 2, 3), 'deuteranopia')
+
+
+class TestLookalikesEndpoint:
+    def test_query(self, client, index_dir):
+        confusion_index.configure(str(index_dir))
+        response = client.post('/api/slider/lookalikes', json={
+            'rgb': [200, 80, 80], 'dichromat_type': 'deuteranopia', 'radius': 6, 'limit': 10
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 0 < len(data['colors']) <= 10
+        assert data['count'] >= len(data['colors'])
+
+    def test_missing_index_is_503(self, client, tmp_path):
+        confusion_index.configure(str(tmp_path))
+        response = client.post('/api/slider/lookalikes', json={'rgb': [1, 2, 3]})
+        assert response.status_code == 503
+
+    def test_rejects_invalid_params(self, client):
+        response = client.post('/api/slider/lookalikes', json={'rgb': [1, 2]})
+        assert response.status_code == 400
+        response = client.post('/api/slider/lookalikes', json={'rgb': [1, 2, 3], 'radius': 100})
+        assert response.status_code == 400
@@ -0,0 +1,41 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.confusion_search import find_confusable_colors, cache_stats
+from utils.dichromat_sim import simulate_dichromat
+from utils.luminance import calculate_luminance
+
+
+class TestConfusionSearch:
+    @pytest.mark.parametrize('dichromat_type', ['deuteranopia', 'protanopia', 'tritanopia'])
+    def test_candidates_satisfy_tolerances(self, dichromat_type):
+        bg = (145, 145, 145)
+        candidates = find_confusable_colors(bg, dichromat_type, 0.02, 30.0, 15.0, 20, 8)
+        assert candidates
+
+        bg_luminance = calculate_luminance(*bg)
+        for candidate in candidates:
+            fg = tuple(candidate['fg_rgb'])
+            assert abs(calculate_luminance(*fg) - bg_luminance) <= 0.02
+            assert candidate['simulated_distance'] <= 30.0
+            assert candidate['original_distance'] >= 15.0
+            assert candidate['simulated_fg_rgb'] == list(simulate_dichromat(fg, dichromat_type))
+
+    def test_ranked_by_simulated_distance(self):
+        candidates = find_confusable_colors((145, 145, 145), 'protanopia', 0.02, 30.0, 15.0, 50, 8)
+        distances = [c['simulated_distance'] for c in candidates]
+        assert distances == sorted(distances)
+
+    def test_limit_and_empty_result(self):
+        assert len(find_confusable_colors((145, 145, 145), 'deuteranopia', 0.02, 30.0, 15.0, 3, 8)) == 3
+        assert find_confusable_colors((145, 145, 145), 'deuteranopia', 0.0, 0.0, 400.0, 20, 8) == ()
+
+    def test_repeated_query_is_cached(self):
+        args = ((120, 130, 140), 'tritanopia', 0.02, 30.0, 15.0, 10, 8)
+        first = find_confusable_colors(*args)
+        hits = cache_stats()['hits']
+        assert find_confusable_colors(*args) is first
+        assert cache_stats()['hits'] == hits + 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import dichromat_sim
+from utils.dichromat_sim import simulate_dichromat, simulate_image, get_transform
+from utils.luminance import srgb_to_linear, linear_to_srgb
+
+TYPES = ['deuteranopia', 'protanopia', 'tritanopia']
+
+
+def reference_simulation(pixels: np.ndarray, dichromat_type: str) -> np.ndarray:
+    """Exact float64 simulation the lookup tables approximate."""
+    transform = get_transform(dichromat_type)
+    out = []
+    for rgb in pixels.reshape(-1, 3):
+        linear = np.array([srgb_to_linear(v / 255.0) for v in rgb])
+        simulated = np.clip(transform @ linear, 0.0, 1.0)
+        out.append([round(linear_to_srgb(v) * 255) for v in simulated])
+    return np.array(out).reshape(pixels.shape)
+
+
+class TestDichromatSimulation:
+    @pytest.mark.parametrize('dichromat_type', TYPES)
+    def test_image_within_one_level_of_exact(self, dichromat_type):
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+        expected = reference_simulation(pixels, dichromat_type)
+        actual = simulate_image(pixels, dichromat_type).astype(int)
+        assert np.abs(actual - expected).max() <= 1
+
+    @pytest.mark.parametrize('dichromat_type', TYPES)
+    def test_scalar_matches_image(self, dichromat_type):
+        rng = np.random.default_rng(1)
+        pixels = rng.integers(0, 256, (20, 1, 3), dtype=np.uint8)
+        simulated = simulate_image(pixels, dichromat_type)
+        for rgb, expected in zip(pixels[:, 0], simulated[:, 0]):
+            assert simulate_dichromat(tuple(int(v) for v in rgb), dichromat_type) == tuple(int(v) for v in expected)
+
+    def test_black_and_white_are_preserved(self):
+        for dichromat_type in TYPES:
+            assert simulate_dichromat((0, 0, 0), dichromat_type) == (0, 0, 0)
+            assert simulate_dichromat((255, 255, 255), dichromat_type) == (255, 255, 255)
+
+    def test_chunked_processing_matches_single_pass(self, monkeypatch):
+        rng = np.random.default_rng(2)
+        pixels = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        single = simulate_image(pixels, 'protanopia')
+
+        monkeypatch.setattr(dichromat_sim, 'CHUNK_PIXELS', 1000)
+        chunked = simulate_image(pixels, 'protanopia')
+        assert np.array_equal(single, chunked)
+        assert chunked.shape == pixels.shape
+        assert chunked.dtype == np.uint8
+
+    def test_empty_image(self):
+        for shape in ((0, 0, 3), (0, 5, 3)):
+            simulated = simulate_image(np.zeros(shape, dtype=np.uint8), 'deuteranopia')
+            assert simulated.shape == shape
+            assert simulated.dtype == np.uint8
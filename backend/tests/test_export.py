@@ -0,0 +1,119 @@
+import csv
+import gzip
+import io
+import json
+import zlib
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+from models.session_answers import SessionAnswers
+from models.test_session import TestSession as SessionModel
+from services import answer_store
+from services.session_export import ExportFilters, stream_export
+
+AUTH = {'Authorization': 'Bearer secret'}
+
+
+def add_session(created_at, packed=False, answers=10, completed=True):
+    session = SessionModel(created_at=created_at, completed_at=created_at if completed else None,
+                           metadata_json={'study': 'a'})
+    db.session.add(session)
+    db.session.flush()
+    if packed:
+        session.packed_answers = SessionAnswers()
+    for image_number in range(1, answers + 1):
+        user_answer = None if image_number == 2 else image_number
+        answer_store.save_answer(session, image_number, image_number, user_answer, 'protanopia')
+    return session.id
+
+
+@pytest.fixture
+def sessions(app):
+    app.config['EXPORT_TOKEN'] = 'secret'
+    ids = [
+        add_session(datetime(2024, 1, 1)),
+        add_session(datetime(2024, 2, 1), packed=True),
+        add_session(datetime(2024, 3, 1), answers=3, completed=False),
+        add_session(datetime(2024, 4, 1), packed=True, answers=0, completed=False),
+        add_session(datetime(2024, 5, 1)),
+    ]
+    db.session.commit()
+    return ids
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.data.decode().splitlines()]
+
+
+class TestExportEndpoint:
+    def test_disabled_without_token_config(self, client):
+        assert client.get('/api/export/sessions').status_code == 404
+
+    def test_requires_token(self, client, sessions):
+        assert client.get('/api/export/sessions').status_code == 401
+        response = client.get('/api/export/sessions', headers={'Authorization': 'Bearer wrong'})
+        assert response.status_code == 401
+
+    def test_ndjson_includes_both_schemas(self, client, sessions):
+        response = client.get('/api/export/sessions', headers=AUTH)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        records = ndjson(response)
+        assert [r['session_id'] for r in records] == sorted(sessions)
+
+        by_id = {r['session_id']: r for r in records}
+        row_stored, packed = by_id[sessions[0]], by_id[sessions[1]]
+        assert row_stored['answers'] == packed['answers']
+        assert len(packed['answers']) == 10
+        assert packed['answers'][1] == {'image_number': 2, 'correct_answer': 2, 'user_answer': None,
+                                        'is_correct': False, 'dichromism_type': 'protanopia'}
+        assert packed['metadata'] == {'study': 'a'}
+        assert by_id[sessions[3]]['answers'] == []
+
+    def test_filters(self, client, sessions):
+        response = client.get('/api/export/sessions?status=completed&from=2024-01-15&to=2024-05-01', headers=AUTH)
+        assert [r['session_id'] for r in ndjson(response)] == [sessions[1]]
+        response = client.get('/api/export/sessions?status=incomplete', headers=AUTH)
+        assert sorted(r['session_id'] for r in ndjson(response)) == sorted(sessions[2:4])
+
+    def test_gzip_csv(self, client, sessions):
+        response = client.get('/api/export/sessions?format=csv&gzip=true', headers=AUTH)
+        assert response.mimetype == 'application/gzip'
+        assert response.headers['Content-Disposition'].endswith('.csv.gz"')
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+        # 10 + 10 + 3 + 10 answers, plus one row for the session without answers
+        assert len(rows) == 34
+        empty = [r for r in rows if r['session_id'] == sessions[3]]
+        assert empty[0]['image_number'] == ''
+
+    def test_validation(self, client, sessions):
+        for query in ('format=xml', 'status=done', 'from=yesterday'):
+            response = client.get(f'/api/export/sessions?{query}', headers=AUTH)
+            assert response.status_code == 400
+
+
+class TestStreamExport:
+    def test_streams_one_chunk_per_batch(self, app, sessions):
+        chunks = list(stream_export(db.session, 'csv', ExportFilters(), batch_size=2))
+        # Header, then three batches of at most two sessions
+        assert len(chunks) == 4
+        assert chunks[0].startswith(b'session_id,created_at')
+
+    def test_transaction_ends_before_each_batch_is_sent(self, app, sessions):
+        for chunk in stream_export(db.session, 'ndjson', ExportFilters(), batch_size=2):
+            assert chunk and not db.session().in_transaction()
+
+    def test_gzip_chunks_decompress_incrementally(self, app, sessions):
+        chunks = list(stream_export(db.session, 'ndjson', ExportFilters(), batch_size=2, compress=True))
+        # The gzip header goes out before the first query
+        assert len(chunks) == 5 and chunks[0].startswith(b'\x1f\x8b')
+        decompressor = zlib.decompressobj(31)
+        # Each batch is flushed, so it can be read before the stream ends
+        first_batch = decompressor.decompress(chunks[0] + chunks[1])
+        assert len(first_batch.splitlines()) == 2
+        assert gzip.decompress(b''.join(chunks)).count(b'\n') == 5
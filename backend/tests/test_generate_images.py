@@ -0,0 +1,71 @@
+import json
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import generate_images
+from generate_images import read_journal, finalize_metadata
+
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['generate_images.py', *argv])
+    generate_images.main()
+
+
+class TestGenerateImages:
+    def test_build_writes_metadata_and_removes_journal(self, tmp_path, monkeypatch):
+        run(monkeypatch, '--output-dir', str(tmp_path), '--count', '3', '--seed', 's')
+        metadata = json.loads((tmp_path / 'metadata.json').read_text())
+        assert metadata['seed'] == 's'
+        assert [img['id'] for img in metadata['images']] == [0, 1, 2]
+        assert not (tmp_path / 'metadata.jsonl').exists()
+
+    def test_interrupted_build_resumes_from_journal(self, tmp_path, monkeypatch):
+        run(monkeypatch, '--output-dir', str(tmp_path), '--count', '3', '--seed', 's')
+        expected = json.loads((tmp_path / 'metadata.json').read_text())
+
+        # Rebuild a journal as a crash after image 1 (with a torn write) would leave it
+        header = {k: expected[k] for k in ('version', 'generated_at', 'total_images', 'seed')}
+        lines = [json.dumps(header)] + [json.dumps(img) for img in expected['images'][:2]]
+        (tmp_path / 'metadata.jsonl').write_text('\n'.join(lines) + '\n{"id": 2, "file')
+        (tmp_path / 'metadata.json').unlink()
+        (tmp_path / 'image_002.png').unlink()
+        mtime = (tmp_path / 'image_000.png').stat().st_mtime_ns
+
+        run(monkeypatch, '--output-dir', str(tmp_path), '--count', '3')
+        assert json.loads((tmp_path / 'metadata.json').read_text()) == expected
+        assert (tmp_path / 'image_000.png').stat().st_mtime_ns == mtime
+
+    def test_resume_rejects_different_seed(self, tmp_path, monkeypatch):
+        (tmp_path / 'metadata.jsonl').write_text(json.dumps({
+            'version': '1.0', 'generated_at': 'x', 'total_images': 3, 'seed': 'a', 'format': 'png'
+        }) + '\n')
+        with pytest.raises(SystemExit):
+            run(monkeypatch, '--output-dir', str(tmp_path), '--count', '3', '--seed', 'b')
+
+    def test_read_journal_truncates_torn_line(self, tmp_path):
+        journal = tmp_path / 'metadata.jsonl'
+        journal.write_text('{"seed": "a"}\n{"id": 0, "file_size": 1, "sha256": "x"}\n{"id": 1, "fi')
+        header, done = read_journal(journal)
+        assert header == {'seed': 'a'}
+        assert done == {0: (1, 'x')}
+        assert journal.read_text().endswith('"x"}\n')
+
+    def test_finalize_uses_latest_record_and_requires_all_images(self, tmp_path):
+        journal = tmp_path / 'metadata.jsonl'
+        header = {'version': '1.0', 'generated_at': 'x', 'total_images': 2, 'seed': 'a'}
+        record = {'id': 1, 'file_size': 1, 'sha256': 'old', 'dichromism_type': 'protanopia'}
+        journal.write_text(json.dumps(header) + '\n' + json.dumps(record) + '\n')
+        with pytest.raises(ValueError):
+            finalize_metadata(journal, tmp_path / 'metadata.json')
+
+        with open(journal, 'a') as f:
+            f.write(json.dumps({**record, 'id': 0}) + '\n')
+            f.write(json.dumps({**record, 'sha256': 'new'}) + '\n')
+        finalize_metadata(journal, tmp_path / 'metadata.json')
+        metadata = json.loads((tmp_path / 'metadata.json').read_text())
+        assert [img['id'] for img in metadata['images']] == [0, 1]
+        assert metadata['images'][1]['sha256'] == 'new'
@@ -5,6 +5,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.image_generator import ImageGenerator
+from utils.plate_vector import unpack_layout
 from PIL import Image
 import io
 
@@ -99,3 +100,17 @@ class TestImageGenerator:
         
         config = generator.get_test_config('test-session', 10)
         assert config['dichromism_type'] == 'control'
+    
+    def test_vector_layout_matches_placed_dots(self, generator):
+        dots = generator.generate_test_layout('test-session-123', 1)
+        layout = unpack_layout(generator.generate_test_vector('test-session-123', 1, vector_format='layout'))
+        assert layout['size'] == 400
+        assert layout['x'].tolist() == [dot[0] for dot in dots]
+        assert layout['r'].tolist() == [dot[2] // 2 for dot in dots]
+        assert [tuple(c) for c in layout['colors'].tolist()] == [dot[3] for dot in dots]
+    
+    def test_vector_svg_and_invalid_format(self, generator):
+        svg = generator.generate_test_vector('test-session-123', 1)
+        assert svg.startswith(b'<svg')
+        with pytest.raises(ValueError):
+            generator.generate_test_vector('test-session-123', 1, vector_format='pdf')
@@ -0,0 +1,215 @@
+import json
+import pytest
+import sys
+import os
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import rollover_pool
+from app import create_app
+from models import db
+from models.test_session import TestSession as SessionModel
+from services import answer_store
+from services.image_pool import (
+    CURRENT_POINTER, NEXT_POINTER, WARM_RETRY_SECONDS, ImagePool, image_pool, read_pointer, worker_reports, write_pointer
+)
+
+STATIC_POOL = Path(__file__).parent.parent / 'static' / 'test_images'
+
+
+def add_version(pool_dir, version, reverse=False):
+    """Link the committed pool's images into a version; reverse reassigns every image ID."""
+    metadata = json.loads((STATIC_POOL / 'metadata.json').read_text())
+    images = metadata['images']
+    if reverse:
+        images = [{**image, 'id': i} for i, image in enumerate(reversed(images))]
+    version_dir = pool_dir / 'versions' / version
+    version_dir.mkdir(parents=True)
+    for image in images:
+        (version_dir / image['filename']).symlink_to(STATIC_POOL / image['filename'])
+    (version_dir / 'metadata.json').write_text(json.dumps({**metadata, 'images': images}))
+    return version_dir
+
+
+@pytest.fixture
+def pool_dir(app, tmp_path):
+    add_version(tmp_path, 'v1')
+    add_version(tmp_path, 'v2', reverse=True)
+    write_pointer(tmp_path, CURRENT_POINTER, 'v1')
+    image_pool.configure(str(tmp_path), 0, 2)
+    yield tmp_path
+    image_pool.init_app(app)
+
+
+class TestPointers:
+    def test_write_read_and_remove(self, tmp_path):
+        assert read_pointer(tmp_path, NEXT_POINTER) is None
+        write_pointer(tmp_path, NEXT_POINTER, 'v2')
+        assert read_pointer(tmp_path, NEXT_POINTER) == 'v2'
+        assert [p.name for p in tmp_path.iterdir()] == [NEXT_POINTER]
+        write_pointer(tmp_path, NEXT_POINTER, None)
+        assert read_pointer(tmp_path, NEXT_POINTER) is None
+
+    def test_rejects_unsafe_versions(self, tmp_path):
+        for version in ('../v1', '', 'a/b', 'x' * 33):
+            with pytest.raises(ValueError):
+                write_pointer(tmp_path, CURRENT_POINTER, version)
+
+    def test_current_version_follows_switches(self, tmp_path):
+        pool = ImagePool(str(tmp_path))
+        assert pool.current_version() is None
+        assert pool.version_dir(None) == tmp_path
+        write_pointer(tmp_path, CURRENT_POINTER, 'v1')
+        assert pool.current_version() == 'v1'
+        write_pointer(tmp_path, CURRENT_POINTER, 'v2')
+        assert pool.current_version() == 'v2'
+        assert pool.stats()['switches_seen'] == 1
+
+
+class TestUnversionedPool:
+    def test_reloads_metadata_regenerated_in_place(self, tmp_path):
+        pool = ImagePool(str(tmp_path))
+        metadata = json.loads((STATIC_POOL / 'metadata.json').read_text())
+        (tmp_path / 'metadata.json').write_text(json.dumps(metadata))
+        first = pool.selector(None)
+        assert pool.selector(None) is first
+
+        metadata['images'][0]['correct_answer'] += 1
+        (tmp_path / 'metadata.json').write_text(json.dumps(metadata, indent=1))
+        reloaded = pool.selector(None)
+        assert reloaded is not first
+        assert reloaded.get_image_info(0)['correct_answer'] == metadata['images'][0]['correct_answer']
+
+
+class TestWarming:
+    def test_warms_current_and_staged_versions(self, pool_dir):
+        pool = ImagePool(str(pool_dir))
+        write_pointer(pool_dir, NEXT_POINTER, 'v2')
+        pool.warm_pending()
+        assert pool.is_warm('v1') and pool.is_warm('v2')
+        stats = pool.stats()
+        assert stats['next_warm'] and stats['cached_versions'] == ['v1', 'v2']
+
+    def test_warming_starts_with_the_first_request(self, tmp_path):
+        app = create_app('testing')
+        app.config.update(IMAGE_POOL_DIR=str(tmp_path), IMAGE_POOL_WARM_INTERVAL=60)
+        pool = ImagePool()
+        pool.init_app(app)
+        # Creating the app, as scripts do, does not start it
+        assert pool._thread is None
+        app.test_client().get('/health')
+        assert pool._thread is not None
+        pool.stop()
+
+    def test_corrupt_version_is_not_warm(self, pool_dir):
+        pool = ImagePool(str(pool_dir))
+        image = pool_dir / 'versions' / 'v2' / 'image_000.png'
+        image.unlink()
+        image.write_bytes(b'corrupt')
+        assert pool.warm('v2')['mismatched'] == 1
+        assert not pool.is_warm('v2')
+
+    def test_failed_versions_are_not_rehashed_every_round(self, pool_dir, monkeypatch):
+        pool = ImagePool(str(pool_dir))
+        write_pointer(pool_dir, NEXT_POINTER, 'v2')
+        image = pool_dir / 'versions' / 'v2' / 'image_000.png'
+        image.unlink()
+        image.write_bytes(b'corrupt')
+        pool.warm_pending()
+        assert pool.stats()['failed_versions'] == ['v2']
+
+        checked = []
+        monkeypatch.setattr(pool, 'warm', lambda version: checked.append(version) or {'mismatched': 0})
+        pool.warm_pending()
+        assert checked == []
+
+        # Rebuilding the version rewrites its metadata, which is checked straight away
+        monkeypatch.undo()
+        image.unlink()
+        image.symlink_to(STATIC_POOL / 'image_000.png')
+        metadata = pool.metadata_path('v2')
+        metadata.write_text(metadata.read_text() + '\n')
+        pool.warm_pending()
+        assert pool.is_warm('v2') and pool.stats()['failed_versions'] == []
+
+    def test_failed_versions_are_retried_after_the_backoff(self, pool_dir, monkeypatch):
+        pool = ImagePool(str(pool_dir))
+        write_pointer(pool_dir, NEXT_POINTER, 'v2')
+        (pool_dir / 'versions' / 'v2' / 'image_000.png').unlink()
+        pool.warm_pending()
+        key, failed_at = pool._failed['v2']
+        pool._failed['v2'] = (key, failed_at - WARM_RETRY_SECONDS)
+        checked = []
+        monkeypatch.setattr(pool, 'warm', lambda version: checked.append(version) or {'mismatched': 0})
+        pool.warm_pending()
+        assert checked == ['v2']
+
+
+class TestSessionPinning:
+    def test_sessions_keep_their_version_after_a_switch(self, client, pool_dir):
+        old_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        assert db.session.get(SessionModel, old_id).pool_version == 'v1'
+        before = client.get(f'/api/test/{old_id}/image/1')
+
+        write_pointer(pool_dir, CURRENT_POINTER, 'v2')
+        new_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        assert db.session.get(SessionModel, new_id).pool_version == 'v2'
+
+        # The old session's image IDs still mean what they meant in v1
+        after = client.get(f'/api/test/{old_id}/image/1')
+        assert after.headers['X-Image-ID'] == before.headers['X-Image-ID']
+        assert after.data == before.data
+        v1 = image_pool.selector('v1').get_image_info(int(after.headers['X-Image-ID']))
+        response = client.post(f'/api/test/{old_id}/answer',
+                               json={'image_number': 1, 'user_answer': v1['correct_answer']})
+        assert response.status_code == 201
+        answer = answer_store.load_answers(db.session, old_id)[0]
+        assert answer.correct_answer == answer.user_answer == v1['correct_answer']
+
+    def test_metrics_report_versions(self, client, pool_dir):
+        stats = client.get('/api/metrics').get_json()['image_pool']
+        assert stats['current_version'] == 'v1' and stats['next_version'] is None
+
+
+class TestRolloverScript:
+    def run(self, monkeypatch, *args):
+        monkeypatch.setattr(sys, 'argv', ['rollover_pool.py', *args])
+        rollover_pool.main()
+
+    def test_stage_then_switch_once_workers_are_warm(self, pool_dir, monkeypatch):
+        self.run(monkeypatch, 'v2', '--pool-dir', str(pool_dir), '--stage-only')
+        assert read_pointer(pool_dir, NEXT_POINTER) == 'v2'
+        assert read_pointer(pool_dir, CURRENT_POINTER) == 'v1'
+
+        worker = ImagePool(str(pool_dir))
+        worker.warm_pending()
+        worker.report_warm()
+        assert worker_reports(pool_dir, 60)[0]['warmed'] == ['v1', 'v2']
+        self.run(monkeypatch, 'v2', '--pool-dir', str(pool_dir), '--wait', '0')
+        assert read_pointer(pool_dir, CURRENT_POINTER) == 'v2'
+        assert read_pointer(pool_dir, NEXT_POINTER) is None
+        worker.stop()
+        assert worker_reports(pool_dir, 60) == []
+
+    def test_does_not_switch_before_every_worker_is_warm(self, pool_dir, monkeypatch):
+        with pytest.raises(SystemExit):
+            self.run(monkeypatch, 'v2', '--pool-dir', str(pool_dir), '--wait', '0')
+        ImagePool(str(pool_dir)).report_warm()
+        with pytest.raises(SystemExit):
+            self.run(monkeypatch, 'v2', '--pool-dir', str(pool_dir), '--wait', '0')
+        assert read_pointer(pool_dir, CURRENT_POINTER) == 'v1'
+        assert read_pointer(pool_dir, NEXT_POINTER) == 'v2'
+
+        self.run(monkeypatch, 'v2', '--pool-dir', str(pool_dir), '--wait', '0', '--force')
+        assert read_pointer(pool_dir, CURRENT_POINTER) == 'v2'
+
+    def test_refuses_missing_or_corrupt_versions(self, pool_dir, monkeypatch):
+        with pytest.raises(SystemExit):
+            self.run(monkeypatch, 'v3', '--pool-dir', str(pool_dir))
+        (pool_dir / 'versions' / 'v2' / 'image_005.png').unlink()
+        with pytest.raises(SystemExit):
+            self.run(monkeypatch, 'v2', '--pool-dir', str(pool_dir), '--wait', '0')
+        assert read_pointer(pool_dir, CURRENT_POINTER) == 'v1'
+        assert read_pointer(pool_dir, NEXT_POINTER) is None
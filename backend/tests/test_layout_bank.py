@@ -0,0 +1,123 @@
+import json
+import pytest
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import generate_images
+from models import db
+from models.test_session import TestSession as SessionModel
+from services import layout_bank as layout_bank_module
+from services.image_generator import ImageGenerator
+from services.image_pool import image_pool
+from services.layout_bank import LayoutBank, LayoutBankMissing, bank_for_render, build_bank, layout_bank
+from utils.plate_vector import unpack_layout
+
+
+@pytest.fixture(scope='module')
+def bank_dir(tmp_path_factory):
+    # A sparse bank keeps the build fast; layouts stop at the first long run of misses
+    patch = pytest.MonkeyPatch()
+    patch.setattr(layout_bank_module, 'MAX_CONSECUTIVE_MISSES', 50)
+    path = tmp_path_factory.mktemp('bank')
+    build_bank(str(path), count=4, seed='test')
+    patch.undo()
+    return path
+
+
+@pytest.fixture
+def configured_bank(bank_dir):
+    layout_bank.configure(str(bank_dir))
+    yield layout_bank
+    layout_bank.configure(None)
+
+
+class TestBuildBank:
+    def test_layouts_fit_the_plate_without_overlap(self, bank_dir):
+        manifest = json.loads((bank_dir / 'manifest.json').read_text())
+        assert manifest['layouts'] == 4
+        offsets = np.load(bank_dir / 'offsets.npy')
+        dots = np.load(bank_dir / 'dots.npy', mmap_mode='r')
+        assert offsets[-1] == manifest['total_dots'] == len(dots)
+
+        layout = dots[offsets[0]:offsets[1]].astype(np.int64)
+        x, y, size = layout.T
+        center = ImageGenerator.IMAGE_SIZE // 2
+        # Positions are truncated to whole pixels, so allow one pixel per axis
+        assert np.all((x - center) ** 2 + (y - center) ** 2 <= (center - 8) ** 2)
+        distance_sq = (x[:, None] - x) ** 2 + (y[:, None] - y) ** 2
+        min_distance_sq = ((size[:, None] + size) / 2) ** 2
+        np.fill_diagonal(distance_sq, 10 ** 6)
+        assert np.all(distance_sq >= min_distance_sq)
+
+    def test_same_seed_builds_same_bank(self, bank_dir, tmp_path, monkeypatch):
+        monkeypatch.setattr(layout_bank_module, 'MAX_CONSECUTIVE_MISSES', 50)
+        manifest = build_bank(str(tmp_path), count=4, seed='test')
+        assert manifest['bank_id'] == json.loads((bank_dir / 'manifest.json').read_text())['bank_id']
+
+
+class TestLayoutBank:
+    def test_layout_is_chosen_by_seed(self, bank_dir):
+        bank = LayoutBank(str(bank_dir))
+        assert np.array_equal(bank.layout(1), bank.layout(5))
+        assert not np.array_equal(bank.layout(1), bank.layout(2))
+
+    def test_missing_bank(self, tmp_path):
+        bank = LayoutBank(str(tmp_path))
+        assert bank.bank_id is None
+        with pytest.raises(LayoutBankMissing):
+            bank.layout(1)
+
+    def test_render_jobs_only_use_the_expected_bank(self, bank_dir, configured_bank):
+        assert bank_for_render(configured_bank.bank_id, str(bank_dir)) is configured_bank
+        assert bank_for_render('rebuilt', str(bank_dir)) is None
+        assert bank_for_render(None, None) is None
+
+
+class TestGeneratorWithBank:
+    def test_bank_layout_is_classified_and_colored(self, bank_dir):
+        bank = LayoutBank(str(bank_dir))
+        generator = ImageGenerator('salt', layout_bank=bank)
+        dots = generator.generate_test_layout('session', 1, 'tritanopia', 45)
+        seed = generator._get_seed('session', 1)
+        assert [dot[:3] for dot in dots] == [tuple(row) for row in bank.layout(seed).tolist()]
+
+        mask = generator._create_number_mask(45, ImageGenerator.IMAGE_SIZE)
+        palette = ImageGenerator.COLOR_PALETTES['tritanopia']
+        for x, y, _, color in dots:
+            base = palette['foreground'] if mask[y, x] > 128 else palette['background']
+            assert all(abs(c - b) <= 25 for c, b in zip(color, base))
+        assert generator.generate_test_image('session', 1, 'tritanopia', 45) == \
+            generator.generate_test_image('session', 1, 'tritanopia', 45)
+
+    def test_on_the_fly_sessions_keep_the_bank_they_started_with(self, app, client, configured_bank, tmp_path):
+        # Without a pool, new sessions render on the fly and record the bank
+        image_pool.configure(str(tmp_path), 0, 1)
+        try:
+            session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        finally:
+            image_pool.init_app(app)
+        assert db.session.get(SessionModel, session_id).layout_bank == configured_bank.bank_id
+        legacy = SessionModel()
+        db.session.add(legacy)
+        db.session.commit()
+
+        salt = app.config['RANDOM_SEED_SALT']
+        layout = unpack_layout(client.get(f'/api/test/{session_id}/image/3?format=layout').data)
+        expected = configured_bank.layout(ImageGenerator(salt)._get_seed(session_id, 3))
+        assert np.array_equal(layout['x'], expected[:, 0]) and np.array_equal(layout['y'], expected[:, 1])
+
+        # A session from before the bank keeps live placement, like its backfilled plates
+        layout = unpack_layout(client.get(f'/api/test/{legacy.id}/image/3?format=layout').data)
+        live = ImageGenerator(salt).generate_test_layout(legacy.id, 3, 'protanopia', 12)
+        assert [(x, y) for x, y, _, _ in live] == list(zip(layout['x'].tolist(), layout['y'].tolist()))
+
+    def test_pool_build_records_bank(self, bank_dir, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys, 'argv', ['generate_images.py', '--output-dir', str(tmp_path),
+                                          '--count', '2', '--seed', 's', '--layout-bank', str(bank_dir)])
+        generate_images.main()
+        metadata = json.loads((tmp_path / 'metadata.json').read_text())
+        assert metadata['layout_bank'] == LayoutBank(str(bank_dir)).bank_id
@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import db
+from models.legacy_plate import LegacyPlate
+from models.test_session import TestSession as SessionModel
+from services.image_generator import ImageGenerator
+from services.legacy_backfill import backfill, legacy_sessions_query
+from services.render_pool import render_pool
+
+
+def legacy_session(client, **fields):
+    """A session as created before the pool existed: no image mapping."""
+    session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+    session = db.session.get(SessionModel, session_id)
+    session.image_mapping = None
+    for name, value in fields.items():
+        setattr(session, name, value)
+    db.session.commit()
+    return session_id
+
+
+@pytest.fixture
+def plate_dir(app, tmp_path, monkeypatch):
+    app.config['LEGACY_PLATE_DIR'] = str(tmp_path)
+    # A real plate takes seconds to render; stand in a cheap deterministic one
+    monkeypatch.setattr(
+        ImageGenerator, 'generate_test_image',
+        lambda self, session_id, image_number, dichromism_type=None, correct_answer=None:
+            f'{session_id}-{image_number}-{dichromism_type}-{correct_answer}'.encode()
+    )
+    return tmp_path
+
+
+class TestLegacyBackfill:
+    def test_backfilled_session_never_renders(self, app, client, plate_dir, monkeypatch):
+        session_id = legacy_session(client)
+        live = client.get(f'/api/test/{session_id}/image/3').data
+
+        result = backfill(str(plate_dir), app.config['RANDOM_SEED_SALT'], batch_size=1)
+        assert result == {'sessions': 1, 'plates': 10}
+
+        def no_render(*args, **kwargs):
+            raise AssertionError('live render after backfill')
+        monkeypatch.setattr(render_pool, 'run', no_render)
+        monkeypatch.setattr(ImageGenerator, 'get_test_config', no_render)
+
+        response = client.get(f'/api/test/{session_id}/image/3')
+        assert response.status_code == 200
+        assert response.data == live
+        assert response.headers['ETag']
+
+        for image_number in range(1, 11):
+            response = client.post(f'/api/test/{session_id}/answer',
+                                   json={'image_number': image_number, 'user_answer': 42})
+            assert response.status_code == 201
+
+    def test_correct_answers_are_unchanged(self, app, client, plate_dir):
+        session_id = legacy_session(client)
+        backfill(str(plate_dir), app.config['RANDOM_SEED_SALT'])
+
+        generator = ImageGenerator(app.config['RANDOM_SEED_SALT'])
+        for plate in LegacyPlate.query.filter_by(session_id=session_id):
+            config = generator.get_test_config(session_id, plate.image_number)
+            assert plate.correct_answer == config['correct_answer']
+            assert plate.dichromism_type == config['dichromism_type']
+            assert (plate_dir / plate.filename).stat().st_size == plate.file_size
+
+    def test_only_pending_legacy_sessions_are_backfilled(self, app, client, plate_dir):
+        pooled_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        expired_id = legacy_session(client, created_at=datetime.utcnow() - timedelta(hours=48))
+        legacy_ids = {legacy_session(client) for _ in range(3)}
+
+        pending = {s.id for s in legacy_sessions_query(expiry_hours=24)}
+        assert pending == legacy_ids
+        assert pooled_id not in pending and expired_id not in pending
+
+        progress = []
+        backfill(str(plate_dir), app.config['RANDOM_SEED_SALT'], batch_size=2, expiry_hours=24,
+                 progress=lambda sessions, plates: progress.append(sessions))
+        assert progress == [2, 3]
+        assert legacy_sessions_query(expiry_hours=24).count() == 0
+        # A second run has nothing left to do, unless expired sessions are included
+        assert backfill(str(plate_dir), app.config['RANDOM_SEED_SALT'], expiry_hours=24)['sessions'] == 0
+        assert backfill(str(plate_dir), app.config['RANDOM_SEED_SALT'])['sessions'] == 1
+
+    def test_missing_plate_file_falls_back_to_live_render(self, app, client, plate_dir):
+        session_id = legacy_session(client)
+        backfill(str(plate_dir), app.config['RANDOM_SEED_SALT'])
+        plate = db.session.get(LegacyPlate, (session_id, 1))
+        (plate_dir / plate.filename).unlink()
+
+        response = client.get(f'/api/test/{session_id}/image/1')
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert response.data.startswith(f'{session_id}-1-'.encode())
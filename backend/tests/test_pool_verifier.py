@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import verify_pool as verify_pool_script
+from services.image_pool import CURRENT_POINTER, write_pointer
+from services.pool_verifier import verify_pool, hash_file, PoolVerifier
+
+
+@pytest.fixture
+def pool(tmp_path):
+    images = []
+    for i in range(10):
+        data = f'image-{i}'.encode() * 100
+        filename = f'image_{i:03d}.png'
+        (tmp_path / filename).write_bytes(data)
+        images.append({
+            'id': i,
+            'filename': filename,
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'file_size': len(data)
+        })
+    metadata_path = tmp_path / 'metadata.json'
+    metadata_path.write_text(json.dumps({'version': '1.0', 'images': images}))
+    return metadata_path
+
+
+class TestPoolVerifier:
+    def test_intact_pool_passes(self, pool):
+        report = verify_pool(str(pool))
+        assert report['checked'] == 10
+        assert report['mismatched'] == 0
+
+    def test_reports_missing_truncated_and_corrupted(self, pool):
+        (pool.parent / 'image_001.png').unlink()
+        data = (pool.parent / 'image_002.png').read_bytes()
+        (pool.parent / 'image_002.png').write_bytes(data[:10])
+        (pool.parent / 'image_003.png').write_bytes(b'X' + data[1:])
+
+        report = verify_pool(str(pool), workers=3)
+        reasons = {m['id']: m['reason'] for m in report['mismatches']}
+        assert reasons == {1: 'missing', 2: 'size', 3: 'sha256'}
+
+    def test_subset_and_empty_file(self, pool, tmp_path):
+        assert verify_pool(str(pool), image_ids=[0, 5])['checked'] == 2
+        empty = tmp_path / 'empty'
+        empty.write_bytes(b'')
+        assert hash_file(empty) == hashlib.sha256(b'').hexdigest()
+
+    def test_sampled_runs_rotate_through_pool(self, pool):
+        verifier = PoolVerifier()
+        verifier.metadata_path = str(pool)
+        verifier.sample_fraction = 0.3
+        verifier.logger = logging.getLogger(__name__)
+
+        (pool.parent / 'image_004.png').write_bytes(b'corrupt')
+        seen = []
+        for _ in range(4):
+            seen.extend(m['id'] for m in verifier.run_sample()['mismatches'])
+        assert seen == [4]
+        assert verifier.stats()['checked'] == 12
+        assert verifier.stats()['mismatched_ids'] == [4]
+
+    def test_metrics_include_pool_integrity(self, client):
+        metrics = client.get('/api/metrics').get_json()
+        assert 'mismatched_ids' in metrics['pool_integrity']
+
+    def test_script_verifies_current_version_of_pool_dir(self, tmp_path, monkeypatch, capsys):
+        version_dir = tmp_path / 'pool' / 'versions' / 'v1'
+        version_dir.mkdir(parents=True)
+        data = b'image-0'
+        (version_dir / 'image_000.png').write_bytes(data)
+        (version_dir / 'metadata.json').write_text(json.dumps({'version': '1.0', 'images': [{
+            'id': 0, 'filename': 'image_000.png', 'sha256': hashlib.sha256(data).hexdigest(), 'file_size': len(data)
+        }]}))
+        write_pointer(tmp_path / 'pool', CURRENT_POINTER, 'v1')
+
+        monkeypatch.setattr(sys, 'argv', ['verify_pool.py', '--pool-dir', str(tmp_path / 'pool')])
+        verify_pool_script.main()
+        assert str(version_dir) in capsys.readouterr().out
+
+        (version_dir / 'image_000.png').write_bytes(b'corrupt')
+        with pytest.raises(SystemExit):
+            verify_pool_script.main()
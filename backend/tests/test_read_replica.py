@@ -0,0 +1,123 @@
+import sqlite3
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestingConfig
+from models import db
+from models.answer import Answer
+from services.read_replica import read_router
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """App with a primary and a replica SQLite file; replicate() copies primary to replica."""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{primary}')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {'read_replica': f'sqlite:///{replica}'})
+    monkeypatch.setattr(TestingConfig, 'READ_YOUR_WRITES_SECONDS', 30)
+    app = create_app('testing')
+
+    def replicate():
+        with sqlite3.connect(primary) as src, sqlite3.connect(replica) as dst:
+            src.backup(dst)
+
+    with app.app_context():
+        db.create_all()
+        read_router._recent.clear()
+        read_router._reset_stats()
+        yield app, replicate
+        db.session.remove()
+        db.engines['read_replica'].dispose()
+        db.engine.dispose()
+    # db is shared by every test app; forget the bind so create_all() elsewhere skips it
+    db.metadatas.pop('read_replica', None)
+
+
+def complete_test(client):
+    session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+    for i in range(1, 11):
+        client.post(f'/api/test/{session_id}/answer', json={'image_number': i, 'user_answer': 42})
+    return session_id
+
+
+class TestReadReplica:
+    def test_without_replica_reads_use_primary(self, client):
+        session_id = complete_test(client)
+        assert client.get(f'/api/test/{session_id}/results').status_code == 200
+        assert not read_router.configured
+
+    def test_just_completed_session_reads_primary(self, replica_app):
+        app, _ = replica_app
+        client = app.test_client()
+        session_id = complete_test(client)
+
+        # The replica has not caught up at all, but the session is pinned
+        response = client.get(f'/api/test/{session_id}/results')
+        assert response.status_code == 200
+        stats = read_router.stats()
+        assert stats['replica_reads'] == 0 and stats['fallbacks'] == 0
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_app):
+        app, replicate = replica_app
+        client = app.test_client()
+        session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        for i in range(1, 10):
+            client.post(f'/api/test/{session_id}/answer', json={'image_number': i, 'user_answer': 42})
+        replicate()
+        client.post(f'/api/test/{session_id}/answer', json={'image_number': 10, 'user_answer': 42})
+        read_router._recent.clear()  # as if another worker took the write
+
+        response = client.get(f'/api/test/{session_id}/results')
+        assert response.status_code == 200
+        assert len(response.get_json()['answers']) == 10
+        assert read_router.stats()['fallbacks'] == 1
+
+    def test_replicated_session_reads_replica(self, replica_app):
+        app, replicate = replica_app
+        client = app.test_client()
+        session_id = complete_test(client)
+        replicate()
+        read_router._recent.clear()
+
+        # Change the primary only; results must show the replica's copy
+        Answer.query.filter_by(session_id=session_id, image_number=1).update({'user_answer': 7})
+        db.session.commit()
+
+        data = client.get(f'/api/test/{session_id}/results').get_json()
+        assert data['answers'][0]['user_answer'] == 42
+        assert read_router.stats()['replica_reads'] == 1
+
+    def test_idle_incomplete_session_reads_replica_once(self, replica_app, monkeypatch):
+        app, replicate = replica_app
+        client = app.test_client()
+        session_id = client.post('/api/test/start', json={}).get_json()['session_id']
+        client.post(f'/api/test/{session_id}/answer', json={'image_number': 1, 'user_answer': 42})
+        replicate()
+
+        # Written just now, so the replica copy may be behind another worker's write
+        response = client.get(f'/api/test/{session_id}/results')
+        assert response.status_code == 409
+        assert read_router.stats()['fallbacks'] == 1
+
+        # Once the session has been idle for the window, its incomplete copy is trusted
+        monkeypatch.setattr(read_router, 'window', 0)
+        read_router._reset_stats()
+        response = client.get(f'/api/test/{session_id}/results')
+        assert response.status_code == 409
+        stats = read_router.stats()
+        assert stats['replica_reads'] == 1 and stats['primary_reads'] == 0 and stats['fallbacks'] == 0
+
+    def test_missing_session_is_checked_on_primary(self, replica_app):
+        app, _ = replica_app
+        response = app.test_client().get('/api/test/no-such-session/results')
+        assert response.status_code == 404
+        assert read_router.stats()['fallbacks'] == 1
+
+    def test_metrics_report_replica(self, replica_app):
+        app, _ = replica_app
+        data = app.test_client().get('/api/metrics').get_json()
+        assert data['read_replica']['configured'] is True
@@ -0,0 +1,85 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.render_cache import RenderCache
+from services.slider_image_generator import SliderImageGenerator
+
+
+class TestRenderCache:
+    def test_get_and_put(self):
+        cache = RenderCache(max_bytes=100)
+        assert cache.get('a') is None
+        cache.put('a', b'12345')
+        assert cache.get('a') == b'12345'
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['bytes'] == 5
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        cache.get('a')
+        cache.put('c', b'1234')
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.stats()['evictions'] == 1
+
+    def test_oversized_value_not_cached(self):
+        cache = RenderCache(max_bytes=4)
+        cache.put('a', b'12345')
+        assert 'a' not in cache
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = RenderCache(max_bytes=0)
+        cache.put('a', b'1')
+        assert 'a' not in cache
+
+
+class TestSliderCacheKey:
+    def test_unseeded_requests_have_no_key(self):
+        assert SliderImageGenerator.cache_key({'fg_rgb': [1, 2, 3]}) is None
+
+    def test_defaults_and_explicit_values_share_a_key(self):
+        implicit = SliderImageGenerator.cache_key({'seed': 5})
+        explicit = SliderImageGenerator.cache_key({
+            **SliderImageGenerator.DEFAULT_PARAMS,
+            'circle_mean_size': 20.0,
+            'seed': 5,
+            'quality': 'full',
+            'preview_size': 150
+        })
+        assert implicit == explicit
+
+    def test_dichromat_type_ignored_without_simulation(self):
+        a = SliderImageGenerator.cache_key({'seed': 5, 'dichromat_type': 'protanopia'})
+        b = SliderImageGenerator.cache_key({'seed': 5, 'dichromat_type': 'tritanopia'})
+        c = SliderImageGenerator.cache_key({'seed': 5, 'dichromat_type': 'tritanopia', 'simulate_dichromat': True})
+        assert a == b
+        assert a != c
+
+
+class TestSliderCacheRoutes:
+    def test_repeated_seeded_render_hits_cache(self, client):
+        first = client.post('/api/slider/generate', json={'seed': 42})
+        second = client.post('/api/slider/generate', json={'seed': 42})
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert first.get_json() == second.get_json()
+
+        metrics = client.get('/api/metrics').get_json()
+        assert metrics['slider_cache']['hits'] >= 1
+
+    def test_unseeded_render_bypasses_cache(self, client):
+        client.post('/api/slider/generate', json={'pattern_density': 0.25})
+        response = client.post('/api/slider/generate', json={'pattern_density': 0.25})
+        assert response.headers['X-Cache'] == 'MISS'
+
+    def test_non_integer_seed_rejected(self, client):
+        response = client.post('/api/slider/generate', json={'seed': [1]})
+        assert response.status_code == 400
@@ -0,0 +1,72 @@
+import threading
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.render_pool import RenderPool, RenderPoolSaturated, render_pool
+
+
+def hold_slot(pool, started, release):
+    def blocker():
+        started.set()
+        release.wait(5)
+        return 'done'
+    thread = threading.Thread(target=pool.run, args=(blocker,))
+    thread.start()
+    started.wait(5)
+    return thread
+
+
+class TestRenderPool:
+    def test_inline_run_returns_result(self):
+        pool = RenderPool(workers=0)
+        assert pool.run(pow, 2, 10) == 1024
+        stats = pool.stats()
+        assert stats['submitted'] == 1
+        assert stats['completed'] == 1
+        assert stats['in_flight'] == 0
+
+    def test_process_pool_run_returns_result(self):
+        pool = RenderPool(workers=1)
+        try:
+            assert pool.run(pow, 3, 4) == 81
+            assert pool.stats()['completed'] == 1
+        finally:
+            pool.shutdown()
+
+    def test_saturated_pool_rejects(self):
+        pool = RenderPool(workers=0, max_queue=0, retry_after=7)
+        started, release = threading.Event(), threading.Event()
+        thread = hold_slot(pool, started, release)
+        try:
+            with pytest.raises(RenderPoolSaturated) as exc_info:
+                pool.run(pow, 2, 2)
+            assert exc_info.value.retry_after == 7
+            assert pool.stats()['rejected'] == 1
+        finally:
+            release.set()
+            thread.join()
+        assert pool.run(pow, 2, 2) == 4
+
+
+class TestRenderPoolRoutes:
+    def test_slider_generate_returns_503_when_saturated(self, client):
+        render_pool.configure(workers=0, max_queue=0, timeout=30, retry_after=3)
+        started, release = threading.Event(), threading.Event()
+        thread = hold_slot(render_pool, started, release)
+        try:
+            response = client.post('/api/slider/generate', json={'seed': 1})
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '3'
+        finally:
+            release.set()
+            thread.join()
+
+    def test_metrics_report_render_pool(self, client):
+        response = client.get('/api/metrics')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'queue_depth' in data['render_pool']
+        assert 'wait_ms_avg' in data['render_pool']
@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestingConfig
+from models import db
+from models.test_session import TestSession as SessionModel
+from services.session_token import InvalidSessionToken, fits_token, issue_token, verify_token
+
+MAPPING = {str(number): number * 9 for number in range(1, 11)}
+
+
+class TestTokens:
+    def test_round_trip(self):
+        session_id = str(uuid.uuid4())
+        created_at = datetime(2024, 5, 1, 12, 30)
+        token = issue_token('key', session_id, created_at, '2024-06', MAPPING)
+        assert len(token) < 100
+
+        claims = verify_token('key', token)
+        assert claims.session_id == session_id
+        assert claims.created_at == created_at.replace(tzinfo=timezone.utc)
+        assert claims.pool_version == '2024-06'
+        assert claims.image_mapping == MAPPING
+        assert verify_token('key', issue_token('key', session_id, created_at, None, MAPPING)).pool_version is None
+
+    def test_rejects_forged_tokens(self):
+        token = issue_token('key', str(uuid.uuid4()), datetime.now(timezone.utc), None, MAPPING)
+        tampered = token[:10] + ('A' if token[10] != 'A' else 'B') + token[11:]
+        for bad in (tampered, token[:-4], 'not a token!', ''):
+            with pytest.raises(InvalidSessionToken):
+                verify_token('key', bad)
+        with pytest.raises(InvalidSessionToken):
+            verify_token('other-key', token)
+
+    def test_image_ids_must_fit_two_bytes(self):
+        large = {**MAPPING, '10': 70000}
+        assert fits_token(MAPPING) and not fits_token(large)
+        with pytest.raises(ValueError):
+            issue_token('key', str(uuid.uuid4()), datetime.now(timezone.utc), None, large)
+
+
+@pytest.fixture
+def tokens_enabled(app):
+    app.config.update(SESSION_TOKENS_ENABLED=True, SECRET_KEY='test-secret-key')
+
+
+def start(client):
+    data = client.post('/api/test/start', json={}).get_json()
+    return data['session_id'], data.get('session_token')
+
+
+class TestTokenEndpoints:
+    def test_disabled_by_default(self, client):
+        session_id, token = start(client)
+        assert token is None
+        forged = issue_token('key', session_id, datetime.now(timezone.utc), None, MAPPING)
+        # Without token mode a token is ignored and the session is read as before
+        response = client.get(f'/api/test/{session_id}/image/1?token={forged}')
+        assert response.status_code == 200
+
+    def test_not_enabled_with_the_default_secret_key(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'SESSION_TOKENS_ENABLED', True)
+        assert not create_app('testing').config['SESSION_TOKENS_ENABLED']
+        monkeypatch.setattr(TestingConfig, 'SECRET_KEY', 'test-secret-key')
+        assert create_app('testing').config['SESSION_TOKENS_ENABLED']
+
+    def test_images_are_served_from_the_token_alone(self, client, tokens_enabled):
+        session_id, token = start(client)
+        with_db = client.get(f'/api/test/{session_id}/image/4')
+
+        db.session.delete(db.session.get(SessionModel, session_id))
+        db.session.commit()
+        assert client.get(f'/api/test/{session_id}/image/4').status_code == 404
+        response = client.get(f'/api/test/{session_id}/image/4?token={token}')
+        assert response.status_code == 200
+        assert response.data == with_db.data
+        assert response.headers['X-Image-ID'] == with_db.headers['X-Image-ID']
+        header = client.get(f'/api/test/{session_id}/image/4', headers={'X-Session-Token': token})
+        assert header.status_code == 200
+
+    def test_rejects_foreign_forged_and_expired_tokens(self, app, client, tokens_enabled):
+        session_id, token = start(client)
+        other_id, _ = start(client)
+        response = client.get(f'/api/test/{other_id}/image/1?token={token}')
+        assert response.status_code == 401
+        assert response.get_json()['error']['code'] == 'INVALID_SESSION_TOKEN'
+
+        forged = issue_token('wrong-key', session_id, datetime.now(timezone.utc), None, MAPPING)
+        assert client.get(f'/api/test/{session_id}/image/1?token={forged}').status_code == 401
+
+        app.config['SESSION_EXPIRY_HOURS'] = 0
+        response = client.get(f'/api/test/{session_id}/image/1?token={token}')
+        assert response.status_code == 410
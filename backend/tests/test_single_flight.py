@@ -0,0 +1,154 @@
+import threading
+import time
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.single_flight import SingleFlight, single_flight
+from services.render_pool import render_pool
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results, errors
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def render():
+            calls.append(1)
+            release.wait(5)
+            return b'plate'
+
+        threading.Timer(0.2, release.set).start()
+        results, errors = run_concurrently(5, lambda: flight.do('key', render))
+
+        assert calls == [1]
+        assert errors == [None] * 5
+        assert [r[0] for r in results] == [b'plate'] * 5
+        assert sorted(r[1] for r in results) == [False] + [True] * 4
+        stats = flight.stats()
+        assert stats['renders'] == 1
+        assert stats['coalesced'] == 4
+        assert stats['in_flight'] == 0
+
+    def test_sequential_and_distinct_keys_run_separately(self):
+        flight = SingleFlight()
+        assert flight.do('a', lambda: 1) == (1, False)
+        assert flight.do('a', lambda: 2) == (2, False)
+        assert flight.do('b', lambda: 3) == (3, False)
+        assert flight.stats()['coalesced'] == 0
+
+    def test_leader_error_is_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def render():
+            release.wait(5)
+            raise RuntimeError('render failed')
+
+        threading.Timer(0.2, release.set).start()
+        _, errors = run_concurrently(3, lambda: flight.do('key', render))
+        assert all(isinstance(e, RuntimeError) for e in errors)
+        # A failed key is not remembered
+        assert flight.do('key', lambda: 'ok') == ('ok', False)
+
+    def test_unshared_leader_error_makes_waiters_run_again(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def render():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                raise LookupError('leader shed')
+            time.sleep(0.2)
+            return b'plate'
+
+        threading.Timer(0.2, release.set).start()
+        results, errors = run_concurrently(3, lambda: flight.do('key', render, unshared_errors=(LookupError,)))
+        # Only the leader gets its own error; the waiters coalesce on a new leader
+        assert sum(isinstance(e, LookupError) for e in errors) == 1
+        assert sorted(r for r in results if r is not None) == [(b'plate', False), (b'plate', True)]
+        assert len(calls) == 2
+
+    def test_disabled_runs_every_call(self):
+        flight = SingleFlight()
+        flight.configure(False, None, 10, 30)
+        calls = []
+        run_concurrently(3, lambda: flight.do('key', lambda: calls.append(1)))
+        assert len(calls) == 3
+
+    def test_lock_dir_shares_results_between_processes(self, tmp_path):
+        # Two instances stand in for two worker processes: flock locks are
+        # per open file, so they exclude each other within one process too
+        first, second = SingleFlight(), SingleFlight()
+        first.configure(True, str(tmp_path), 10, 30)
+        second.configure(True, str(tmp_path), 10, 30)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_render():
+            started.set()
+            release.wait(5)
+            return {'image_bytes': b'plate'}
+
+        leader = threading.Thread(target=lambda: first.do(('slider', 1), slow_render))
+        leader.start()
+        started.wait(5)
+        threading.Timer(0.2, release.set).start()
+
+        result, shared = second.do(('slider', 1), lambda: pytest.fail('second process rendered'))
+        leader.join(5)
+        assert result == {'image_bytes': b'plate'}
+        assert shared is True
+        assert second.stats()['coalesced_cross_process'] == 1
+        assert first.stats()['renders'] == 1
+
+    def test_expired_results_are_not_shared(self, tmp_path):
+        flight = SingleFlight()
+        flight.configure(True, str(tmp_path), 0.05, 30)
+        flight.do('key', lambda: 'old')
+        time.sleep(0.1)
+        assert flight.do('key', lambda: 'new') == ('new', False)
+
+
+class TestSingleFlightEndpoints:
+    def test_concurrent_seeded_slider_renders_coalesce(self, app, monkeypatch):
+        renders = []
+        original_run = render_pool.run
+
+        def slow_run(fn, *args, **kwargs):
+            renders.append(fn.__name__)
+            time.sleep(0.3)
+            return original_run(fn, *args, **kwargs)
+
+        monkeypatch.setattr(render_pool, 'run', slow_run)
+        # All four miss the render cache, since none has finished rendering
+        body = {'seed': 11, 'quality': 'preview', 'preview_size': 125, 'format': 'png'}
+
+        responses, errors = run_concurrently(4, lambda: app.test_client().post('/api/slider/generate', json=body))
+        assert errors == [None] * 4
+        assert all(r.status_code == 200 for r in responses)
+        assert len({r.data for r in responses}) == 1
+        assert renders == ['render_slider_image']
+        assert single_flight.stats()['coalesced'] == 3
@@ -0,0 +1,122 @@
+import base64
+import io
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.slider_image_generator import SliderImageGenerator, layout_cache
+from utils.plate_vector import unpack_layout
+from PIL import Image, ImageDraw
+
+
+def decode(result):
+    return Image.open(io.BytesIO(base64.b64decode(result['image_base64'])))
+
+
+class TestSliderImageGenerator:
+    @pytest.fixture
+    def generator(self):
+        return SliderImageGenerator()
+
+    def test_full_render_size(self, generator):
+        result = generator.generate([150, 120, 140], [145, 145, 145], seed=1)
+        assert decode(result).size == (500, 500)
+
+    def test_same_seed_produces_same_image(self, generator):
+        image1 = generator.generate([150, 120, 140], [145, 145, 145], seed=1)
+        image2 = generator.generate([150, 120, 140], [145, 145, 145], seed=1)
+        assert image1['image_base64'] == image2['image_base64']
+
+    def test_preview_render_size(self, generator):
+        result = generator.generate([150, 120, 140], [145, 145, 145], seed=1, quality='preview')
+        assert decode(result).size == (200, 200)
+
+        result = generator.generate([150, 120, 140], [145, 145, 145], seed=1, quality='preview', preview_size=125)
+        assert decode(result).size == (125, 125)
+
+    def test_preview_matches_downscaled_full_render(self, generator):
+        params = dict(fg_rgb=[200, 60, 60], bg_rgb=[60, 60, 200], noise_variance=0.0, seed=3)
+        full = decode(generator.generate(**params)).convert('RGB').resize((250, 250), Image.NEAREST)
+        preview = decode(generator.generate(quality='preview', preview_size=250, **params)).convert('RGB')
+
+        # Same layout at half resolution: nearly every pixel has the same colour
+        same = sum(a == b for a, b in zip(full.getdata(), preview.getdata()))
+        assert same / (250 * 250) > 0.9
+
+    def test_invalid_quality_raises(self, generator):
+        with pytest.raises(ValueError):
+            generator.generate([150, 120, 140], [145, 145, 145], quality='draft')
+
+    def test_color_change_reuses_cached_layout(self, generator, monkeypatch):
+        generator.generate([150, 120, 140], [145, 145, 145], seed=9)
+
+        def fail(*args, **kwargs):
+            raise AssertionError('layout should come from the cache')
+        monkeypatch.setattr(generator, '_place_dots', fail)
+
+        recolored = generator.generate([90, 200, 40], [145, 145, 145], seed=9, noise_variance=0.2)
+        assert recolored['image_base64']
+
+    def test_cached_layout_matches_fresh_render(self, generator):
+        params = dict(fg_rgb=[150, 120, 140], bg_rgb=[145, 145, 145], seed=10, noise_offset=0.05)
+        # Reconfiguring empties the cache and resets its counters
+        layout_cache.configure(layout_cache.max_bytes)
+        fresh = generator.generate(**params)
+        assert layout_cache.stats()['hits'] == 0
+        cached = generator.generate(**params)
+        assert layout_cache.stats()['hits'] > 0
+
+        layout_cache.configure(layout_cache.max_bytes)
+        refreshed = generator.generate(**params)
+        assert fresh['image_base64'] == cached['image_base64'] == refreshed['image_base64']
+
+    def test_geometry_change_places_new_layout(self, generator):
+        image1 = generator.generate([150, 120, 140], [145, 145, 145], seed=9)
+        image2 = generator.generate([150, 120, 140], [145, 145, 145], seed=9, circle_mean_size=12)
+        assert image1['image_base64'] != image2['image_base64']
+
+    def test_comparison_panels_match_single_renders(self, generator):
+        params = dict(fg_rgb=[180, 100, 140], bg_rgb=[145, 145, 145], seed=12)
+        comparison = generator.render_comparison(dichromat_types=('protanopia', 'tritanopia'), **params)
+        assert comparison['panels'] == ['original', 'protanopia', 'tritanopia']
+
+        assert comparison['images']['original'] == generator.render(**params)['image_bytes']
+        for dichromat_type in ('protanopia', 'tritanopia'):
+            single = generator.render(simulate_dichromat=True, dichromat_type=dichromat_type, **params)
+            assert comparison['images'][dichromat_type] == single['image_bytes']
+
+    def test_comparison_contact_sheet(self, generator):
+        result = generator.render_comparison([180, 100, 140], [145, 145, 145], seed=12, contact_sheet=True)
+        sheet = Image.open(io.BytesIO(result['image_bytes']))
+        assert sheet.height == 500
+        assert sheet.width > 4 * 500
+
+    def test_vector_layout_rasterizes_to_same_image(self, generator):
+        params = dict(fg_rgb=[200, 60, 60], bg_rgb=[60, 60, 200], seed=5)
+        raster = Image.open(io.BytesIO(generator.render(**params)['image_bytes'])).convert('RGB')
+        layout = unpack_layout(generator.render(image_format='layout', **params)['image_bytes'])
+        assert layout['size'] == 500
+
+        img = Image.new('RGB', (500, 500), (255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        for x, y, r, color in zip(layout['x'], layout['y'], layout['r'], layout['colors'].tolist()):
+            draw.ellipse([x - r, y - r, x + r, y + r], fill=tuple(color))
+        mask = Image.new('L', (500, 500), 0)
+        m = layout['margin']
+        ImageDraw.Draw(mask).ellipse([m, m, 500 - m, 500 - m], fill=255)
+        redrawn = Image.new('RGB', (500, 500), (255, 255, 255))
+        redrawn.paste(img, mask=mask)
+
+        same = sum(a == b for a, b in zip(raster.getdata(), redrawn.getdata()))
+        assert same / (500 * 500) > 0.99
+
+    def test_vector_svg(self, generator):
+        result = generator.render([150, 120, 140], [145, 145, 145], seed=1, image_format='svg',
+                                  simulate_dichromat=True)
+        assert result['mimetype'] == 'image/svg+xml'
+        svg = result['image_bytes'].decode()
+        assert svg.startswith('<svg')
+        layout = unpack_layout(generator.render([150, 120, 140], [145, 145, 145], seed=1, image_format='layout')['image_bytes'])
+        assert svg.count('<circle') == len(layout['x']) + 1
@@ -0,0 +1,64 @@
+import subprocess
+import threading
+import pytest
+import sys
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as app_module
+import services
+import utils
+from config import TestingConfig
+from models import db
+
+
+class TestStartup:
+    def test_create_app_defers_heavy_imports(self):
+        code = (
+            "import sys\n"
+            "from app import create_app\n"
+            "create_app('testing')\n"
+            "print(sorted(m for m in ('numpy', 'PIL', 'services.slider_image_generator',"
+            " 'services.image_generator') if m in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == '[]'
+
+    def test_lazy_package_exports(self):
+        assert services.ImageSelector.__name__ == 'ImageSelector'
+        assert utils.calculate_luminance(255, 255, 255) == pytest.approx(1.0)
+        with pytest.raises(AttributeError):
+            services.NoSuchService
+
+    def test_slider_prewarm_starts_with_the_first_request(self, monkeypatch):
+        started = threading.Event()
+        monkeypatch.setattr(app_module, '_prewarm_slider_cache', started.set)
+        monkeypatch.setattr(TestingConfig, 'SLIDER_CACHE_PREWARM', True)
+        app = app_module.create_app('testing')
+        # Creating the app, as scripts do, does not start it
+        assert not started.wait(0.2)
+        app.test_client().get('/health')
+        assert started.wait(5)
+
+    def test_schema_not_created_without_flag(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path}/fresh.db')
+        monkeypatch.setattr(TestingConfig, 'AUTO_CREATE_SCHEMA', False)
+        app = app_module.create_app('testing')
+        with app.app_context():
+            try:
+                assert db.inspect(db.engine).get_table_names() == []
+                result = app.test_cli_runner().invoke(args=['init-db'])
+                assert result.exit_code == 0
+                assert 'test_session' in db.inspect(db.engine).get_table_names()
+            finally:
+                db.engine.dispose()
+
+    def test_init_db_command(self, app, runner):
+        db.drop_all()
+        result = runner.invoke(args=['init-db'])
+        assert result.exit_code == 0
+        assert 'Database schema ready' in result.output
+        assert 'test_session' in db.inspect(db.engine).get_table_names()
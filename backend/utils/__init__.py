@@ -1,9 +1,25 @@
-# Utility functions
-from .luminance import (
-    srgb_to_linear,
-    linear_to_srgb,
-    calculate_luminance,
-    solve_g_for_luminance,
-    match_luminance
-)
-from .dichromat_sim import simulate_dichromat, simulate_image
+# Utility functions, imported on first attribute access; the luminance and
+# simulation modules build numpy lookup tables at import time
+_EXPORTS = {
+    'srgb_to_linear': 'utils.luminance',
+    'linear_to_srgb': 'utils.luminance',
+    'calculate_luminance': 'utils.luminance',
+    'solve_g_for_luminance': 'utils.luminance',
+    'match_luminance': 'utils.luminance',
+    'calculate_luminance_batch': 'utils.luminance',
+    'solve_g_for_luminance_batch': 'utils.luminance',
+    'match_luminance_batch': 'utils.luminance',
+    'simulate_dichromat': 'utils.dichromat_sim',
+    'simulate_image': 'utils.dichromat_sim',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -23,6 +23,37 @@ TRITANOPIA_MATRIX = np.array([
 ])
 
 
+# Lookup tables shared by the scalar and image simulations. sRGB values are
+# 8-bit, so linearization is an exact 256-entry table. The linear->sRGB
+# direction quantizes linear light to LINEAR_LUT_SIZE steps; near black the
+# sRGB curve rises ~13x faster than linear, and at this resolution the output
+# stays within one level of the exact formula.
+LINEAR_LUT_SIZE = 16384
+
+SRGB_TO_LINEAR_LUT = np.array(
+    [srgb_to_linear(v / 255.0) for v in range(256)],
+    dtype=np.float32
+)
+
+LINEAR_TO_SRGB_LUT = np.array(
+    [round(linear_to_srgb(i / (LINEAR_LUT_SIZE - 1)) * 255) for i in range(LINEAR_LUT_SIZE)],
+    dtype=np.uint8
+)
+
+# Pixels processed per chunk; bounds the float32 working set to ~1.5 MB
+# regardless of image size
+CHUNK_PIXELS = 1 << 16
+
+
+def get_transform(dichromat_type: str) -> np.ndarray:
+    """Return the Machado matrix for a dichromat type (deuteranopia by default)."""
+    if dichromat_type == 'protanopia':
+        return PROTANOPIA_MATRIX
+    elif dichromat_type == 'tritanopia':
+        return TRITANOPIA_MATRIX
+    return DEUTERANOPIA_MATRIX
+
+
 def simulate_dichromat(rgb: tuple, dichromat_type: str = 'deuteranopia') -> tuple:
     """
     Simulate how a color appears to someone with dichromacy.
@@ -34,69 +65,47 @@ def simulate_dichromat(rgb: tuple, dichromat_type: str = 'deuteranopia') -> tupl
     Returns:
         Simulated (R, G, B) tuple in 0-255 range
     """
-    r_lin = srgb_to_linear(rgb[0] / 255.0)
-    g_lin = srgb_to_linear(rgb[1] / 255.0)
-    b_lin = srgb_to_linear(rgb[2] / 255.0)
-    
-    rgb_linear = np.array([r_lin, g_lin, b_lin])
-    
-    if dichromat_type == 'protanopia':
-        transform = PROTANOPIA_MATRIX
-    elif dichromat_type == 'tritanopia':
-        transform = TRITANOPIA_MATRIX
-    else:
-        transform = DEUTERANOPIA_MATRIX
-    
-    simulated = np.dot(transform, rgb_linear)
-    simulated = np.clip(simulated, 0.0, 1.0)
-    
-    r_out = int(round(linear_to_srgb(simulated[0]) * 255))
-    g_out = int(round(linear_to_srgb(simulated[1]) * 255))
-    b_out = int(round(linear_to_srgb(simulated[2]) * 255))
-    
-    return (
-        max(0, min(255, r_out)),
-        max(0, min(255, g_out)),
-        max(0, min(255, b_out))
-    )
+    pixel = np.array([[rgb]], dtype=np.uint8)
+    simulated = simulate_image(pixel, dichromat_type)[0, 0]
+    return tuple(int(v) for v in simulated)
 
 
 def simulate_image(image_array: np.ndarray, dichromat_type: str = 'deuteranopia') -> np.ndarray:
     """
     Apply dichromat simulation to an entire image.
     
+    Uses the lookup tables above and float32 matrix application on reused
+    per-chunk buffers, so memory stays bounded for large images.
+    
     Args:
         image_array: NumPy array of shape (H, W, 3) with values 0-255
         dichromat_type: One of 'deuteranopia', 'protanopia', or 'tritanopia'
     
     Returns:
-        Simulated image as NumPy array
+        Simulated image as NumPy array (uint8)
     """
-    if dichromat_type == 'protanopia':
-        transform = PROTANOPIA_MATRIX
-    elif dichromat_type == 'tritanopia':
-        transform = TRITANOPIA_MATRIX
-    else:
-        transform = DEUTERANOPIA_MATRIX
-    
-    normalized = image_array / 255.0
+    transform_t = get_transform(dichromat_type).T.astype(np.float32)
     
-    linear = np.where(
-        normalized <= 0.04045,
-        normalized / 12.92,
-        ((normalized + 0.055) / 1.055) ** 2.4
-    )
+    pixels = np.ascontiguousarray(image_array, dtype=np.uint8).reshape(-1, 3)
+    if len(pixels) == 0:
+        return np.empty_like(image_array, dtype=np.uint8)
+    output = np.empty_like(pixels)
     
-    h, w, _ = linear.shape
-    flat = linear.reshape(-1, 3)
-    simulated = np.dot(flat, transform.T)
-    simulated = np.clip(simulated, 0.0, 1.0)
-    simulated = simulated.reshape(h, w, 3)
+    chunk = min(CHUNK_PIXELS, len(pixels))
+    linear = np.empty((chunk, 3), dtype=np.float32)
+    simulated = np.empty((chunk, 3), dtype=np.float32)
+    indices = np.empty((chunk, 3), dtype=np.intp)
     
-    srgb = np.where(
-        simulated <= 0.0031308,
-        simulated * 12.92,
-        1.055 * (simulated ** (1/2.4)) - 0.055
-    )
+    for start in range(0, len(pixels), chunk):
+        end = min(start + chunk, len(pixels))
+        n = end - start
+        
+        np.take(SRGB_TO_LINEAR_LUT, pixels[start:end], out=linear[:n])
+        np.dot(linear[:n], transform_t, out=simulated[:n])
+        np.clip(simulated[:n], 0.0, 1.0, out=simulated[:n])
+        simulated[:n] *= LINEAR_LUT_SIZE - 1
+        simulated[:n] += 0.5
+        np.copyto(indices[:n], simulated[:n], casting='unsafe')
+        np.take(LINEAR_TO_SRGB_LUT, indices[:n], out=output[start:end])
     
-    return np.clip(srgb * 255, 0, 255).astype(np.uint8)
+    return output.reshape(image_array.shape)
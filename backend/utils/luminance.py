@@ -1,5 +1,7 @@
 """Luminance calculation utilities for colorblind test image generation."""
 
+import numpy as np
+
 
 def srgb_to_linear(s: float) -> float:
     """Convert sRGB value (0-1) to linear RGB."""
@@ -42,3 +44,56 @@ def match_luminance(fg_rgb: tuple, bg_rgb: tuple) -> tuple:
     bg_luminance = calculate_luminance(*bg_rgb)
     new_g = solve_g_for_luminance(fg_rgb[0], fg_rgb[2], bg_luminance)
     return (fg_rgb[0], new_g, fg_rgb[2])
+
+
+# Per-channel lookup tables for the array versions. Each table holds the
+# channel's luminance contribution for every 8-bit value, so a batch of
+# colours needs three gathers and two additions.
+LINEAR_LUT = np.array([srgb_to_linear(v / 255.0) for v in range(256)])
+R_LUMINANCE_LUT = 0.2126 * LINEAR_LUT
+G_LUMINANCE_LUT = 0.7152 * LINEAR_LUT
+B_LUMINANCE_LUT = 0.0722 * LINEAR_LUT
+
+
+def linear_to_srgb_array(lin: np.ndarray) -> np.ndarray:
+    """Array version of linear_to_srgb."""
+    lin = np.asarray(lin, dtype=np.float64)
+    return np.where(
+        lin <= 0.0031308,
+        lin * 12.92,
+        1.055 * np.power(np.maximum(lin, 0.0031308), 1 / 2.4) - 0.055
+    )
+
+
+def calculate_luminance_batch(rgb: np.ndarray) -> np.ndarray:
+    """Calculate luminance (Y) for an N x 3 array of sRGB values (0-255)."""
+    rgb = np.asarray(rgb, dtype=np.intp).reshape(-1, 3)
+    return R_LUMINANCE_LUT[rgb[:, 0]] + G_LUMINANCE_LUT[rgb[:, 1]] + B_LUMINANCE_LUT[rgb[:, 2]]
+
+
+def solve_g_for_luminance_batch(r: np.ndarray, b: np.ndarray, y_target: np.ndarray) -> np.ndarray:
+    """Array version of solve_g_for_luminance; arguments broadcast together."""
+    r = np.asarray(r, dtype=np.intp)
+    b = np.asarray(b, dtype=np.intp)
+    
+    g_lin = (np.asarray(y_target, dtype=np.float64) - R_LUMINANCE_LUT[r] - B_LUMINANCE_LUT[b]) / 0.7152
+    g_lin = np.clip(g_lin, 0.0, 1.0)
+    
+    # np.round rounds halves to even, Python's round() as used by the scalar version does too
+    return np.round(linear_to_srgb_array(g_lin) * 255).astype(np.int64)
+
+
+def match_luminance_batch(fg_rgb: np.ndarray, bg_rgb: np.ndarray) -> np.ndarray:
+    """
+    Adjust each foreground's G to match its background's luminance.
+    
+    fg_rgb is N x 3; bg_rgb is N x 3 or a single colour shared by all rows.
+    Returns the matched N x 3 foreground colours.
+    """
+    fg = np.asarray(fg_rgb, dtype=np.int64).reshape(-1, 3)
+    bg = np.asarray(bg_rgb, dtype=np.int64).reshape(-1, 3)
+    
+    bg_luminance = calculate_luminance_batch(bg)
+    matched = fg.copy()
+    matched[:, 1] = solve_g_for_luminance_batch(fg[:, 0], fg[:, 2], bg_luminance)
+    return matched
@@ -0,0 +1,99 @@
+"""
+Vector encodings of dot plates.
+
+A plate is a few thousand flat-coloured circles clipped to a disc, so clients
+that can draw circles do not need a raster at all. Two encodings are offered:
+
+- 'svg': a standalone SVG document.
+- 'layout': a packed little-endian binary laid out for typed-array views:
+
+      offset 0        4s   magic b'DPL1'
+      offset 4        u16  plate size (coordinate frame is size x size)
+      offset 6        u16  clip margin, fixed point
+      offset 8        u32  dot count n
+      offset 12       u16[n] x, u16[n] y, u16[n] radius, all fixed point
+      offset 12 + 6n  u8[3n] RGB colours
+
+  Fixed-point values are in 1/LAYOUT_FIXED_POINT pixels. Dots are clipped to
+  the circle centred on the plate with radius size / 2 - margin, and the
+  area outside it is white.
+"""
+
+import struct
+
+import numpy as np
+
+
+VECTOR_FORMATS = ('svg', 'layout')
+VECTOR_MIMETYPES = {
+    'svg': 'image/svg+xml',
+    'layout': 'application/octet-stream',
+}
+
+LAYOUT_MAGIC = b'DPL1'
+LAYOUT_HEADER = struct.Struct('<4sHHI')
+LAYOUT_FIXED_POINT = 16
+
+
+def _fmt(value: float) -> str:
+    return f'{value:.1f}'.rstrip('0').rstrip('.')
+
+
+def encode_svg(x, y, r, colors, size: int, margin: float, display_size: int = None) -> bytes:
+    """Encode dots as an SVG document with a viewBox of the plate size."""
+    display_size = display_size or size
+    center = size / 2
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{display_size}" height="{display_size}" '
+        f'viewBox="0 0 {size} {size}">',
+        f'<rect width="{size}" height="{size}" fill="#fff"/>',
+        f'<clipPath id="plate"><circle cx="{_fmt(center)}" cy="{_fmt(center)}" r="{_fmt(center - margin)}"/></clipPath>',
+        '<g clip-path="url(#plate)">',
+    ]
+    parts.extend(
+        f'<circle cx="{_fmt(cx)}" cy="{_fmt(cy)}" r="{_fmt(cr)}" fill="#{red:02x}{green:02x}{blue:02x}"/>'
+        for cx, cy, cr, (red, green, blue) in zip(
+            np.asarray(x).tolist(), np.asarray(y).tolist(), np.asarray(r).tolist(), np.asarray(colors).tolist()
+        )
+    )
+    parts.append('</g></svg>')
+    return ''.join(parts).encode()
+
+
+def pack_layout(x, y, r, colors, size: int, margin: float) -> bytes:
+    """Pack dots into the binary 'layout' encoding."""
+    def fixed(values):
+        return np.round(np.asarray(values, dtype=np.float64) * LAYOUT_FIXED_POINT).astype('<u2').tobytes()
+
+    colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+    header = LAYOUT_HEADER.pack(LAYOUT_MAGIC, size, int(round(margin * LAYOUT_FIXED_POINT)), len(colors))
+    return header + fixed(x) + fixed(y) + fixed(r) + colors.tobytes()
+
+
+def unpack_layout(data: bytes) -> dict:
+    """Decode the binary 'layout' encoding into pixel-unit arrays."""
+    magic, size, margin, count = LAYOUT_HEADER.unpack_from(data)
+    if magic != LAYOUT_MAGIC:
+        raise ValueError('Not a packed plate layout')
+
+    offset = LAYOUT_HEADER.size
+    fixed = np.frombuffer(data, dtype='<u2', count=3 * count, offset=offset).reshape(3, count)
+    colors = np.frombuffer(data, dtype=np.uint8, count=3 * count, offset=offset + 6 * count).reshape(count, 3)
+    x, y, r = fixed / LAYOUT_FIXED_POINT
+    return {
+        'size': size,
+        'margin': margin / LAYOUT_FIXED_POINT,
+        'x': x,
+        'y': y,
+        'r': r,
+        'colors': colors,
+    }
+
+
+def encode_vector(vector_format: str, x, y, r, colors, size: int, margin: float, display_size: int = None) -> bytes:
+    """Encode dots in one of VECTOR_FORMATS."""
+    if vector_format == 'svg':
+        return encode_svg(x, y, r, colors, size, margin, display_size)
+    if vector_format == 'layout':
+        return pack_layout(x, y, r, colors, size, margin)
+    raise ValueError(f"vector_format must be one of {', '.join(VECTOR_FORMATS)}")
@@ -9,6 +9,8 @@ export interface SliderParams {
   simulate_dichromat: boolean;
   dichromat_type: 'deuteranopia' | 'protanopia' | 'tritanopia';
   seed?: number;
+  quality?: 'full' | 'preview';
+  preview_size?: number;
 }
 
 export interface GenerateResponse {
@@ -30,7 +32,7 @@ export interface SavedParameter {
 export interface Preset {
   name: string;
   description: string;
-  params: Omit<SliderParams, 'simulate_dichromat' | 'dichromat_type' | 'seed'>;
+  params: Omit<SliderParams, 'simulate_dichromat' | 'dichromat_type' | 'quality' | 'preview_size'>;
 }
 
 export const DEFAULT_PARAMS: SliderParams = {
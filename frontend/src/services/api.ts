@@ -4,6 +4,8 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '';
 
 class ApiService {
   private baseUrl: string;
+  // Signed tokens let the backend serve a session's images without a database read
+  private sessionTokens = new Map<string, string>();
 
   constructor(baseUrl: string) {
     this.baseUrl = baseUrl;
@@ -27,11 +29,17 @@ class ApiService {
       },
       body: JSON.stringify({ metadata }),
     });
-    return this.handleResponse<StartTestResponse>(response);
+    const data = await this.handleResponse<StartTestResponse>(response);
+    if (data.session_token) {
+      this.sessionTokens.set(data.session_id, data.session_token);
+    }
+    return data;
   }
 
   getImageUrl(sessionId: string, imageNumber: number): string {
-    return `${this.baseUrl}/api/test/${sessionId}/image/${imageNumber}`;
+    const url = `${this.baseUrl}/api/test/${sessionId}/image/${imageNumber}`;
+    const token = this.sessionTokens.get(sessionId);
+    return token ? `${url}?token=${encodeURIComponent(token)}` : url;
   }
 
   async submitAnswer(
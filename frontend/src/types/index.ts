@@ -8,6 +8,7 @@ export interface StartTestResponse {
   session_id: string;
   created_at: string;
   total_images: number;
+  session_token?: string;
 }
 
 export interface SubmitAnswerResponse {